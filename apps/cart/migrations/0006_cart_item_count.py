@@ -0,0 +1,28 @@
+# Generated by Django 5.0.7 on 2026-10-17 03:10
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_item_count(apps, schema_editor):
+    Cart = apps.get_model('cart', 'Cart')
+    CartItem = apps.get_model('cart', 'CartItem')
+    totals = CartItem.objects.values('cart_id').annotate(total=Sum('quantity'))
+    for row in totals.iterator():
+        Cart.objects.filter(pk=row['cart_id']).update(item_count=row['total'] or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0005_cartitem_addons'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_item_count, migrations.RunPython.noop),
+    ]
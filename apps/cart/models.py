@@ -16,16 +16,24 @@ class Cart(BaseModel):
     abandonment_email_sent_at = models.DateTimeField(blank=True, null=True, help_text="When abandonment email was sent")
     last_activity = models.DateTimeField(auto_now=True, help_text="Last time cart was updated")
 
+    # Denormalized quantity total for the header badge (see cart.services.badge)
+    item_count = models.PositiveIntegerField(default=0)
+
     def __str__(self):
         return f"Cart for {self.user.email if self.user else self.session_key}"
 
+    def priced(self, refresh=False):
+        """Items and totals priced once per request (see cart.services.pricing)"""
+        from apps.cart.services.pricing import price_cart
+        return price_cart(self, refresh)
+
     @property
     def total_items(self):
-        return sum(item.quantity for item in self.items.all())
+        return self.priced().total_items
 
     @property
     def total_price(self):
-        return sum(item.total_price for item in self.items.all())
+        return self.priced().subtotal
 
 
 class CartItem(BaseModel):
@@ -0,0 +1,125 @@
+"""
+Abandoned cart reminders.
+
+The sweep works in chunks of carts. Each chunk takes one aggregated query
+to pick candidate carts (idle, unreminded, at least one unit), one UPDATE
+to claim them, one query each for their users and their priced items, and
+one INSERT of the rendered reminders into the email outbox, which sends
+them over a shared SMTP connection. Claim and reminders commit together,
+so a cart is reminded at most once even with overlapping sweeps.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import List
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from apps.cart.models import Cart, CartItem
+from apps.cart.services.pricing import PricedCart
+from apps.core.models import OutboundEmail
+from apps.core.outbox import queue_emails
+
+logger = logging.getLogger(__name__)
+
+ABANDONED_AFTER = timedelta(hours=24)
+CHUNK_SIZE = 200
+ITEMS_SHOWN = 5
+
+
+def abandoned_carts(cutoff):
+    return Cart.objects.filter(
+        abandonment_email_sent=False,
+        last_activity__lt=cutoff,
+        user__isnull=False,
+    ).annotate(units=Sum('items__quantity')).filter(units__gt=0)
+
+
+def claim_carts(cart_ids: List[int]) -> List[int]:
+    """Mark non-empty carts reminded; returns the ones this caller claimed"""
+    now = timezone.now()
+    Cart.objects.filter(pk__in=cart_ids, abandonment_email_sent=False, items__isnull=False).update(
+        abandonment_email_sent=True, abandonment_email_sent_at=now
+    )
+    return list(Cart.objects.filter(pk__in=cart_ids, abandonment_email_sent_at=now).values_list('pk', flat=True))
+
+
+def _priced_carts(cart_ids: List[int]) -> List[Cart]:
+    """Carts with users and priced items, in three queries"""
+    items = defaultdict(list)
+    queryset = CartItem.objects.filter(cart_id__in=cart_ids).select_related(
+        'product', 'variant'
+    ).prefetch_related('addons').order_by('pk')
+    for item in queryset:
+        items[item.cart_id].append(item)
+
+    carts = list(Cart.objects.filter(pk__in=cart_ids).select_related('user').order_by('pk'))
+    for cart in carts:
+        cart._priced_cart = PricedCart(cart, items[cart.pk])
+    return carts
+
+
+def build_reminder(cart: Cart) -> OutboundEmail:
+    priced = cart.priced()
+    html_message = render_to_string('emails/cart_abandonment.html', {
+        'cart': cart,
+        'user': cart.user,
+        'items': priced.items[:ITEMS_SHOWN],
+        'site_name': getattr(settings, 'SITE_NAME', 'GiftTree'),
+        'cart_url': f"{getattr(settings, 'SITE_DOMAIN', '')}/cart/",
+    })
+    return OutboundEmail(
+        subject="You left something behind! Complete your order",
+        body=f'You have {priced.total_items} items waiting in your cart!',
+        html_body=html_message,
+        recipients=[cart.user.email],
+    )
+
+
+def _build_reminders(carts: List[Cart]) -> List[OutboundEmail]:
+    """Reminders for the carts that can be reminded; failures are logged and skipped"""
+    reminders = []
+    for cart in carts:
+        if not cart.user.email:
+            logger.warning(f'Skipping cart {cart.pk} abandonment email: user {cart.user_id} has no email')
+            continue
+        try:
+            reminders.append(build_reminder(cart))
+        except Exception as e:
+            logger.error(f'Error building abandonment email for cart {cart.pk}: {str(e)}', exc_info=True)
+    return reminders
+
+
+def remind_carts(cart_ids: List[int]) -> int:
+    """
+    Claim the given carts and queue a reminder for each one claimed.
+    A cart whose reminder cannot be built stays claimed, so it is not retried
+    and never holds up the rest of the sweep. Returns the reminders queued.
+    """
+    with transaction.atomic():
+        claimed = claim_carts(cart_ids)
+        if not claimed:
+            return 0
+        reminders = _build_reminders(_priced_carts(claimed))
+        if reminders:
+            queue_emails(reminders)
+    return len(reminders)
+
+
+def sweep_abandoned_carts(chunk_size: int = CHUNK_SIZE) -> int:
+    """Queue reminders for every cart idle longer than ABANDONED_AFTER"""
+    candidates = abandoned_carts(timezone.now() - ABANDONED_AFTER).order_by('pk').values_list('pk', flat=True)
+    total = 0
+    while True:
+        # Claimed carts drop out of the candidates, so each pass takes the next chunk
+        cart_ids = list(candidates[:chunk_size])
+        if not cart_ids:
+            break
+        total += remind_carts(cart_ids)
+    logger.info(f'Queued cart abandonment emails for {total} carts')
+    return total
@@ -0,0 +1,39 @@
+"""
+Header cart badge.
+
+Cart.item_count holds the total quantity in a cart. The cart mutation views
+update it (together with the cache copy) whenever they change items, so
+rendering the badge is a cache read, and a single-column query only after
+the cache entry has been evicted.
+"""
+
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.cart.models import Cart
+
+logger = logging.getLogger(__name__)
+
+CART_COUNT_KEY = 'cart_count_{}'
+CART_COUNT_TIMEOUT = 60 * 60 * 24
+
+
+def set_item_count(cart: Cart, count: int) -> None:
+    """Store a cart's new item count on the row and in the cache"""
+    if cart.item_count != count:
+        Cart.objects.filter(pk=cart.pk).update(item_count=count)
+        cart.item_count = count
+    key = CART_COUNT_KEY.format(cart.user_id)
+    transaction.on_commit(lambda: cache.set(key, count, CART_COUNT_TIMEOUT))
+
+
+def get_item_count(user_id: int) -> int:
+    """Badge count for a logged-in user"""
+    key = CART_COUNT_KEY.format(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Cart.objects.filter(user_id=user_id).values_list('item_count', flat=True).first() or 0
+        cache.set(key, count, CART_COUNT_TIMEOUT)
+    return count
@@ -0,0 +1,164 @@
+"""
+Batched cart mutations.
+
+A list of operations from the cart page is folded into one final action per
+item (absolute quantity, relative change or removal) and applied in a
+single transaction with at most one statement per kind of change.
+Relative changes are F() expressions, so concurrent requests add up
+instead of overwriting each other's read-modify-write. Resulting quantities
+are clamped to line_limit(): the per-line cap, the product's max quantity
+and the stock of products and variants that don't allow backorders.
+
+Supported operations:
+    {"op": "set", "item_id": 1, "quantity": 3}
+    {"op": "increment", "item_id": 1, "by": -1}
+    {"op": "remove", "item_id": 1}
+    {"op": "add_addon", "item_id": 1, "addon_id": 5}
+"""
+
+import logging
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest, Least
+
+from apps.cart.models import CartItem
+from apps.cart.services.badge import set_item_count
+from apps.cart.services.pricing import PricedCart
+from apps.products.models import ProductAddOn
+from apps.products.services.inventory import ALLOW_BACKORDER
+
+logger = logging.getLogger(__name__)
+
+MAX_OPERATIONS = 100
+MAX_LINE_QUANTITY = 99
+
+SET, DELTA, REMOVE = 'set', 'delta', 'remove'
+
+
+class CartOperationError(ValueError):
+    """An operation in a batch is malformed or refers to something not in the cart"""
+
+
+def line_limit(product, variant=None) -> int:
+    """
+    Most units one cart line of the product (variant) may hold. Never below
+    one: lines already in the cart are not removed when stock runs out,
+    checkout reports them instead.
+    """
+    limit = MAX_LINE_QUANTITY
+    if product.max_quantity > 0:
+        limit = min(limit, product.max_quantity)
+    for stocked in (product, variant):
+        if stocked is not None and stocked.inventory_policy != ALLOW_BACKORDER:
+            limit = min(limit, stocked.stock_quantity)
+    return max(limit, 1)
+
+
+def _int(operation: Dict, field: str) -> int:
+    try:
+        return int(operation[field])
+    except (KeyError, TypeError, ValueError):
+        raise CartOperationError(f"'{field}' must be an integer in {operation!r}")
+
+
+def fold_operations(operations: Iterable[Dict]):
+    """
+    Reduce operations, in order, to ({item_id: (kind, amount)}, {item_id: {addon_ids}}).
+    """
+    actions = {}
+    addons = {}
+    for operation in operations:
+        if not isinstance(operation, dict):
+            raise CartOperationError(f'Invalid operation {operation!r}')
+        op = operation.get('op')
+        item_id = _int(operation, 'item_id')
+        kind, amount = actions.get(item_id, (DELTA, 0))
+
+        if op == 'set':
+            quantity = _int(operation, 'quantity')
+            actions[item_id] = (SET, quantity) if quantity > 0 else (REMOVE, 0)
+        elif op == 'increment':
+            by = _int(operation, 'by') if 'by' in operation else 1
+            if kind == REMOVE:
+                continue
+            if kind == SET:
+                quantity = amount + by
+                actions[item_id] = (SET, quantity) if quantity > 0 else (REMOVE, 0)
+            else:
+                actions[item_id] = (DELTA, amount + by)
+        elif op == 'remove':
+            actions[item_id] = (REMOVE, 0)
+        elif op == 'add_addon':
+            addons.setdefault(item_id, set()).add(_int(operation, 'addon_id'))
+        else:
+            raise CartOperationError(f'Unknown operation {op!r}')
+    return actions, addons
+
+
+def _quantity_case(amounts: Dict[int, int]) -> Case:
+    return Case(
+        *[When(pk=item_id, then=Value(amount)) for item_id, amount in amounts.items()],
+        default=Value(0),
+        output_field=IntegerField()
+    )
+
+
+def apply_cart_operations(cart, operations: List[Dict]) -> PricedCart:
+    """Apply a batch of operations atomically and return the repriced cart"""
+    if len(operations) > MAX_OPERATIONS:
+        raise CartOperationError(f'At most {MAX_OPERATIONS} operations per request')
+    actions, addons = fold_operations(operations)
+
+    removed = [item_id for item_id, (kind, _) in actions.items() if kind == REMOVE]
+    absolute = {item_id: amount for item_id, (kind, amount) in actions.items() if kind == SET}
+    relative = {item_id: amount for item_id, (kind, amount) in actions.items() if kind == DELTA and amount}
+    item_ids = set(actions) | set(addons)
+    addon_ids = set().union(*addons.values())
+
+    with transaction.atomic():
+        locked = cart.items.select_for_update(of=('self',)).filter(pk__in=item_ids).select_related(
+            'product', 'variant'
+        ).only(
+            'pk', 'product__max_quantity', 'product__stock_quantity', 'product__inventory_policy',
+            'variant__stock_quantity', 'variant__inventory_policy'
+        )
+        limits = {item.pk: line_limit(item.product, item.variant) for item in locked}
+        missing = item_ids - set(limits)
+        if missing:
+            raise CartOperationError(f'Cart items not found: {sorted(missing)}')
+        if addon_ids:
+            found = set(ProductAddOn.objects.filter(pk__in=addon_ids, is_active=True).values_list('pk', flat=True))
+            if addon_ids - found:
+                raise CartOperationError(f'Add-ons not available: {sorted(addon_ids - found)}')
+
+        if addons:
+            # Before removals, so add-ons of removed items go with them
+            Through = CartItem.addons.through
+            Through.objects.bulk_create(
+                [
+                    Through(cartitem_id=item_id, productaddon_id=addon_id)
+                    for item_id, ids in addons.items()
+                    for addon_id in ids
+                ],
+                ignore_conflicts=True
+            )
+        if removed:
+            cart.items.filter(pk__in=removed).delete()
+        if absolute:
+            absolute = {item_id: min(amount, limits[item_id]) for item_id, amount in absolute.items()}
+            cart.items.filter(pk__in=list(absolute)).update(quantity=_quantity_case(absolute))
+        if relative:
+            # Items decremented to zero are removed below
+            cart.items.filter(pk__in=list(relative)).update(
+                quantity=Least(
+                    Greatest(F('quantity') + _quantity_case(relative), Value(0)),
+                    _quantity_case({item_id: limits[item_id] for item_id in relative})
+                )
+            )
+            cart.items.filter(pk__in=list(relative), quantity=0).delete()
+
+        priced = cart.priced(refresh=True)
+        set_item_count(cart, priced.total_items)
+    return priced
@@ -0,0 +1,63 @@
+"""
+Cart pricing.
+
+price_cart() loads a cart's items with their products, variants and add-ons
+in a fixed number of queries (items with products and variants, add-ons)
+and prices every line once. The result is memoized on the Cart instance, so
+Cart.total_items / Cart.total_price, templates and order creation within a
+request share one priced cart instead of repricing it per access.
+"""
+
+import logging
+from decimal import Decimal
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+
+class PricedLine:
+    """One cart item with its prices worked out"""
+
+    def __init__(self, item):
+        self.item = item
+        self.quantity = item.quantity
+        # The variant's product is the item's product; share the loaded row
+        if item.variant_id:
+            item.variant.product = item.product
+        self.unit_price = item.unit_price
+        self.addons = list(item.addons.all())
+        self.addons_price = sum((addon.price for addon in self.addons), Decimal('0'))
+        self.total_price = (self.unit_price + self.addons_price) * self.quantity
+
+
+class PricedCart:
+    def __init__(self, cart, items):
+        self.cart = cart
+        self.items = items
+        self.lines = [PricedLine(item) for item in items]
+        self.total_items = sum(line.quantity for line in self.lines)
+        self.subtotal = sum((line.total_price for line in self.lines), Decimal('0'))
+
+    def __bool__(self):
+        return bool(self.lines)
+
+    def __len__(self):
+        return len(self.lines)
+
+    @property
+    def total_price(self):
+        return self.subtotal
+
+
+def cart_items_queryset(cart):
+    return cart.items.select_related('product', 'variant').prefetch_related('addons').order_by('pk')
+
+
+def price_cart(cart, refresh: bool = False) -> PricedCart:
+    """Priced items and totals for a cart; reused until refresh=True"""
+    priced = getattr(cart, '_priced_cart', None)
+    if priced is None or refresh:
+        items: List = list(cart_items_queryset(cart))
+        priced = PricedCart(cart, items)
+        cart._priced_cart = priced
+    return priced
@@ -0,0 +1,60 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.template import TemplateSyntaxError
+from django.test import TestCase
+from django.utils import timezone
+from apps.cart.models import Cart, CartItem
+from apps.cart.services import abandonment
+from apps.cart.services.abandonment import sweep_abandoned_carts
+from apps.core.models import OutboundEmail
+from apps.orders.tasks import check_abandoned_carts
+from apps.products.models import Product, Category, ProductAddOn
+
+
+class AbandonedCartSweepTest(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Gifts", slug="gifts")
+        cake = Product.objects.create(
+            name='Cake', slug='cake', category=category, description='Cake',
+            base_price=Decimal('100'), stock_quantity=5, sku='CAKE'
+        )
+        card = ProductAddOn.objects.create(name='Card', price=Decimal('50'))
+        User = get_user_model()
+        for index in range(5):
+            cart = Cart.objects.create(
+                user=User.objects.create_user(username=f'u{index}', email=f'u{index}@example.com', password='x')
+            )
+            if index < 4:
+                item = CartItem.objects.create(cart=cart, product=cake, quantity=index + 1)
+                item.addons.add(card)
+        self.recent = Cart.objects.get(user__username='u3')
+        Cart.objects.exclude(pk=self.recent.pk).update(last_activity=timezone.now() - timedelta(days=2))
+
+    def test_sweep_reminds_each_idle_cart_once(self):
+        with self.assertNumQueries(19):  # 9 per chunk regardless of its size, then an empty candidate query
+            self.assertEqual(sweep_abandoned_carts(chunk_size=2), 3)
+
+        emails = OutboundEmail.objects.order_by('pk')
+        self.assertEqual([email.recipients for email in emails], [['u0@example.com'], ['u1@example.com'], ['u2@example.com']])
+        self.assertIn('You have 3 items waiting', emails[2].body)
+        self.assertIn('₹450', emails[2].html_body)
+        self.assertFalse(Cart.objects.get(pk=self.recent.pk).abandonment_email_sent)
+
+        self.assertEqual(check_abandoned_carts(), 'Processed 0 abandoned carts')
+        self.assertEqual(OutboundEmail.objects.count(), 3)
+
+    def test_failing_reminder_does_not_stop_the_sweep(self):
+        get_user_model().objects.filter(username='u1').update(email='')
+        build = abandonment.build_reminder
+
+        def build_reminder(cart):
+            if cart.user.username == 'u0':
+                raise TemplateSyntaxError('broken')
+            return build(cart)
+
+        with mock.patch('apps.cart.services.abandonment.build_reminder', side_effect=build_reminder):
+            self.assertEqual(sweep_abandoned_carts(chunk_size=1), 1)
+        self.assertEqual([email.recipients for email in OutboundEmail.objects.all()], [['u2@example.com']])
+        self.assertEqual(Cart.objects.filter(abandonment_email_sent=True).count(), 3)
@@ -0,0 +1,141 @@
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from apps.cart.models import Cart, CartItem
+from apps.cart.services.badge import get_item_count
+from apps.products.models import Product, Category, ProductAddOn, ProductVariant
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class CartPricingTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='buyer', email='buyer@example.com', password='x'
+        )
+        category = Category.objects.create(name="Gifts", slug="gifts")
+        self.cart = Cart.objects.create(user=self.user)
+        card = ProductAddOn.objects.create(name='Card', price=Decimal('50'))
+        for index in range(3):
+            product = Product.objects.create(
+                name=f'Cake {index}', slug=f'cake-{index}', category=category, description='Cake',
+                base_price=Decimal('100'), stock_quantity=5, sku=f'CAKE{index}'
+            )
+            variant = ProductVariant.objects.create(
+                product=product, name='1kg', price_adjustment=Decimal('20'), inventory_quantity=5
+            )
+            item = CartItem.objects.create(cart=self.cart, product=product, variant=variant, quantity=2)
+            item.addons.add(card)
+
+    def test_cart_priced_in_fixed_queries(self):
+        cart = Cart.objects.get(pk=self.cart.pk)
+        with self.assertNumQueries(2):  # items with products and variants, add-ons
+            priced = cart.priced()
+            self.assertEqual(cart.total_items, 6)
+            self.assertEqual(cart.total_price, Decimal('1020'))
+            self.assertEqual([line.total_price for line in priced.lines], [Decimal('340')] * 3)
+            self.assertEqual(sum(item.total_price for item in priced.items), Decimal('1020'))
+
+    def test_update_returns_repriced_totals(self):
+        self.client.force_login(self.user)
+        item = self.cart.items.order_by('pk').first()
+        data = self.client.post(reverse('cart:update_cart', args=[item.pk]), {'action': 'increase'}).json()
+        self.assertEqual((data['item_total'], data['cart_count'], data['cart_total']), (510.0, 7, 1190.0))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CartBadgeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username='buyer', email='buyer@example.com', password='x'
+        )
+        category = Category.objects.create(name="Gifts", slug="gifts")
+        self.product = Product.objects.create(
+            name='Cake', slug='cake', category=category, description='Cake',
+            base_price=Decimal('100'), stock_quantity=5, sku='CAKE'
+        )
+        self.client.force_login(self.user)
+
+    def test_mutations_maintain_badge_count(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('cart:add_to_cart'), {'product_id': self.product.pk, 'quantity': 3})
+        cart = Cart.objects.get(user=self.user)
+        self.assertEqual(cart.item_count, 3)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_item_count(self.user.pk), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('cart:clear_cart'))
+        self.assertEqual(get_item_count(self.user.pk), 0)
+        cache.clear()
+        self.assertEqual(get_item_count(self.user.pk), 0)
+
+
+class BatchCartUpdateTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='buyer', email='buyer@example.com', password='x'
+        )
+        category = Category.objects.create(name="Gifts", slug="gifts")
+        self.cart = Cart.objects.create(user=self.user)
+        self.card = ProductAddOn.objects.create(name='Card', price=Decimal('50'))
+        self.cake, self.roses, self.mug = [
+            CartItem.objects.create(
+                cart=self.cart,
+                product=Product.objects.create(
+                    name=name, slug=name.lower(), category=category, description=name,
+                    base_price=Decimal('100'), stock_quantity=5, sku=name.upper()
+                ),
+                quantity=2
+            )
+            for name in ('Cake', 'Roses', 'Mug')
+        ]
+        self.client.force_login(self.user)
+
+    def post(self, operations):
+        return self.client.post(
+            reverse('cart:batch_update_cart'), {'operations': operations}, content_type='application/json'
+        )
+
+    def test_operations_applied_together(self):
+        response = self.post([
+            {'op': 'increment', 'item_id': self.cake.pk, 'by': 1},
+            {'op': 'increment', 'item_id': self.cake.pk, 'by': 1},
+            {'op': 'set', 'item_id': self.roses.pk, 'quantity': 5},
+            {'op': 'increment', 'item_id': self.roses.pk, 'by': -1},
+            {'op': 'increment', 'item_id': self.mug.pk, 'by': -2},
+            {'op': 'add_addon', 'item_id': self.cake.pk, 'addon_id': self.card.pk},
+        ])
+        data = response.json()
+        self.assertEqual(
+            [(item['id'], item['quantity']) for item in data['items']],
+            [(self.cake.pk, 4), (self.roses.pk, 4)]
+        )
+        self.assertEqual((data['cart_count'], data['cart_total']), (8, 1000.0))
+        self.assertEqual(Cart.objects.get(pk=self.cart.pk).item_count, 8)
+
+    def test_quantities_clamped_to_stock(self):
+        response = self.post([
+            {'op': 'set', 'item_id': self.cake.pk, 'quantity': 10 ** 9},
+            {'op': 'increment', 'item_id': self.roses.pk, 'by': 10 ** 6},
+        ])
+        self.assertEqual(
+            [(item['id'], item['quantity']) for item in response.json()['items']],
+            [(self.cake.pk, 5), (self.roses.pk, 5), (self.mug.pk, 2)]
+        )
+
+    def test_invalid_batch_changes_nothing(self):
+        other = Cart.objects.create(
+            user=get_user_model().objects.create_user(username='other', email='o@example.com', password='x')
+        )
+        foreign = CartItem.objects.create(cart=other, product=self.cake.product)
+        response = self.post([
+            {'op': 'remove', 'item_id': self.cake.pk},
+            {'op': 'remove', 'item_id': foreign.pk},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.cart.items.count(), 3)
@@ -8,5 +8,6 @@ urlpatterns = [
     path('add/', views.add_to_cart, name='add_to_cart'),
     path('update/<int:item_id>/', views.update_cart, name='update_cart'),
     path('remove/<int:item_id>/', views.remove_from_cart, name='remove_from_cart'),
+    path('batch/', views.batch_update_cart, name='batch_update_cart'),
     path('clear/', views.clear_cart, name='clear_cart'),
 ]
\ No newline at end of file
@@ -1,28 +1,36 @@
+import json
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from .models import Cart, CartItem
+from .services.badge import set_item_count
+from .services.mutations import CartOperationError, apply_cart_operations, line_limit
 from apps.products.models import Product, ProductVariant, ProductAddOn
+from apps.products.services.recommendations import bought_together
 
 
 @login_required
 def cart_view(request):
     """Display cart contents"""
     cart, created = Cart.objects.get_or_create(user=request.user)
-    cart_items = cart.items.select_related('product', 'variant').prefetch_related('addons').all()
+    priced = cart.priced()
+    cart_items = priced.items
     
-    # Get recommended products (products from same categories)
-    if cart_items.exists():
-        categories = [item.product.category for item in cart_items]
+    # Frequently bought together with the cart contents, falling back to
+    # products from the same categories
+    cart_product_ids = [item.product_id for item in cart_items]
+    recommended_products = bought_together(cart_product_ids, limit=6)
+    if not recommended_products and cart_product_ids:
+        categories = [item.product.category_id for item in cart_items]
         recommended_products = Product.objects.filter(
             category__in=categories,
             is_active=True,
             stock_quantity__gt=0
         ).exclude(
-            id__in=[item.product.id for item in cart_items]
+            id__in=cart_product_ids
         ).select_related('category').prefetch_related('images')[:6]
-    else:
+    elif not recommended_products:
         # Show featured products if cart is empty
         recommended_products = Product.objects.filter(
             is_featured=True,
@@ -33,8 +41,8 @@ def cart_view(request):
     context = {
         'cart': cart,
         'cart_items': cart_items,
-        'cart_subtotal': cart.total_price,
-        'cart_total': cart.total_price,
+        'cart_subtotal': priced.subtotal,
+        'cart_total': priced.subtotal,
         'recommended_products': recommended_products,
     }
     return render(request, 'cart/cart.html', context)
@@ -92,9 +100,10 @@ def add_to_cart(request):
         else:
             existing_item = cart.items.filter(product=product, variant__isnull=True).first()
 
+        limit = line_limit(product, variant)
         if existing_item:
             # Update quantity if item exists
-            existing_item.quantity += quantity
+            existing_item.quantity = min(existing_item.quantity + max(quantity, 1), limit)
             existing_item.save()
             cart_item = existing_item
         else:
@@ -103,7 +112,7 @@ def add_to_cart(request):
                 cart=cart,
                 product=product,
                 variant=variant,
-                quantity=quantity
+                quantity=min(max(quantity, 1), limit)
             )
 
         # Add selected add-ons to the cart item
@@ -126,6 +135,9 @@ def add_to_cart(request):
         else:
             print("⚠️ No addon IDs received in request\n")
 
+        priced = cart.priced(refresh=True)
+        set_item_count(cart, priced.total_items)
+
         # Check if it's an AJAX request
         is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
 
@@ -133,8 +145,8 @@ def add_to_cart(request):
             return JsonResponse({
                 'success': True,
                 'message': f'{product.name} added to cart!',
-                'cart_count': cart.total_items,
-                'cart_total': float(cart.total_price),
+                'cart_count': priced.total_items,
+                'cart_total': float(priced.subtotal),
             })
         else:
             # Regular form submission - redirect to cart
@@ -176,35 +188,41 @@ def update_cart(request, item_id):
     """Update cart item quantity (AJAX)"""
     try:
         cart = Cart.objects.get(user=request.user)
-        cart_item = CartItem.objects.get(id=item_id, cart=cart)
+        cart_item = CartItem.objects.select_related('product', 'variant').get(id=item_id, cart=cart)
+        limit = line_limit(cart_item.product, cart_item.variant)
         
         action = request.POST.get('action')
         
         if action == 'increase':
-            cart_item.quantity += 1
+            cart_item.quantity = min(cart_item.quantity + 1, max(cart_item.quantity, limit))
         elif action == 'decrease':
             cart_item.quantity -= 1
         else:
             # Set specific quantity
             quantity = int(request.POST.get('quantity', 1))
-            cart_item.quantity = max(1, quantity)
+            cart_item.quantity = min(max(1, quantity), limit)
         
         if cart_item.quantity <= 0:
             cart_item.delete()
+            priced = cart.priced(refresh=True)
+            set_item_count(cart, priced.total_items)
             return JsonResponse({
                 'success': True,
                 'message': 'Item removed from cart.',
-                'cart_count': cart.total_items,
-                'cart_total': float(cart.total_price),
+                'cart_count': priced.total_items,
+                'cart_total': float(priced.subtotal),
             })
         else:
             cart_item.save()
+            priced = cart.priced(refresh=True)
+            set_item_count(cart, priced.total_items)
+            item_total = next(line.total_price for line in priced.lines if line.item.pk == cart_item.pk)
             return JsonResponse({
                 'success': True,
                 'message': 'Cart updated.',
-                'item_total': float(cart_item.total_price),
-                'cart_count': cart.total_items,
-                'cart_total': float(cart.total_price),
+                'item_total': float(item_total),
+                'cart_count': priced.total_items,
+                'cart_total': float(priced.subtotal),
             })
     except CartItem.DoesNotExist:
         return JsonResponse({
@@ -228,12 +246,14 @@ def remove_from_cart(request, item_id):
         
         product_name = cart_item.product.name
         cart_item.delete()
+        priced = cart.priced(refresh=True)
+        set_item_count(cart, priced.total_items)
         
         return JsonResponse({
             'success': True,
             'message': f'{product_name} removed from cart.',
-            'cart_count': cart.total_items,
-            'cart_total': float(cart.total_price),
+            'cart_count': priced.total_items,
+            'cart_total': float(priced.subtotal),
         })
     except CartItem.DoesNotExist:
         return JsonResponse({
@@ -247,6 +267,45 @@ def remove_from_cart(request, item_id):
         }, status=500)
 
 
+@login_required
+@require_POST
+def batch_update_cart(request):
+    """Apply several cart operations at once (AJAX, JSON body {"operations": [...]})"""
+    try:
+        operations = json.loads(request.body).get('operations')
+    except (ValueError, AttributeError):
+        operations = None
+    if not isinstance(operations, list):
+        return JsonResponse({
+            'success': False,
+            'message': 'Expected a JSON body with a list of operations.',
+        }, status=400)
+
+    cart, created = Cart.objects.get_or_create(user=request.user)
+    try:
+        priced = apply_cart_operations(cart, operations)
+    except CartOperationError as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e),
+        }, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'message': 'Cart updated.',
+        'items': [
+            {
+                'id': line.item.pk,
+                'quantity': line.quantity,
+                'item_total': float(line.total_price),
+            }
+            for line in priced.lines
+        ],
+        'cart_count': priced.total_items,
+        'cart_total': float(priced.subtotal),
+    })
+
+
 @login_required
 @require_POST
 def clear_cart(request):
@@ -254,6 +313,7 @@ def clear_cart(request):
     try:
         cart = Cart.objects.get(user=request.user)
         cart.items.all().delete()
+        set_item_count(cart, 0)
         
         return JsonResponse({
             'success': True,
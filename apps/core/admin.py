@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import SiteSettings, Country, BannerImage, WorldwideDeliveryProduct
+from .models import SiteSettings, Country, BannerImage, WorldwideDeliveryProduct, OutboundEmail, Job, JobSchedule
 
 
 @admin.register(SiteSettings)
@@ -86,4 +86,24 @@ class WorldwideDeliveryProductAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at']
+    list_filter = ['status']
+    search_fields = ['subject']
+    readonly_fields = ['attempts', 'last_error', 'sent_at', 'created_at']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['task', 'status', 'attempts', 'run_at', 'finished_at', 'locked_by']
+    list_filter = ['status', 'task']
+    readonly_fields = ['attempts', 'locked_by', 'locked_until', 'last_error', 'created_at', 'finished_at']
+
+
+@admin.register(JobSchedule)
+class JobScheduleAdmin(admin.ModelAdmin):
+    list_display = ['name', 'next_run_at']
@@ -97,13 +97,9 @@ def global_context(request):
     cart_count = 0
     try:
         if hasattr(request, 'user') and request.user.is_authenticated:
-            # Database cart for logged-in users
-            from apps.cart.models import Cart
-            try:
-                cart = Cart.objects.get(user=request.user)
-                cart_count = cart.total_items
-            except Cart.DoesNotExist:
-                cart_count = 0
+            # Denormalized count for logged-in users, normally served from cache
+            from apps.cart.services.badge import get_item_count
+            cart_count = get_item_count(request.user.pk)
         elif hasattr(request, 'session') and 'cart' in request.session:
             # Session cart for anonymous users
             cart_count = sum(item.get('quantity', 0) for item in request.session['cart'].values())
@@ -0,0 +1,248 @@
+"""
+Database-backed job queue.
+
+@shared_task turns a function into a Task: calling it runs it inline,
+.delay() and .apply_async() store a Job row (in the caller's transaction)
+that the run_worker command executes. This keeps the Celery calling
+convention used in the apps' tasks.py modules without a broker.
+
+Workers claim due jobs with SELECT ... FOR UPDATE SKIP LOCKED where the
+database supports it. On SQLite, which serializes writers, the claim is a
+conditional UPDATE on status that only one worker can win. A claimed job
+carries a lease (per task, LEASE_SECONDS by default) that a heartbeat
+thread renews while the job runs, so a long job is not handed to a second
+worker. Jobs whose worker died are requeued when the lease expires, or
+marked failed once they have used up max_attempts. Failed jobs are retried
+with exponential backoff up to max_attempts.
+
+Periodic tasks are listed in settings.JOB_SCHEDULE as
+    {'name': {'task': 'dotted.path.to.task', 'every': seconds}}
+and enqueued by whichever worker first advances the schedule's
+next_run_at.
+"""
+
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+from functools import update_wrapper
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules, import_string
+
+from apps.core.models import Job, JobSchedule
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10
+LEASE_SECONDS = 600
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 60 * 60
+
+_registry: Dict[str, 'Task'] = {}
+
+
+class Task:
+    def __init__(self, func, name: Optional[str] = None, max_attempts: int = 3,
+                 lease_seconds: int = LEASE_SECONDS):
+        self.func = func
+        self.name = name or f'{func.__module__}.{func.__qualname__}'
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        update_wrapper(self, func)
+        _registry[self.name] = self
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs) -> Job:
+        return self.apply_async(args=args, kwargs=kwargs)
+
+    def apply_async(self, args=None, kwargs=None, countdown=None, eta=None) -> Job:
+        """Queue the task; `countdown` (seconds) or `eta` delay its first run"""
+        run_at = eta or timezone.now()
+        if countdown:
+            run_at += timedelta(seconds=countdown)
+        return Job.objects.create(
+            task=self.name,
+            args=list(args or ()),
+            kwargs=dict(kwargs or {}),
+            run_at=run_at,
+            max_attempts=self.max_attempts,
+        )
+
+
+def shared_task(func=None, *, name: Optional[str] = None, max_attempts: int = 3,
+                lease_seconds: int = LEASE_SECONDS):
+    """Register a function as a task; usable as @shared_task or @shared_task(...)"""
+    def decorator(func):
+        return Task(func, name=name, max_attempts=max_attempts, lease_seconds=lease_seconds)
+    return decorator(func) if func is not None else decorator
+
+
+def get_task(name: str) -> Task:
+    if name not in _registry:
+        autodiscover_modules('tasks')
+    if name not in _registry:
+        import_string(name)
+    return _registry[name]
+
+
+def worker_name() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def requeue_expired() -> int:
+    """
+    Return jobs of workers that died mid-run to the queue; jobs that have
+    used up their attempts are failed instead. Returns the number requeued.
+    """
+    now = timezone.now()
+    expired = Job.objects.filter(status='running', locked_until__lt=now)
+    failed = expired.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', finished_at=now, locked_by='', locked_until=None,
+        last_error='Lease expired before the job finished'
+    )
+    if failed:
+        logger.error(f'{failed} job(s) failed after their last attempt outlived its lease')
+    return expired.update(status='queued', locked_by='', locked_until=None)
+
+
+def _owned(job: Job):
+    """The job's row, as long as this worker still holds it"""
+    return Job.objects.filter(pk=job.pk, status='running', locked_by=job.locked_by)
+
+
+def renew_lease(job: Job, seconds: int) -> bool:
+    """Extend the lease of a running job; False if another worker has taken it"""
+    return bool(_owned(job).update(locked_until=timezone.now() + timedelta(seconds=seconds)))
+
+
+class LeaseHeartbeat(threading.Thread):
+    """Renews a job's lease every third of its length until stopped"""
+
+    def __init__(self, job: Job, seconds: int):
+        super().__init__(name=f'job-{job.pk}-heartbeat', daemon=True)
+        self.job = job
+        self.seconds = seconds
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.seconds / 3):
+                if not renew_lease(self.job, self.seconds):
+                    logger.warning(f'Job {self.job.pk} ({self.job.task}) lost its lease')
+                    return
+        except Exception as e:
+            logger.error(f'Lease heartbeat for job {self.job.pk} failed: {e}')
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def claim(worker: str, limit: int = BATCH_SIZE) -> List[Job]:
+    now = timezone.now()
+    lease = now + timedelta(seconds=LEASE_SECONDS)
+    with transaction.atomic():
+        due = Job.objects.filter(status='queued', run_at__lte=now)
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list('pk', flat=True)[:limit])
+        if not ids:
+            return []
+        Job.objects.filter(pk__in=ids, status='queued').update(
+            status='running', locked_by=worker, locked_until=lease, attempts=F('attempts') + 1
+        )
+    return list(Job.objects.filter(pk__in=ids, status='running', locked_by=worker, locked_until=lease))
+
+
+def run_job(job: Job) -> Optional[bool]:
+    """
+    Run a claimed job; True if it succeeded, False if it failed and None if
+    its lease ran out while it waited in the batch and another worker took it
+    """
+    heartbeat = None
+    try:
+        task = get_task(job.task)
+        if not renew_lease(job, task.lease_seconds):
+            logger.warning(f'Job {job.pk} ({job.task}) lost its lease before it started; skipped')
+            return None
+        heartbeat = LeaseHeartbeat(job, task.lease_seconds)
+        heartbeat.start()
+        task(*job.args, **job.kwargs)
+    except Exception as e:
+        if heartbeat:
+            heartbeat.stop()
+        update = {'last_error': traceback.format_exc()[-2000:], 'locked_by': '', 'locked_until': None}
+        if job.attempts >= job.max_attempts:
+            update.update(status='failed', finished_at=timezone.now())
+            logger.error(f'Job {job.pk} ({job.task}) failed after {job.attempts} attempts: {e}')
+        else:
+            update.update(status='queued', run_at=timezone.now() + retry_delay(job.attempts))
+            logger.warning(f'Job {job.pk} ({job.task}) attempt {job.attempts} failed: {e}')
+        _owned(job).update(**update)
+        return False
+
+    heartbeat.stop()
+    _owned(job).update(
+        status='done', finished_at=timezone.now(), locked_by='', locked_until=None, last_error=''
+    )
+    return True
+
+
+def enqueue_due_schedules() -> int:
+    """Queue one run of every periodic task that is due"""
+    queued = 0
+    now = timezone.now()
+    for name, entry in getattr(settings, 'JOB_SCHEDULE', {}).items():
+        JobSchedule.objects.get_or_create(name=name, defaults={'next_run_at': now})
+        with transaction.atomic():
+            advanced = JobSchedule.objects.filter(name=name, next_run_at__lte=now).update(
+                next_run_at=now + timedelta(seconds=entry['every'])
+            )
+            if advanced:
+                get_task(entry['task']).apply_async(args=entry.get('args'), kwargs=entry.get('kwargs'))
+                queued += 1
+    return queued
+
+
+def claim_elapsed(name: str) -> Optional[timedelta]:
+    """
+    Time since the previous run of the periodic task `name`, recording now
+    as its last run. Zero on the first run; None if a concurrent run of the
+    task claimed the interval first.
+    """
+    now = timezone.now()
+    schedule, _ = JobSchedule.objects.get_or_create(name=name, defaults={'next_run_at': now})
+    previous = schedule.last_run_at
+    if not JobSchedule.objects.filter(pk=schedule.pk, last_run_at=previous).update(last_run_at=now):
+        return None
+    return now - previous if previous else timedelta(0)
+
+
+def run_pending(worker: Optional[str] = None, limit: int = BATCH_SIZE):
+    """Run one batch of due jobs; returns (succeeded, failed)"""
+    worker = worker or worker_name()
+    enqueue_due_schedules()
+    requeue_expired()
+    succeeded = failed = 0
+    for job in claim(worker, limit):
+        result = run_job(job)
+        if result:
+            succeeded += 1
+        elif result is False:
+            failed += 1
+    return succeeded, failed
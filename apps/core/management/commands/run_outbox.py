@@ -0,0 +1,54 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.core.outbox import BATCH_SIZE, send_pending
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued transactional emails, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Send everything currently due and exit',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to sleep when nothing is due (default: 5)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help=f'Emails claimed per batch (default: {BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        # One SMTP connection for as long as there is mail to send
+        connection = get_connection()
+        try:
+            while True:
+                close_old_connections()
+                sent, failed = send_pending(limit=options['batch_size'], connection=connection)
+                total_sent += sent
+                total_failed += failed
+                if sent or failed:
+                    self.stdout.write(f'Sent {sent}, failed {failed}')
+                    continue
+                connection.close()
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+
+        self.stdout.write(self.style.SUCCESS(f'Outbox done. Sent: {total_sent}, Failed: {total_failed}'))
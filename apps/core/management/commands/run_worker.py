@@ -0,0 +1,78 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.utils.module_loading import autodiscover_modules
+
+from apps.core.jobs import BATCH_SIZE, run_pending, worker_name
+
+
+def work(once: bool, interval: float, batch_size: int):
+    name = worker_name()
+    try:
+        while True:
+            close_old_connections()
+            succeeded, failed = run_pending(name, batch_size)
+            if succeeded or failed:
+                continue
+            if once:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs and periodic tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='Number of worker processes (default: 1)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run everything currently due and exit',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds to sleep when no job is due (default: 2)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help=f'Jobs claimed per round (default: {BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_modules('tasks')
+        worker_args = (options['once'], options['interval'], options['batch_size'])
+
+        if options['processes'] <= 1:
+            self.stdout.write('Worker started')
+            work(*worker_args)
+            return
+
+        # Children must not share the parent's database connection
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=work, args=worker_args, daemon=True)
+            for _ in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f'Started {len(processes)} worker processes')
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.join(timeout=10)
+        self.stdout.write(self.style.SUCCESS('Workers stopped'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-17 01:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobschedule',
+            name='last_run_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
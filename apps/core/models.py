@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class BaseModel(models.Model):
@@ -111,4 +112,77 @@ class WorldwideDeliveryProduct(BaseModel):
     @property
     def available_countries(self):
         """Get list of country names where this product can be delivered"""
-        return self.countries.filter(is_active=True).values_list('name', flat=True)
\ No newline at end of file
+        return self.countries.filter(is_active=True).values_list('name', flat=True)
+
+class OutboundEmail(models.Model):
+    """Transactional email queued for delivery by the outbox sender"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+        verbose_name = "Outbound Email"
+        verbose_name_plural = "Outbound Emails"
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)}"
+
+
+class Job(models.Model):
+    """Background task invocation, run by the run_worker command"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    task = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['run_at']
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+            models.Index(fields=['status', 'locked_until']),
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
+
+
+class JobSchedule(models.Model):
+    """Next run time of a periodic task from settings.JOB_SCHEDULE"""
+    name = models.CharField(max_length=100, unique=True)
+    next_run_at = models.DateTimeField(default=timezone.now)
+    # Set by tasks that work on the time elapsed since their previous run
+    last_run_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,202 @@
+"""
+Transactional email outbox.
+
+queue_email() and queue_emails() write OutboundEmail rows in the caller's
+transaction, so a message exists exactly when the change it describes was
+committed. After commit the new row ids are queued to a single sender
+thread per process, which sends everything queued in the meantime over one
+SMTP connection. Whatever it does not deliver (queue full, process restart,
+SMTP outage) is picked up by the run_outbox command, which keeps one SMTP
+connection open while there is mail to send and retries failures with
+exponential backoff.
+
+Senders claim rows by pushing next_attempt_at forward by a lease before
+sending, so the sender threads and any number of workers never send the
+same row twice at the same time, and rows of a crashed sender become due
+again once the lease expires.
+"""
+
+import logging
+import queue
+import threading
+from datetime import timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection as db_connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 6
+LEASE_SECONDS = 300
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 6 * 60 * 60
+# Batches of ids waiting for this process's sender thread
+SENDER_QUEUE_SIZE = 1000
+
+_sender_queue = queue.Queue(maxsize=SENDER_QUEUE_SIZE)
+_sender = None
+_sender_lock = threading.Lock()
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff after the given number of failed attempts: 1, 2, 4 ... minutes"""
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def queue_email(subject: str, body: str, recipients: Iterable[str], html_body: str = '',
+                from_email: Optional[str] = None) -> OutboundEmail:
+    """Store an email for delivery once the current transaction commits"""
+    return queue_emails([OutboundEmail(
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        from_email=from_email or '',
+        recipients=list(recipients),
+    )])[0]
+
+
+def queue_emails(emails: List[OutboundEmail]) -> List[OutboundEmail]:
+    """Store a batch of unsaved emails with one INSERT"""
+    for email in emails:
+        email.from_email = email.from_email or settings.DEFAULT_FROM_EMAIL
+        email.recipients = [recipient for recipient in email.recipients if recipient]
+    emails = OutboundEmail.objects.bulk_create(emails)
+    ids = [email.pk for email in emails]
+    transaction.on_commit(lambda: dispatch(ids))
+    return emails
+
+
+def dispatch(ids: List[int]):
+    """Hand freshly committed emails to this process's sender thread"""
+    if not getattr(settings, 'OUTBOX_SEND_ON_COMMIT', True):
+        return
+    try:
+        _sender_queue.put_nowait(ids)
+    except queue.Full:
+        # The sender is behind; run_outbox delivers these
+        return
+    _start_sender()
+
+
+def _start_sender():
+    global _sender
+    with _sender_lock:
+        if _sender is None or not _sender.is_alive():
+            _sender = threading.Thread(target=_send_in_background, name='outbox-sender', daemon=True)
+            _sender.start()
+
+
+def _send_in_background():
+    while True:
+        ids = list(_sender_queue.get())
+        while True:
+            try:
+                ids.extend(_sender_queue.get_nowait())
+            except queue.Empty:
+                break
+        # Everything queued meanwhile goes out over the same connection
+        connection = get_connection()
+        try:
+            while any(send_pending(ids=ids, connection=connection)):
+                pass
+        except Exception as e:
+            logger.error(f'Outbox dispatch failed for {ids}: {str(e)}', exc_info=True)
+        finally:
+            _close_quietly(connection)
+            db_connection.close()
+
+
+def claim(ids: Optional[List[int]] = None, limit: int = BATCH_SIZE) -> List[OutboundEmail]:
+    """Lease up to `limit` due emails to this sender"""
+    now = timezone.now()
+    due = OutboundEmail.objects.filter(status='pending', next_attempt_at__lte=now)
+    if ids is not None:
+        due = due.filter(pk__in=ids)
+    candidates = list(due.values_list('pk', flat=True)[:limit])
+    if not candidates:
+        return []
+
+    lease = now + timedelta(seconds=LEASE_SECONDS)
+    # Rows another sender claimed in the meantime no longer match `due`
+    due.filter(pk__in=candidates).update(next_attempt_at=lease, attempts=F('attempts') + 1)
+    return list(OutboundEmail.objects.filter(pk__in=candidates, status='pending', next_attempt_at=lease))
+
+
+def _message(email: OutboundEmail, connection) -> EmailMultiAlternatives:
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.recipients,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception as e:
+        logger.warning(f'Error closing email connection: {str(e)}')
+
+
+def _record_failure(email: OutboundEmail, error: Exception):
+    now = timezone.now()
+    if email.attempts >= MAX_ATTEMPTS:
+        update = {'status': 'failed'}
+        logger.error(f'Giving up on email {email.pk} after {email.attempts} attempts: {error}')
+    else:
+        update = {'next_attempt_at': now + retry_delay(email.attempts)}
+        logger.warning(f'Email {email.pk} attempt {email.attempts} failed: {error}')
+    OutboundEmail.objects.filter(pk=email.pk).update(last_error=str(error)[:1000], **update)
+
+
+def send_pending(ids: Optional[List[int]] = None, limit: int = BATCH_SIZE,
+                 connection=None) -> Tuple[int, int]:
+    """
+    Send one batch of due emails; returns (sent, failed).
+    Pass an email `connection` to reuse it across batches; it is closed
+    after a connection error so the next batch reconnects.
+    """
+    emails = claim(ids, limit)
+    if not emails:
+        return 0, 0
+
+    own_connection = connection is None
+    if own_connection:
+        connection = get_connection()
+    sent, failures = [], []
+    remaining = list(emails)
+    try:
+        connection.open()
+        while remaining:
+            email = remaining.pop(0)
+            try:
+                _message(email, connection).send()
+            except Exception as e:
+                failures.append((email, e))
+            else:
+                sent.append(email.pk)
+    except Exception as e:
+        # Connecting failed; nothing left in the batch went out
+        failures.extend((email, e) for email in remaining)
+    if own_connection or failures:
+        # A shared connection may have dropped; the next batch reconnects
+        _close_quietly(connection)
+
+    if sent:
+        OutboundEmail.objects.filter(pk__in=sent).update(status='sent', sent_at=timezone.now(), last_error='')
+    for email, error in failures:
+        _record_failure(email, error)
+
+    logger.info(f'Outbox sent {len(sent)} emails, {len(failures)} failed')
+    return len(sent), len(failures)
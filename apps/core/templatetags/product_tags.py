@@ -11,31 +11,25 @@ def product_image_url(product, default_image='images/products/default.jpg'):
     Get the product image URL with fallback handling
     Supports both uploaded images (image field) and external URLs (image_url field)
     """
-    if product and hasattr(product, 'primary_image') and product.primary_image:
+    # Products and product cards carry a precomputed image URL
+    stored_url = getattr(product, 'primary_image_url', None) if product else None
+    if stored_url:
+        return stored_url
+
+    # primary_image already falls back to the first image and uses
+    # prefetched images when available
+    image = getattr(product, 'primary_image', None) if product else None
+    if image:
         try:
             # First check for image_url (CSV imported products)
-            if hasattr(product.primary_image, 'image_url') and product.primary_image.image_url:
-                return product.primary_image.image_url
+            if getattr(image, 'image_url', None):
+                return image.image_url
             # Then check for uploaded image file
-            elif hasattr(product.primary_image, 'image') and product.primary_image.image:
-                return product.primary_image.image.url
+            elif getattr(image, 'image', None):
+                return image.image.url
         except (ValueError, AttributeError):
             pass
 
-    # Fallback to first image if primary doesn't exist
-    if product and hasattr(product, 'all_images'):
-        first_image = product.all_images.first()
-        if first_image:
-            try:
-                # Check image_url first (CSV imports)
-                if hasattr(first_image, 'image_url') and first_image.image_url:
-                    return first_image.image_url
-                # Then check uploaded image
-                elif hasattr(first_image, 'image') and first_image.image:
-                    return first_image.image.url
-            except (ValueError, AttributeError):
-                pass
-
     # Final fallback to static default image
     return static(default_image)
 
@@ -0,0 +1,99 @@
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from apps.core import jobs
+from apps.core.models import Job
+
+calls = []
+
+
+@jobs.shared_task
+def record(value):
+    calls.append(value)
+
+
+@jobs.shared_task(max_attempts=2)
+def explode():
+    raise RuntimeError('boom')
+
+
+@jobs.shared_task(lease_seconds=3 * 60 * 60)
+def long_running():
+    calls.append(Job.objects.get(task='apps.core.tests_jobs.long_running').locked_until)
+
+
+@override_settings(JOB_SCHEDULE={})
+class JobQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_delayed_and_eta_jobs(self):
+        record.delay('now')
+        record.apply_async(args=['later'], countdown=3600)
+        self.assertEqual(calls, [])
+
+        self.assertEqual(jobs.run_pending('w1'), (1, 0))
+        self.assertEqual(calls, ['now'])
+        self.assertEqual(jobs.run_pending('w1'), (0, 0))
+
+        Job.objects.filter(status='queued').update(run_at=timezone.now())
+        jobs.run_pending('w1')
+        self.assertEqual(calls, ['now', 'later'])
+        self.assertEqual(set(Job.objects.values_list('status', flat=True)), {'done'})
+
+    def test_claimed_job_not_claimed_again(self):
+        record.delay('once')
+        self.assertEqual(len(jobs.claim('w1')), 1)
+        self.assertEqual(jobs.claim('w2'), [])
+
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        jobs.requeue_expired()
+        self.assertEqual([job.attempts for job in jobs.claim('w2')], [2])
+
+    def test_expired_job_on_last_attempt_is_failed(self):
+        record.delay('retry')
+        last = record.apply_async(args=['last'])
+        Job.objects.filter(pk=last.pk).update(max_attempts=1)
+        jobs.claim('w1')
+
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(jobs.requeue_expired(), 1)
+        last.refresh_from_db()
+        self.assertEqual((last.status, last.locked_by), ('failed', ''))
+        self.assertEqual(Job.objects.get(status='queued').args, ['retry'])
+
+    def test_lease_follows_the_task(self):
+        long_running.delay()
+        jobs.run_pending('w1')
+        [locked_until] = calls
+        self.assertGreater(locked_until, timezone.now() + timedelta(hours=2))
+
+    def test_job_requeued_while_waiting_in_batch_is_skipped(self):
+        record.delay('once')
+        [job] = jobs.claim('w1')
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        jobs.requeue_expired()
+        self.assertEqual(len(jobs.claim('w2')), 1)
+
+        self.assertIsNone(jobs.run_job(job))
+        self.assertEqual(calls, [])
+        self.assertEqual(Job.objects.get().locked_by, 'w2')
+
+    def test_failures_retried_then_failed(self):
+        job = explode.delay()
+        self.assertEqual(jobs.run_pending('w1'), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('queued', 1))
+        self.assertIn('RuntimeError: boom', job.last_error)
+
+        Job.objects.update(run_at=timezone.now())
+        jobs.run_pending('w1')
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+
+    @override_settings(JOB_SCHEDULE={'record': {'task': 'apps.core.tests_jobs.record', 'every': 60, 'args': ['tick']}})
+    def test_periodic_task_queued_once_per_interval(self):
+        self.assertEqual(jobs.enqueue_due_schedules(), 1)
+        self.assertEqual(jobs.enqueue_due_schedules(), 0)
+        jobs.run_pending('w1')
+        self.assertEqual(calls, ['tick'])
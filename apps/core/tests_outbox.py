@@ -0,0 +1,65 @@
+import queue
+import threading
+from datetime import timedelta
+from unittest import mock
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from apps.core import outbox
+from apps.core.models import OutboundEmail
+
+
+@override_settings(OUTBOX_SEND_ON_COMMIT=False)
+class OutboxTest(TestCase):
+    def test_emails_sent_after_commit_in_one_batch(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for index in range(3):
+                outbox.queue_email(f'Order {index}', 'Thanks', ['buyer@example.com'], html_body='<p>Thanks</p>')
+        self.assertEqual(len(callbacks), 3)
+        self.assertEqual(len(mail.outbox), 0)
+
+        call_command('run_outbox', '--once', stdout=mock.MagicMock())
+        self.assertEqual([message.subject for message in mail.outbox], ['Order 0', 'Order 1', 'Order 2'])
+        self.assertEqual(mail.outbox[0].alternatives, [('<p>Thanks</p>', 'text/html')])
+        self.assertFalse(OutboundEmail.objects.exclude(status='sent').exists())
+        self.assertEqual(outbox.send_pending(), (0, 0))
+
+    def test_failures_retried_with_backoff(self):
+        email = outbox.queue_email('Order', 'Thanks', ['buyer@example.com'])
+        with mock.patch('django.core.mail.EmailMultiAlternatives.send', side_effect=OSError('SMTP down')):
+            self.assertEqual(outbox.send_pending(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts, email.last_error), ('pending', 1, 'SMTP down'))
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        self.assertEqual(outbox.send_pending(), (0, 0))
+
+        OutboundEmail.objects.filter(pk=email.pk).update(
+            next_attempt_at=timezone.now(), attempts=outbox.MAX_ATTEMPTS - 1
+        )
+        with mock.patch('django.core.mail.EmailMultiAlternatives.send', side_effect=OSError('SMTP down')):
+            outbox.send_pending()
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'failed')
+
+    @override_settings(OUTBOX_SEND_ON_COMMIT=True)
+    def test_dispatch_feeds_a_single_sender_thread(self):
+        release = threading.Event()
+        with mock.patch.object(outbox, '_sender', None), \
+                mock.patch.object(outbox, '_sender_queue', queue.Queue()), \
+                mock.patch.object(outbox, '_send_in_background', release.wait):
+            for index in range(5):
+                outbox.dispatch([index])
+            sender = outbox._sender
+            self.assertEqual(outbox._sender_queue.qsize(), 5)
+            self.assertEqual([thread for thread in threading.enumerate() if thread.name == 'outbox-sender'], [sender])
+            release.set()
+            sender.join(1)
+
+    def test_worker_reuses_one_connection(self):
+        for index in range(3):
+            outbox.queue_email(f'Order {index}', 'Thanks', ['buyer@example.com'])
+        with mock.patch('apps.core.management.commands.run_outbox.get_connection', wraps=outbox.get_connection) as connect:
+            call_command('run_outbox', '--once', '--batch-size', '1', stdout=mock.MagicMock())
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
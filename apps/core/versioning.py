@@ -0,0 +1,115 @@
+"""
+Version stamps for cache invalidation.
+
+A version stamp is a counter kept in the shared cache. Writers bump it when
+the underlying data changes; readers fold it into cache keys, or compare it
+against the version their per-process snapshot was built from.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'version_stamp_{}'
+
+# Fallback counters for cache backends that do not store values (DummyCache)
+_local_versions = {}
+# Bumps made by this process, so local snapshots notice them immediately
+_local_bumps = {}
+
+
+def _initial_version() -> int:
+    # Time based so a stamp evicted from the cache never restarts at a
+    # value an older cache entry may still be keyed on.
+    return int(time.time() * 1000)
+
+
+def get_version(namespace: str) -> int:
+    """Current version stamp for a namespace"""
+    key = VERSION_KEY.format(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    if version is None:
+        version = _local_versions.setdefault(namespace, _initial_version())
+    return version
+
+
+def get_versions(*namespaces: str) -> Dict[str, int]:
+    """Version stamps for several namespaces in one cache round trip"""
+    keys = {VERSION_KEY.format(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(list(keys))
+    return {
+        namespace: found[key] if key in found else get_version(namespace)
+        for key, namespace in keys.items()
+    }
+
+
+def bump_version(namespace: str) -> None:
+    """Invalidate everything keyed on the namespace's version stamp"""
+    _local_bumps[namespace] = _local_bumps.get(namespace, 0) + 1
+    _local_versions[namespace] = _local_versions.get(namespace, _initial_version()) + 1
+
+    key = VERSION_KEY.format(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), timeout=None)
+    except Exception as e:
+        logger.error(f'Error bumping version stamp {namespace}: {str(e)}')
+
+
+class VersionedSnapshot:
+    """
+    Per-process value rebuilt when a namespace's version stamp changes.
+
+    The shared stamp is only read every `check_interval` seconds so that hot
+    paths serve from memory without touching the cache or the database.
+    Bumps made by the current process are picked up on the next call.
+    """
+
+    def __init__(self, namespace: str, builder: Callable[[], Any], check_interval: float = 5.0):
+        self.namespace = namespace
+        self.builder = builder
+        self.check_interval = check_interval
+        self._value = None
+        self._version = None
+        self._local_bumps = 0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _is_stale(self, now: float) -> bool:
+        return (
+            self._value is None
+            or self._local_bumps != _local_bumps.get(self.namespace, 0)
+            or now - self._checked_at >= self.check_interval
+        )
+
+    def get(self) -> Any:
+        now = time.monotonic()
+        if not self._is_stale(now):
+            return self._value
+
+        with self._lock:
+            if not self._is_stale(now):
+                return self._value
+
+            local_bumps = _local_bumps.get(self.namespace, 0)
+            version = get_version(self.namespace)
+            if self._value is None or version != self._version:
+                self._value = self.builder()
+                self._version = version
+            self._local_bumps = local_bumps
+            self._checked_at = now
+            return self._value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value = None
+            self._version = None
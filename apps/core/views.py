@@ -227,29 +227,19 @@ def home_view(request):
 def offers_view(request):
     """Display current offers and promotions"""
 
-    # Get products with discounts
-    featured_offers = Product.objects.filter(
-        is_featured=True,
-        discount_price__isnull=False,
+    # Discounted products, deepest discount first (served by product_offer_idx)
+    offers = Product.objects.filter(
         is_active=True,
+        discount_pct__gt=0,
         stock_quantity__gt=0
-    ).select_related('category').prefetch_related('images')[:12]
+    ).select_related('category').prefetch_related('images').order_by('-discount_pct', '-pk')
 
-    bestseller_offers = Product.objects.filter(
-        is_bestseller=True,
-        discount_price__isnull=False,
-        is_active=True,
-        stock_quantity__gt=0
-    ).select_related('category').prefetch_related('images')[:12]
-
-    all_offers = Product.objects.filter(
-        discount_price__isnull=False,
-        is_active=True,
-        stock_quantity__gt=0
-    ).select_related('category').prefetch_related('images')[:24]
+    featured_offers = offers.filter(is_featured=True)[:12]
+    bestseller_offers = offers.filter(is_bestseller=True)[:12]
+    all_offers = list(offers[:24])
 
     total_savings = sum([
-        (p.base_price - p.discount_price) for p in all_offers
+        max(p.mrp, p.base_price) - p.effective_price for p in all_offers
     ])
 
     context = {
@@ -257,7 +247,7 @@ def offers_view(request):
         'bestseller_offers': bestseller_offers,
         'all_offers': all_offers,
         'total_savings': total_savings,
-        'offers_count': all_offers.count(),
+        'offers_count': len(all_offers),
     }
 
     return render(request, 'core/offers.html', context)
@@ -1,5 +1,21 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
 from .models import Order, OrderItem, OrderTracking
+from .services.transitions import InvalidTransition, can_transition, transition
+
+
+class OrderAdminForm(forms.ModelForm):
+    class Meta:
+        model = Order
+        fields = '__all__'
+
+    def clean_status(self):
+        """Only changes allowed by the order state machine"""
+        status = self.cleaned_data['status']
+        old_status = self.instance.status if self.instance.pk else None
+        if old_status and status != old_status and not can_transition(old_status, status):
+            raise forms.ValidationError(str(InvalidTransition(old_status, status)))
+        return status
 
 
 class OrderItemInline(admin.TabularInline):
@@ -20,6 +36,7 @@ class OrderTrackingInline(admin.TabularInline):
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
+    form = OrderAdminForm
     list_display = ['order_number', 'user', 'assigned_seller_display', 'status', 'payment_status', 'total_amount', 'created_at']
     list_filter = ['status', 'payment_status', 'assigned_seller', 'created_at']
     search_fields = ['order_number', 'user__email', 'billing_name', 'shipping_name', 'assigned_seller__business_name']
@@ -90,18 +107,56 @@ class OrderAdmin(admin.ModelAdmin):
         self.message_user(request, f"Selected {queryset.count()} orders. Please assign sellers individually from the order detail page.")
     assign_to_seller.short_description = "Assign selected orders to seller"
     
+    def _transition_all(self, queryset, status, updated_by):
+        """Move every order that may make the change; returns how many did"""
+        updated = 0
+        for order in queryset.select_related('user'):
+            if can_transition(order.status, status) and transition(order, status, updated_by=updated_by):
+                updated += 1
+        return updated
+
     def mark_as_confirmed(self, request, queryset):
         """Bulk action to mark orders as confirmed"""
-        updated = queryset.update(status='confirmed')
+        updated = self._transition_all(queryset, 'confirmed', request.user)
         self.message_user(request, f"Successfully marked {updated} order(s) as confirmed.")
     mark_as_confirmed.short_description = "Mark as Confirmed"
     
     def mark_as_processing(self, request, queryset):
         """Bulk action to mark orders as processing"""
-        updated = queryset.update(status='processing')
+        updated = self._transition_all(queryset, 'processing', request.user)
         self.message_user(request, f"Successfully marked {updated} order(s) as processing.")
     mark_as_processing.short_description = "Mark as Processing"
 
+    def save_model(self, request, obj, form, change):
+        """Status edits go through the order state machine"""
+        new_status = obj.status
+        old_status = form.initial.get('status')
+        if change and 'status' in form.changed_data:
+            obj.status = old_status
+        super().save_model(request, obj, form, change)
+        if change and new_status != old_status:
+            try:
+                changed = transition(obj, new_status, expected=old_status, updated_by=request.user)
+            except InvalidTransition:
+                changed = False
+            if not changed:
+                # Someone else changed the status since the form was loaded
+                request._order_status_rejected = True
+                obj.refresh_from_db(fields=['status'])
+                self.message_user(
+                    request,
+                    f'The other changes were saved, but the status was not changed: the order is now '
+                    f'{obj.get_status_display()}.',
+                    level=messages.ERROR
+                )
+
+    def message_user(self, request, message, *args, **kwargs):
+        # Skip the "changed successfully" message after a rejected status edit
+        level = args[0] if args else kwargs.get('level', messages.INFO)
+        if getattr(request, '_order_status_rejected', False) and level == messages.SUCCESS:
+            return
+        super().message_user(request, message, *args, **kwargs)
+
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
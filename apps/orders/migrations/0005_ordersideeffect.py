@@ -0,0 +1,27 @@
+# Generated by Django 5.0.7 on 2026-10-17 01:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_coupon_order_coupon_discount_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderSideEffect',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='e.g. delivered:bonus_coins', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='side_effects', to='orders.order')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='ordersideeffect',
+            constraint=models.UniqueConstraint(fields=('order', 'key'), name='unique_order_side_effect'),
+        ),
+    ]
@@ -121,6 +121,8 @@ class OrderTracking(BaseModel):
     status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
     message = models.TextField()
     location = models.CharField(max_length=200, blank=True)
+    # Who made the change; empty for automatic changes (payments, jobs)
+    updated_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
 
     class Meta:
         ordering = ['-created_at']
@@ -130,6 +132,22 @@ class OrderTracking(BaseModel):
     
 
 
+class OrderSideEffect(models.Model):
+    """Side effect of an order status change that has already been carried out"""
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='side_effects')
+    key = models.CharField(max_length=100, help_text="e.g. delivered:bonus_coins")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['order', 'key'], name='unique_order_side_effect'),
+        ]
+
+    def __str__(self):
+        return f"{self.order.order_number} - {self.key}"
+
+
+
 # Add to apps/orders/models.py (at the end)
 
 from django.core.validators import MinValueValidator, MaxValueValidator
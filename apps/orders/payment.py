@@ -1,12 +1,18 @@
 # Complete Payment Webhook Handlers
 # Replace the webhook handler section in apps/orders/payment.py
 
+import json
 import logging
+import razorpay
 from django.core.mail import send_mail
+from django.http import JsonResponse
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.utils import timezone
 
+from .models import Order
+from .services.transitions import InvalidTransition, transition
+
 logger = logging.getLogger(__name__)
 
 def handle_razorpay_webhook(request):
@@ -77,25 +83,36 @@ def handle_payment_captured(data):
         
         logger.info(f'Payment captured: {payment_id} for order: {order_id}')
         
-        # Find the order
-        try:
-            order = Order.objects.get(order_number=order_id)
-        except Order.DoesNotExist:
+        order = Order.objects.filter(razorpay_order_id=order_id).first()
+        if order is None:
             logger.error(f'Order not found: {order_id}')
             return JsonResponse({'status': 'error', 'message': 'Order not found'}, status=404)
         
-        # Update order status
-        order.payment_status = 'paid'
-        order.status = 'confirmed'
-        order.save()
-        
-        # Create order tracking entry
-        OrderTracking.objects.create(
-            order=order,
-            status='confirmed',
-            message=f'Payment successful. Payment ID: {payment_id}',
-            location='Online'
-        )
+        # The checkout verify view normally confirms the order before this
+        # event arrives; only an order still awaiting payment is confirmed,
+        # so redelivered events change nothing
+        try:
+            confirmed = transition(
+                order,
+                'confirmed',
+                message=f'Payment successful. Payment ID: {payment_id}',
+                location='Online',
+                expected='pending',
+                payment_status='paid',
+                razorpay_payment_id=payment_id,
+            )
+        except InvalidTransition:
+            confirmed = False
+        if not confirmed:
+            # An authorized order already moved on to processing; just record the payment
+            recorded = Order.objects.filter(pk=order.pk, status='processing').exclude(payment_status='paid').update(
+                payment_status='paid', razorpay_payment_id=payment_id, updated_at=timezone.now()
+            )
+            if not recorded and order.status == 'cancelled':
+                logger.warning(f'Payment {payment_id} captured for cancelled order {order.order_number}; refund it')
+            else:
+                logger.info(f'Order {order.order_number} already confirmed, ignoring {payment_id}')
+            return JsonResponse({'status': 'success', 'message': 'Payment already recorded'}, status=200)
         
         # Send confirmation email
         send_payment_confirmation_email(order, payment_id, amount)
@@ -131,26 +148,23 @@ def handle_payment_failed(data):
         
         # Try to find the order
         try:
-            order = Order.objects.get(order_number=order_id)
-            
-            # Update order status
-            order.payment_status = 'failed'
-            order.status = 'cancelled'
-            order.save()
+            order = Order.objects.get(razorpay_order_id=order_id)
             
-            # Create order tracking entry
-            OrderTracking.objects.create(
-                order=order,
-                status='cancelled',
+            # Cancel the order; redelivered events find it cancelled already
+            if order.payment_status != 'paid' and transition(
+                order,
+                'cancelled',
                 message=f'Payment failed. Reason: {error_description}',
-                location='Online'
-            )
-            
-            # Send payment failure email
-            send_payment_failure_email(order, error_description)
-            
-            logger.info(f'Order {order_id} marked as payment failed')
-        
+                location='Online',
+                payment_status='failed',
+            ):
+                # Send payment failure email
+                send_payment_failure_email(order, error_description)
+                
+                logger.info(f'Order {order_id} marked as payment failed')
+        
+        except InvalidTransition as e:
+            logger.warning(f'Ignoring payment failure for order {order_id}: {e}')
         except Order.DoesNotExist:
             logger.error(f'Order not found for failed payment: {order_id}')
         
@@ -178,22 +192,17 @@ def handle_payment_authorized(data):
         logger.info(f'Payment authorized: {payment_id} for order: {order_id}')
         
         try:
-            order = Order.objects.get(order_number=order_id)
+            order = Order.objects.get(razorpay_order_id=order_id)
             
-            # Update order status to processing
-            order.payment_status = 'pending'
-            order.status = 'processing'
-            order.save()
-            
-            # Create order tracking entry
-            OrderTracking.objects.create(
-                order=order,
-                status='processing',
+            # Only orders still awaiting payment move to processing
+            if transition(
+                order,
+                'processing',
                 message=f'Payment authorized and being processed. Payment ID: {payment_id}',
-                location='Online'
-            )
-            
-            logger.info(f'Order {order_id} marked as payment authorized')
+                location='Online',
+                expected='pending',
+            ):
+                logger.info(f'Order {order_id} marked as payment authorized')
         
         except Order.DoesNotExist:
             logger.error(f'Order not found: {order_id}')
@@ -5,7 +5,8 @@ from django.conf import settings
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from .models import Order, OrderTracking
+from .models import Order
+from .services.transitions import InvalidTransition, transition
 
 logger = logging.getLogger(__name__)
 
@@ -178,22 +179,30 @@ def verify_payment(request):
                 'message': 'Order not found'
             }, status=404)
 
-        # Update order with payment details
-        order.razorpay_order_id = razorpay_order_id
-        order.razorpay_payment_id = razorpay_payment_id
-        order.razorpay_signature = razorpay_signature
-        order.payment_status = 'paid'
-        order.payment_method = 'razorpay'
-        order.status = 'confirmed'
-        order.save()
-
-        # Create tracking entry
-        OrderTracking.objects.create(
-            order=order,
-            status='confirmed',
-            message=f'Payment successful via Razorpay. Payment ID: {razorpay_payment_id}',
-            location='Online'
-        )
+        # Confirm the order with its payment details in one write
+        payment_fields = {
+            'razorpay_order_id': razorpay_order_id,
+            'razorpay_payment_id': razorpay_payment_id,
+            'razorpay_signature': razorpay_signature,
+            'payment_status': 'paid',
+            'payment_method': 'razorpay',
+        }
+        try:
+            confirmed = transition(
+                order,
+                'confirmed',
+                message=f'Payment successful via Razorpay. Payment ID: {razorpay_payment_id}',
+                location='Online',
+                **payment_fields
+            )
+        except InvalidTransition as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=409)
+        if not confirmed:
+            # Already confirmed elsewhere; still record the payment
+            Order.objects.filter(pk=order.pk).update(**payment_fields)
 
         logger.info(f'Order {order_number} payment verified and confirmed')
 
@@ -250,18 +259,21 @@ def payment_failed(request):
                 'message': 'Order not found'
             }, status=404)
 
-        # Update order status
-        order.payment_status = 'failed'
-        order.status = 'cancelled'
-        order.save()
-
-        # Create tracking entry
-        OrderTracking.objects.create(
-            order=order,
-            status='cancelled',
-            message=f'Payment failed. Error: {error_description} (Code: {error_code})',
-            location='Online'
-        )
+        # Cancel unpaid orders only
+        try:
+            if order.payment_status != 'paid':
+                transition(
+                    order,
+                    'cancelled',
+                    message=f'Payment failed. Error: {error_description} (Code: {error_code})',
+                    location='Online',
+                    payment_status='failed',
+                )
+        except InvalidTransition as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=409)
 
         logger.warning(f'Order {order_number} payment failed: {error_description}')
 
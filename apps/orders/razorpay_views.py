@@ -9,9 +9,31 @@ from decimal import Decimal
 import json
 import razorpay
 
-from .models import Order, OrderItem, OrderTracking
 from apps.cart.models import Cart
+from apps.products.services.inventory import InsufficientStock, check_stock, lines_from_cart
 from apps.users.models import Address
+from .services.checkout import create_order_from_cart, refund_out_of_stock_payment, stock_error_response
+
+
+def address_fields(address, email):
+    """Billing and shipping Order fields, both taken from one saved address"""
+    return {
+        'billing_name': address.full_name,
+        'billing_email': email,
+        'billing_phone': address.phone,
+        'billing_address_line_1': address.address_line_1,
+        'billing_address_line_2': address.address_line_2,
+        'billing_city': address.city,
+        'billing_state': address.state,
+        'billing_pincode': address.pincode,
+        'shipping_name': address.full_name,
+        'shipping_phone': address.phone,
+        'shipping_address_line_1': address.address_line_1,
+        'shipping_address_line_2': address.address_line_2,
+        'shipping_city': address.city,
+        'shipping_state': address.state,
+        'shipping_pincode': address.pincode,
+    }
 
 
 @login_required
@@ -23,16 +45,22 @@ def create_razorpay_order(request):
 
         # Get cart
         cart = Cart.objects.get(user=request.user)
-        cart_items = cart.items.all()
+        priced = cart.priced()
 
-        if not cart_items.exists():
+        if not priced:
             return JsonResponse({
                 'success': False,
                 'message': 'Your cart is empty'
             }, status=400)
 
+        # Don't take payment for a cart that can't be fulfilled
+        try:
+            check_stock(lines_from_cart(priced.items))
+        except InsufficientStock as e:
+            return stock_error_response(e)
+
         # Calculate total
-        subtotal = sum(item.total_price for item in cart_items)
+        subtotal = priced.subtotal
         delivery_charge = Decimal(data.get('delivery_charge', '0.00'))
         total_amount = subtotal + delivery_charge
 
@@ -97,9 +125,9 @@ def verify_razorpay_payment(request):
 
         # Payment verified, create order
         cart = Cart.objects.get(user=request.user)
-        cart_items = cart.items.select_related('product', 'variant').all()
+        priced = cart.priced()
 
-        if not cart_items.exists():
+        if not priced:
             return JsonResponse({
                 'success': False,
                 'message': 'Your cart is empty'
@@ -124,73 +152,27 @@ def verify_razorpay_payment(request):
                 is_default=data.get('is_default', False)
             )
 
-        # Calculate totals
-        subtotal = sum(item.total_price for item in cart_items)
-        delivery_charge = Decimal(data.get('delivery_charge', '0.00'))
-        total_amount = subtotal + delivery_charge
-
-        # Create order
-        order = Order.objects.create(
-            user=request.user,
-            status='confirmed',
-            payment_status='paid',
-            payment_method='razorpay',
-            razorpay_order_id=razorpay_order_id,
-            razorpay_payment_id=razorpay_payment_id,
-
-            # Billing info
-            billing_name=address.full_name,
-            billing_email=request.user.email,
-            billing_phone=address.phone,
-            billing_address_line_1=address.address_line_1,
-            billing_address_line_2=address.address_line_2,
-            billing_city=address.city,
-            billing_state=address.state,
-            billing_pincode=address.pincode,
-
-            # Shipping info
-            shipping_name=address.full_name,
-            shipping_phone=address.phone,
-            shipping_address_line_1=address.address_line_1,
-            shipping_address_line_2=address.address_line_2,
-            shipping_city=address.city,
-            shipping_state=address.state,
-            shipping_pincode=address.pincode,
-
-            # Pricing
-            subtotal=subtotal,
-            delivery_charge=delivery_charge,
-            total_amount=total_amount,
-
-            # Delivery details
-            special_instructions=data.get('special_instructions', ''),
-            delivery_date=data.get('delivery_date'),
-            delivery_time_slot=data.get('delivery_time_slot', ''),
-        )
-
-        # Create order items
-        for cart_item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                product=cart_item.product,
-                variant=cart_item.variant,
-                product_name=cart_item.product.name,
-                variant_name=cart_item.variant.name if cart_item.variant else '',
-                quantity=cart_item.quantity,
-                unit_price=cart_item.unit_price,
-                total_price=cart_item.total_price
+        try:
+            order = create_order_from_cart(
+                cart,
+                [('confirmed', 'Order confirmed and payment received')],
+                priced=priced,
+                delivery_charge=Decimal(data.get('delivery_charge', '0.00')),
+                status='confirmed',
+                payment_status='paid',
+                payment_method='razorpay',
+                razorpay_order_id=razorpay_order_id,
+                razorpay_payment_id=razorpay_payment_id,
+
+                **address_fields(address, request.user.email),
+
+                # Delivery details
+                special_instructions=data.get('special_instructions', ''),
+                delivery_date=data.get('delivery_date'),
+                delivery_time_slot=data.get('delivery_time_slot', ''),
             )
-
-        # Create tracking entry
-        OrderTracking.objects.create(
-            order=order,
-            status='confirmed',
-            message='Order confirmed and payment received',
-            location=address.city
-        )
-
-        # Clear cart
-        cart_items.delete()
+        except InsufficientStock as e:
+            return refund_out_of_stock_payment(razorpay_payment_id, e)
 
         return JsonResponse({
             'success': True,
@@ -216,9 +198,9 @@ def process_cod_order(request):
 
         # Get cart
         cart = Cart.objects.get(user=request.user)
-        cart_items = cart.items.select_related('product', 'variant').prefetch_related('addons').all()
+        priced = cart.priced()
 
-        if not cart_items.exists():
+        if not priced:
             return JsonResponse({
                 'success': False,
                 'message': 'Your cart is empty'
@@ -243,74 +225,25 @@ def process_cod_order(request):
                 is_default=data.get('is_default', False)
             )
 
-        # Calculate totals
-        subtotal = sum(item.total_price for item in cart_items)
-        delivery_charge = Decimal(data.get('delivery_charge', '0.00'))
-        total_amount = subtotal + delivery_charge
-
-        # Create order
-        order = Order.objects.create(
-            user=request.user,
-            status='pending',
-            payment_status='pending',
-            payment_method='cod',
-
-            # Billing info
-            billing_name=address.full_name,
-            billing_email=request.user.email,
-            billing_phone=address.phone,
-            billing_address_line_1=address.address_line_1,
-            billing_address_line_2=address.address_line_2,
-            billing_city=address.city,
-            billing_state=address.state,
-            billing_pincode=address.pincode,
-
-            # Shipping info
-            shipping_name=address.full_name,
-            shipping_phone=address.phone,
-            shipping_address_line_1=address.address_line_1,
-            shipping_address_line_2=address.address_line_2,
-            shipping_city=address.city,
-            shipping_state=address.state,
-            shipping_pincode=address.pincode,
-
-            # Pricing
-            subtotal=subtotal,
-            delivery_charge=delivery_charge,
-            total_amount=total_amount,
-
-            # Delivery details
-            special_instructions=data.get('special_instructions', ''),
-            delivery_date=data.get('delivery_date'),
-            delivery_time_slot=data.get('delivery_time_slot', ''),
-        )
-
-        # Create order items
-        for cart_item in cart_items:
-            order_item = OrderItem.objects.create(
-                order=order,
-                product=cart_item.product,
-                variant=cart_item.variant,
-                product_name=cart_item.product.name,
-                variant_name=cart_item.variant.name if cart_item.variant else '',
-                quantity=cart_item.quantity,
-                unit_price=cart_item.unit_price,
-                total_price=cart_item.total_price
+        try:
+            order = create_order_from_cart(
+                cart,
+                [('pending', 'Order placed successfully - Cash on Delivery')],
+                priced=priced,
+                delivery_charge=Decimal(data.get('delivery_charge', '0.00')),
+                status='pending',
+                payment_status='pending',
+                payment_method='cod',
+
+                **address_fields(address, request.user.email),
+
+                # Delivery details
+                special_instructions=data.get('special_instructions', ''),
+                delivery_date=data.get('delivery_date'),
+                delivery_time_slot=data.get('delivery_time_slot', ''),
             )
-            # Add addons to order item if any
-            if cart_item.addons.exists():
-                order_item.addons.set(cart_item.addons.all())
-
-        # Create tracking entry
-        OrderTracking.objects.create(
-            order=order,
-            status='pending',
-            message='Order placed successfully - Cash on Delivery',
-            location=address.city
-        )
-
-        # Clear cart
-        cart_items.delete()
+        except InsufficientStock as e:
+            return stock_error_response(e)
 
         return JsonResponse({
             'success': True,
@@ -11,6 +11,7 @@ from django.utils import timezone
 from datetime import timedelta
 
 from .models import Order, OrderTracking
+from .services.transitions import InvalidTransition, transition
 from apps.users.models import Seller
 
 
@@ -127,17 +128,16 @@ def seller_update_order_status(request, order_number):
         return redirect('orders:seller_order_detail', order_number=order_number)
     
     # Update order status
-    old_status = order.status
-    order.status = new_status
-    order.save()
-    
-    # Create tracking entry
-    OrderTracking.objects.create(
-        order=order,
-        status=new_status,
-        message=notes or f'Order status changed from {order.get_status_display()} to {dict(Order.STATUS_CHOICES)[new_status]}',
-        updated_by=request.user
-    )
+    try:
+        changed = transition(order, new_status, message=notes, updated_by=request.user)
+    except InvalidTransition as e:
+        messages.error(request, str(e))
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({'success': False, 'message': str(e)}, status=400)
+        return redirect('orders:seller_order_detail', order_number=order_number)
+    if not changed:
+        messages.info(request, 'Order status was already updated')
+        return redirect('orders:seller_order_detail', order_number=order_number)
     
     messages.success(request, f'Order status updated to {dict(Order.STATUS_CHOICES)[new_status]}')
     
@@ -0,0 +1,132 @@
+"""
+Order creation from a cart.
+
+Every checkout path (multi-step COD/online, Razorpay verify, one-page COD)
+goes through create_order_from_cart(). The cart is priced once, stock is
+reserved, the order row is inserted once in its final status, and the order
+lines and tracking entries are written with one bulk INSERT each. The cart
+is then emptied, all in the caller's transaction.
+
+Online payments check stock before the customer is sent to pay; if it runs
+out before the paid order is created, the payment is refunded.
+"""
+
+import logging
+from decimal import Decimal
+from typing import Iterable, Tuple
+
+from django.db import transaction
+from django.http import JsonResponse
+
+from apps.cart.services.badge import set_item_count
+from apps.orders.models import Order, OrderItem, OrderTracking
+from apps.orders.services.notifications import queue_order_created_emails
+from apps.products.services.inventory import lines_from_cart, reserve_stock
+from apps.products.services.popularity import record_order_lines
+
+logger = logging.getLogger(__name__)
+
+
+class EmptyCart(Exception):
+    pass
+
+
+def build_order_items(order: Order, priced) -> list:
+    """Unsaved order lines for a priced cart; add-on prices are part of the line total"""
+    return [
+        OrderItem(
+            order=order,
+            product=line.item.product,
+            variant=line.item.variant,
+            product_name=line.item.product.name,
+            variant_name=line.item.variant.name if line.item.variant else '',
+            quantity=line.quantity,
+            unit_price=line.unit_price,
+            total_price=line.total_price,
+        )
+        for line in priced.lines
+    ]
+
+
+def create_order_from_cart(cart, tracking: Iterable[Tuple[str, str]], priced=None,
+                           delivery_charge=Decimal('0.00'), **order_fields) -> Order:
+    """
+    Materialize a cart as an order.
+
+    `tracking` is a sequence of (status, message) entries, oldest first;
+    the remaining keyword arguments are Order fields (status, payment and
+    address details). Raises EmptyCart or inventory.InsufficientStock.
+    """
+    priced = priced or cart.priced()
+    if not priced:
+        raise EmptyCart
+
+    with transaction.atomic():
+        reserve_stock(lines_from_cart(priced.items))
+
+        order = Order(
+            user=cart.user,
+            subtotal=priced.subtotal,
+            delivery_charge=delivery_charge,
+            total_amount=priced.subtotal + delivery_charge,
+            **order_fields
+        )
+        # The confirmation email lists the order lines, so it is queued below
+        order._defer_created_emails = True
+        order.save()
+
+        items = OrderItem.objects.bulk_create(build_order_items(order, priced))
+        OrderTracking.objects.bulk_create([
+            OrderTracking(order=order, status=status, message=message, location=order.shipping_city)
+            for status, message in tracking
+        ])
+        # bulk_create skips the per-line post_save handler
+        record_order_lines(items)
+        try:
+            # A savepoint, so a failed email cannot take the order down with it
+            with transaction.atomic():
+                queue_order_created_emails(order, items)
+        except Exception as e:
+            logger.error(f'Error queueing order creation emails: {str(e)}', exc_info=True)
+
+        cart.items.all().delete()
+        set_item_count(cart, 0)
+
+    logger.info(f'Created order {order.order_number} with {len(items)} items')
+    return order
+
+
+def stock_error_response(error, message: str = '', **extra) -> JsonResponse:
+    """409 response listing the cart lines that are short of stock"""
+    return JsonResponse({
+        'success': False,
+        'message': message or str(error) or 'Some items in your cart are no longer available',
+        'shortages': [
+            {
+                'product_id': shortage.line.product_id,
+                'variant_id': shortage.line.variant_id,
+                'requested': shortage.line.quantity,
+                'available': shortage.available,
+                'message': str(shortage),
+            }
+            for shortage in error.shortages
+        ],
+        **extra
+    }, status=409)
+
+
+def refund_out_of_stock_payment(payment_id: str, error) -> JsonResponse:
+    """
+    Stock ran out between the pre-payment check and the captured payment:
+    refund it in full and answer with the stock error.
+    """
+    from apps.orders.razorpay_handler import RazorpayHandler
+
+    logger.error(f'Payment {payment_id} captured but the cart can no longer be covered: {error}')
+    refund = RazorpayHandler().refund_payment(payment_id)
+    if refund['success']:
+        message = f'{error}. Your payment has been refunded in full.'
+    else:
+        logger.critical(f'Refund of payment {payment_id} failed, refund it manually: {refund["error"]}')
+        message = f'{error}. Your payment will be refunded; please quote payment ID {payment_id}.'
+    return stock_error_response(error, message, payment_id=payment_id, refunded=refund['success'])
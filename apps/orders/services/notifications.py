@@ -0,0 +1,104 @@
+"""
+Order emails.
+
+Messages are rendered here and written to the core email outbox in the
+caller's transaction; nothing in this module talks to SMTP.
+"""
+
+import logging
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from apps.core.outbox import queue_email
+
+logger = logging.getLogger(__name__)
+
+STATUS_MESSAGES = {
+    'pending': 'Your order is pending confirmation.',
+    'confirmed': '✅ Your order has been confirmed and is being processed!',
+    'processing': '📦 Your order is being prepared for shipment.',
+    'shipped': '🚚 Great news! Your order has been shipped.',
+    'delivered': '🎉 Your order has been delivered! Enjoy your purchase!',
+    'cancelled': '❌ Your order has been cancelled.',
+}
+
+
+def queue_order_created_emails(order, items=None):
+    """
+    Order confirmation to the customer and new-order alert to the admin.
+    Pass `items` (order lines with products attached) to skip reloading them.
+    """
+    if items is None:
+        items = order.items.select_related('product')
+
+    # 1. Order confirmation to CUSTOMER
+    html_message_customer = render_to_string('emails/order_confirmation.html', {
+        'order': order,
+        'items': items,
+        'site_name': getattr(settings, 'SITE_NAME', 'GiftTree'),
+        'site_url': getattr(settings, 'SITE_DOMAIN', 'https://mygiftstree.com'),
+    })
+    queue_email(
+        subject=f'Order Placed Successfully - #{order.order_number}',
+        body=f'Thank you for your order! Order Number: #{order.order_number}',
+        html_body=html_message_customer,
+        recipients=[order.billing_email],
+    )
+
+    # 2. New order notification to ADMIN
+    admin_message = f"""
+New Order Alert!
+
+Order Number: #{order.order_number}
+Customer: {order.billing_name}
+Email: {order.billing_email}
+Phone: {order.billing_phone}
+Total Amount: ₹{order.total_amount}
+Payment Method: {order.payment_method.upper()}
+Payment Status: {order.payment_status.upper()}
+
+Delivery Address:
+{order.shipping_address_line_1}
+{order.shipping_address_line_2 or ''}
+{order.shipping_city}, {order.shipping_state} - {order.shipping_pincode}
+
+Please log in to the admin panel to process this order:
+https://mygiftstree.com/admin/orders/order/{order.id}/change/
+
+---
+MyGiftTree Admin System
+"""
+    queue_email(
+        subject=f'🎁 New Order Received - #{order.order_number}',
+        body=admin_message,
+        recipients=[settings.ADMIN_EMAIL],
+    )
+    logger.info(f'Queued order creation emails for order {order.order_number}')
+
+
+def queue_status_update_email(order, old_status):
+    status_message = STATUS_MESSAGES.get(order.status, f'Your order status has been updated to {order.status}.')
+    tracking_number = getattr(order, 'tracking_number', '')
+    message = f"""
+Hi {order.billing_name},
+
+{status_message}
+
+Order Number: #{order.order_number}
+Status: {order.status.upper()}
+{'Tracking Number: ' + tracking_number if tracking_number else ''}
+
+View your order: https://mygiftstree.com/orders/{order.order_number}/
+
+Thank you for shopping with MyGiftTree!
+
+Best regards,
+MyGiftTree Team
+"""
+    queue_email(
+        subject=f'Order Status Update - #{order.order_number}',
+        body=message,
+        recipients=[order.billing_email],
+    )
+    logger.info(f'Queued status update email for order {order.order_number}: {old_status} → {order.status}')
@@ -0,0 +1,142 @@
+"""
+Order status state machine.
+
+Status changes go through transition(), never through Order.save(). It
+checks the change against TRANSITIONS, writes it with one conditional
+UPDATE ... WHERE status = <old>, so of two concurrent changes from the
+same status only one wins, and then records a tracking row and runs the
+side effects of the new status. Each side effect (status email, stock
+release on cancellation, delivery bonus coins, feedback request) is keyed in OrderSideEffect and runs at
+most once per order and status, even when a status is re-entered or a
+request is retried.
+"""
+
+import logging
+from typing import Callable, Optional
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.orders.models import Order, OrderSideEffect, OrderTracking
+
+logger = logging.getLogger(__name__)
+
+TRANSITIONS = {
+    'pending': {'confirmed', 'processing', 'cancelled'},
+    'confirmed': {'processing', 'ready_to_ship', 'shipped', 'cancelled'},
+    'processing': {'ready_to_ship', 'shipped', 'cancelled'},
+    'ready_to_ship': {'shipped', 'out_for_delivery', 'cancelled'},
+    'shipped': {'out_for_delivery', 'delivered'},
+    'out_for_delivery': {'delivered', 'shipped'},
+    'delivered': {'refunded'},
+    'cancelled': {'refunded'},
+    'refunded': set(),
+}
+
+FEEDBACK_DELAY_SECONDS = 24 * 60 * 60
+
+
+class InvalidTransition(ValueError):
+    def __init__(self, old_status, new_status):
+        self.old_status = old_status
+        self.new_status = new_status
+        super().__init__(f'Cannot change order status from {old_status} to {new_status}')
+
+
+def can_transition(old_status: str, new_status: str) -> bool:
+    return new_status in TRANSITIONS.get(old_status, ())
+
+
+def run_once(order: Order, key: str, effect: Callable[[], None]) -> bool:
+    """Run `effect` unless it already ran for this order; False if skipped or failed"""
+    try:
+        with transaction.atomic():
+            OrderSideEffect.objects.create(order=order, key=key)
+            effect()
+    except IntegrityError:
+        return False
+    except Exception as e:
+        logger.error(f'Order {order.order_number} side effect {key} failed: {str(e)}', exc_info=True)
+        return False
+    return True
+
+
+def _credit_delivery_bonus(order: Order):
+    # 10% of order value as bonus coins (max 50 coins)
+    bonus_coins = min(int(order.total_amount / 10), 50)
+    if bonus_coins > 0:
+        order.user.wallet.add_coins(
+            amount=bonus_coins,
+            description=f"Bonus coins for order #{order.order_number}",
+            key=f"order:{order.order_number}:delivery_bonus",
+        )
+
+
+def _release_stock(order: Order):
+    from apps.products.services.inventory import StockLine, release_stock
+
+    release_stock([
+        StockLine(product_id, quantity, variant_id)
+        for product_id, variant_id, quantity in order.items.values_list('product_id', 'variant_id', 'quantity')
+    ])
+
+
+def _schedule_feedback_request(order: Order):
+    from apps.orders.tasks import send_feedback_request_email
+
+    send_feedback_request_email.apply_async(args=[order.id], countdown=FEEDBACK_DELAY_SECONDS)
+
+
+def run_side_effects(order: Order, old_status: str):
+    from apps.orders.services.notifications import queue_status_update_email
+
+    status = order.status
+    run_once(order, f'{status}:status_email', lambda: queue_status_update_email(order, old_status))
+    if status == 'cancelled':
+        run_once(order, 'cancelled:release_stock', lambda: _release_stock(order))
+    if status == 'delivered':
+        run_once(order, 'delivered:bonus_coins', lambda: _credit_delivery_bonus(order))
+        if not order.feedback_email_sent:
+            run_once(order, 'delivered:feedback_request', lambda: _schedule_feedback_request(order))
+
+
+def transition(order: Order, new_status: str, message: str = '', location: str = '',
+               expected: Optional[str] = None, updated_by=None, **fields) -> bool:
+    """
+    Move an order to `new_status`, writing `fields` in the same UPDATE.
+
+    `expected` is the status the caller saw (defaults to order.status);
+    `updated_by` is the user making the change, recorded on the tracking row.
+    Returns False without writing if the order is already in `new_status`
+    or was changed concurrently; raises InvalidTransition if the change is
+    not allowed.
+    """
+    old_status = expected or order.status
+    if old_status == new_status:
+        return False
+    if not can_transition(old_status, new_status):
+        raise InvalidTransition(old_status, new_status)
+
+    with transaction.atomic():
+        updated = Order.objects.filter(pk=order.pk, status=old_status).update(
+            status=new_status, updated_at=timezone.now(), **fields
+        )
+        if not updated:
+            logger.info(f'Order {order.order_number} left {old_status} before it could become {new_status}')
+            return False
+
+        order.status = new_status
+        for name, value in fields.items():
+            setattr(order, name, value)
+        OrderTracking.objects.create(
+            order=order,
+            status=new_status,
+            message=message or f'Order status changed from {dict(Order.STATUS_CHOICES)[old_status]} '
+                               f'to {dict(Order.STATUS_CHOICES)[new_status]}',
+            location=location,
+            updated_by=updated_by,
+        )
+        run_side_effects(order, old_status)
+
+    logger.info(f'Order {order.order_number}: {old_status} → {new_status}')
+    return True
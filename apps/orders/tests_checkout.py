@@ -0,0 +1,92 @@
+from decimal import Decimal
+from unittest import mock
+from django.template import TemplateSyntaxError
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from apps.cart.models import Cart, CartItem
+from apps.core.models import OutboundEmail
+from apps.orders.models import Order
+from apps.orders.services.checkout import create_order_from_cart
+from apps.orders.services.transitions import run_side_effects, transition
+from apps.products.models import Product, Category, ProductAddOn, ProductVariant
+from apps.products.services.inventory import InsufficientStock
+
+
+class CreateOrderFromCartTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='buyer', email='buyer@example.com', password='x'
+        )
+        category = Category.objects.create(name="Gifts", slug="gifts")
+        self.cart = Cart.objects.create(user=self.user)
+        card = ProductAddOn.objects.create(name='Card', price=Decimal('50'))
+        self.products = []
+        for index in range(3):
+            product = Product.objects.create(
+                name=f'Cake {index}', slug=f'cake-{index}', category=category, description='Cake',
+                base_price=Decimal('100'), stock_quantity=5, quantity=5, sku=f'CAKE{index}'
+            )
+            variant = ProductVariant.objects.create(
+                product=product, name='1kg', price_adjustment=Decimal('20'), inventory_quantity=5
+            )
+            item = CartItem.objects.create(cart=self.cart, product=product, variant=variant, quantity=2)
+            item.addons.add(card)
+            self.products.append(product)
+        self.cart.item_count = 6
+        self.cart.save()
+
+    def place(self):
+        return create_order_from_cart(
+            self.cart,
+            [('pending', 'Order placed successfully'), ('confirmed', 'Payment successful. Order confirmed.')],
+            delivery_charge=Decimal('49.00'),
+            status='confirmed', payment_status='paid',
+            billing_name='Buyer', billing_email='buyer@example.com', billing_phone='1',
+            billing_address_line_1='A', billing_city='Delhi', billing_state='Delhi', billing_pincode='110001',
+            shipping_name='Buyer', shipping_phone='1', shipping_address_line_1='A',
+            shipping_city='Delhi', shipping_state='Delhi', shipping_pincode='110001',
+        )
+
+    def test_order_written_once_with_bulk_lines(self):
+        with self.assertNumQueries(23):  # includes the email savepoint and the card stock sync
+            order = self.place()
+
+        order = Order.objects.get(pk=order.pk)
+        self.assertEqual((order.status, order.payment_status), ('confirmed', 'paid'))
+        self.assertEqual((order.subtotal, order.total_amount), (Decimal('1020.00'), Decimal('1069.00')))
+        self.assertEqual(
+            [(item.quantity, item.unit_price, item.total_price) for item in order.items.order_by('pk')],
+            [(2, Decimal('120.00'), Decimal('340.00'))] * 3
+        )
+        self.assertEqual(list(order.tracking.values_list('status', flat=True).order_by('pk')), ['pending', 'confirmed'])
+
+        self.products[0].refresh_from_db()
+        self.assertEqual(self.products[0].stock_quantity, 3)
+        self.assertEqual(self.products[0].variants.get().inventory_quantity, 3)
+        self.assertFalse(self.cart.items.exists())
+        self.assertEqual(Cart.objects.get(pk=self.cart.pk).item_count, 0)
+
+        confirmation = OutboundEmail.objects.get(recipients=['buyer@example.com'])
+        self.assertIn('Cake 2', confirmation.html_body)
+
+    def test_shortage_leaves_cart_untouched(self):
+        ProductVariant.objects.filter(product=self.products[1]).update(inventory_quantity=1, stock_quantity=1)
+        with self.assertRaises(InsufficientStock):
+            self.place()
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.cart.items.count(), 3)
+
+    def test_cancelling_returns_stock_once(self):
+        order = self.place()
+        self.assertTrue(transition(order, 'cancelled'))
+        run_side_effects(order, 'confirmed')
+
+        self.products[0].refresh_from_db()
+        self.assertEqual(self.products[0].stock_quantity, 5)
+        self.assertEqual(self.products[0].variants.get().inventory_quantity, 5)
+
+    def test_email_failure_does_not_abort_checkout(self):
+        with mock.patch('apps.orders.services.checkout.queue_order_created_emails', side_effect=TemplateSyntaxError('x')):
+            order = self.place()
+        self.assertTrue(Order.objects.filter(pk=order.pk).exists())
+        self.assertFalse(self.cart.items.exists())
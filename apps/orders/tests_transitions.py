@@ -0,0 +1,85 @@
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.forms.models import model_to_dict
+from django.test import TestCase
+from django.urls import reverse
+from apps.orders.admin import OrderAdminForm
+from apps.core.models import Job, OutboundEmail
+from apps.orders.models import Order, OrderSideEffect
+from apps.orders.payment import handle_payment_captured
+from apps.orders.services.transitions import InvalidTransition, run_side_effects, transition
+from apps.wallet.models import Wallet
+
+
+class OrderTransitionTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='buyer', email='buyer@example.com', password='x'
+        )
+        self.order = Order.objects.create(
+            user=self.user, subtotal=Decimal('300'), total_amount=Decimal('300'),
+            billing_name='Buyer', billing_email='buyer@example.com', billing_phone='1',
+            billing_address_line_1='A', billing_city='Delhi', billing_state='Delhi', billing_pincode='110001',
+            shipping_name='Buyer', shipping_phone='1', shipping_address_line_1='A',
+            shipping_city='Delhi', shipping_state='Delhi', shipping_pincode='110001',
+        )
+        OutboundEmail.objects.all().delete()
+
+    def test_routine_save_is_a_single_write(self):
+        self.order.special_instructions = 'Ring twice'
+        with self.assertNumQueries(1):
+            self.order.save()
+
+    def test_transition_is_conditional(self):
+        stale = Order.objects.get(pk=self.order.pk)
+        self.assertTrue(transition(self.order, 'confirmed', payment_status='paid'))
+        self.assertFalse(transition(stale, 'cancelled'))
+        self.assertFalse(transition(self.order, 'confirmed'))
+
+        order = Order.objects.get(pk=self.order.pk)
+        self.assertEqual((order.status, order.payment_status), ('confirmed', 'paid'))
+        self.assertEqual(list(order.tracking.values_list('status', flat=True)), ['confirmed'])
+        with self.assertRaises(InvalidTransition):
+            transition(order, 'delivered')
+
+    def test_delivery_side_effects_run_once(self):
+        for status in ('confirmed', 'shipped', 'out_for_delivery', 'shipped', 'out_for_delivery', 'delivered'):
+            transition(self.order, status)
+        run_side_effects(self.order, 'out_for_delivery')
+
+        self.assertEqual(Wallet.objects.get(user=self.user).balance, Decimal('230.00'))
+        self.assertEqual(Job.objects.filter(task='apps.orders.tasks.send_feedback_request_email').count(), 1)
+        self.assertEqual(OutboundEmail.objects.count(), 4)  # confirmed, shipped, out for delivery, delivered
+        self.assertEqual(self.order.tracking.count(), 6)
+        self.assertEqual(OrderSideEffect.objects.filter(order=self.order).count(), 6)
+
+    def test_captured_webhook_confirms_only_pending_orders(self):
+        Order.objects.filter(pk=self.order.pk).update(razorpay_order_id='order_1')
+        event = {'payload': {'payment': {'entity': {'id': 'pay_1', 'order_id': 'order_1', 'amount': 30000}}}}
+
+        handle_payment_captured(event)
+        handle_payment_captured(event)
+        order = Order.objects.get(pk=self.order.pk)
+        self.assertEqual((order.status, order.payment_status), ('confirmed', 'paid'))
+        self.assertEqual(order.tracking.count(), 1)
+
+        transition(order, 'cancelled', payment_status='failed')
+        handle_payment_captured(event)
+        order = Order.objects.get(pk=self.order.pk)
+        self.assertEqual((order.status, order.payment_status), ('cancelled', 'failed'))
+
+    def test_admin_records_who_changed_the_status(self):
+        admin_user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'x')
+        self.client.force_login(admin_user)
+        self.client.post(reverse('admin:orders_order_changelist'), {
+            'action': 'mark_as_confirmed', '_selected_action': [self.order.pk],
+        })
+        tracking = self.order.tracking.get()
+        self.assertEqual((tracking.status, tracking.updated_by), ('confirmed', admin_user))
+
+    def test_admin_form_rejects_illegal_status_changes(self):
+        data = model_to_dict(Order.objects.get(pk=self.order.pk))
+        form = OrderAdminForm(data={**data, 'status': 'delivered'}, instance=self.order)
+        self.assertIn('Cannot change order status from pending to delivered', form.errors['status'][0])
+        form = OrderAdminForm(data={**data, 'status': 'confirmed'}, instance=self.order)
+        self.assertNotIn('status', form.errors)
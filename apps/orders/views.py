@@ -8,7 +8,7 @@ from django.conf import settings
 from decimal import Decimal
 from datetime import datetime, timedelta
 import json
-from .models import Order, OrderItem, OrderTracking
+from .models import Order
 from .forms import (
     CheckoutAddressForm, 
     CheckoutDeliveryForm, 
@@ -18,6 +18,9 @@ from .forms import (
 from apps.cart.models import Cart, CartItem
 from apps.users.models import Address
 from apps.core.models import SiteSettings
+from apps.products.services.inventory import InsufficientStock, check_stock, lines_from_cart
+from .services.checkout import EmptyCart, create_order_from_cart, refund_out_of_stock_payment, stock_error_response
+from .services.transitions import transition
 
 
 def checkout_view(request):
@@ -29,12 +32,13 @@ def checkout_view(request):
     if request.user.is_authenticated:
         try:
             cart = Cart.objects.get(user=request.user)
-            cart_items = cart.items.select_related('product', 'variant').prefetch_related('product__images').all()
         except Cart.DoesNotExist:
             messages.warning(request, 'Your cart is empty')
             return redirect('cart:cart')
 
-        if not cart_items.exists():
+        priced = cart.priced()
+        cart_items = priced.items
+        if not priced:
             messages.warning(request, 'Your cart is empty')
             return redirect('cart:cart')
             
@@ -44,7 +48,7 @@ def checkout_view(request):
         messages.info(request, 'Please login to proceed with checkout')
         return redirect('users:login')
 
-    subtotal = sum(item.total_price for item in cart_items)
+    subtotal = priced.subtotal
     delivery_charge = Decimal('0.00')
     total = subtotal + delivery_charge
 
@@ -71,10 +75,10 @@ def checkout_address(request):
     """Step 1: Address selection/entry"""
     # Get or create cart
     cart, created = Cart.objects.get_or_create(user=request.user)
-    cart_items = cart.items.select_related('product', 'variant').all()
+    cart_items = cart.priced().items
     
     # Check if cart is empty
-    if not cart_items.exists():
+    if not cart_items:
         messages.warning(request, 'Your cart is empty. Add some items before checkout.')
         return redirect('cart:cart')
     
@@ -154,7 +158,7 @@ def checkout_delivery(request):
         return redirect('orders:checkout_address')
     
     cart, created = Cart.objects.get_or_create(user=request.user)
-    cart_items = cart.items.select_related('product', 'variant').all()
+    cart_items = cart.priced().items
     
     if request.method == 'POST':
         form = CheckoutDeliveryForm(request.POST)
@@ -206,10 +210,11 @@ def checkout_payment(request):
         return redirect('orders:checkout_delivery')
     
     cart, created = Cart.objects.get_or_create(user=request.user)
-    cart_items = cart.items.select_related('product', 'variant').all()
+    priced = cart.priced()
+    cart_items = priced.items
     
     # Calculate totals
-    subtotal = cart.total_price
+    subtotal = priced.subtotal
     delivery_charge = Decimal(request.session.get('delivery_charge', '0.00'))
     discount = Decimal(request.session.get('discount_amount', '0.00'))
     total_amount = subtotal + delivery_charge - discount
@@ -286,9 +291,9 @@ def place_order(request):
             return redirect('orders:checkout_address')
     
     cart = Cart.objects.get(user=request.user)
-    cart_items = cart.items.select_related('product', 'variant').all()
+    priced = cart.priced()
     
-    if not cart_items.exists():
+    if not priced:
         messages.error(request, 'Your cart is empty.')
         return redirect('cart:cart')
     
@@ -298,87 +303,56 @@ def place_order(request):
     billing_data = request.session['checkout_billing']
     payment_data = request.session['checkout_payment']
     
-    # Calculate amounts
-    subtotal = cart.total_price
-    delivery_charge = Decimal(request.session.get('delivery_charge', '0.00'))
-    total_amount = subtotal + delivery_charge
-    
-    # Create order
-    order = Order.objects.create(
-        user=request.user,
-        status='pending',
-        payment_status='pending',
-        # Billing info
-        billing_name=billing_data['billing_name'],
-        billing_email=billing_data['billing_email'],
-        billing_phone=billing_data['billing_phone'],
-        billing_address_line_1=billing_data['billing_address_line_1'],
-        billing_address_line_2=billing_data.get('billing_address_line_2', ''),
-        billing_city=billing_data['billing_city'],
-        billing_state=billing_data['billing_state'],
-        billing_pincode=billing_data['billing_pincode'],
-        # Shipping info
-        shipping_name=shipping_address['full_name'],
-        shipping_phone=shipping_address['phone'],
-        shipping_address_line_1=shipping_address['address_line_1'],
-        shipping_address_line_2=shipping_address.get('address_line_2', ''),
-        shipping_city=shipping_address['city'],
-        shipping_state=shipping_address['state'],
-        shipping_pincode=shipping_address['pincode'],
-        # Pricing
-        subtotal=subtotal,
-        delivery_charge=delivery_charge,
-        total_amount=total_amount,
-        # Delivery details
-        special_instructions=delivery_data.get('special_instructions', ''),
-        delivery_date=datetime.fromisoformat(delivery_data['delivery_date']).date() if delivery_data.get('delivery_date') else None,
-        delivery_time_slot=delivery_data.get('delivery_time_slot', ''),
-    )
+    # Online payment is simulated as successful, so the order is written
+    # directly in its confirmed state
+    tracking = [('pending', 'Order placed successfully')]
+    if payment_data['payment_method'] == 'online':
+        status, payment_status = 'confirmed', 'paid'
+        tracking.append(('confirmed', 'Payment successful. Order confirmed.'))
+    else:
+        status, payment_status = 'pending', 'pending'
     
-    # Create order items
-    for cart_item in cart_items:
-        OrderItem.objects.create(
-            order=order,
-            product=cart_item.product,
-            variant=cart_item.variant,
-            product_name=cart_item.product.name,
-            variant_name=cart_item.variant.name if cart_item.variant else '',
-            quantity=cart_item.quantity,
-            unit_price=cart_item.unit_price,
-            total_price=cart_item.total_price,
+    try:
+        order = create_order_from_cart(
+            cart,
+            tracking,
+            priced=priced,
+            delivery_charge=Decimal(request.session.get('delivery_charge', '0.00')),
+            status=status,
+            payment_status=payment_status,
+            # Billing info
+            billing_name=billing_data['billing_name'],
+            billing_email=billing_data['billing_email'],
+            billing_phone=billing_data['billing_phone'],
+            billing_address_line_1=billing_data['billing_address_line_1'],
+            billing_address_line_2=billing_data.get('billing_address_line_2', ''),
+            billing_city=billing_data['billing_city'],
+            billing_state=billing_data['billing_state'],
+            billing_pincode=billing_data['billing_pincode'],
+            # Shipping info
+            shipping_name=shipping_address['full_name'],
+            shipping_phone=shipping_address['phone'],
+            shipping_address_line_1=shipping_address['address_line_1'],
+            shipping_address_line_2=shipping_address.get('address_line_2', ''),
+            shipping_city=shipping_address['city'],
+            shipping_state=shipping_address['state'],
+            shipping_pincode=shipping_address['pincode'],
+            # Delivery details
+            special_instructions=delivery_data.get('special_instructions', ''),
+            delivery_date=datetime.fromisoformat(delivery_data['delivery_date']).date() if delivery_data.get('delivery_date') else None,
+            delivery_time_slot=delivery_data.get('delivery_time_slot', ''),
         )
-    
-    # Create initial tracking entry
-    OrderTracking.objects.create(
-        order=order,
-        status='pending',
-        message='Order placed successfully',
-        location=shipping_address['city'],
-    )
-    
-    # Clear cart
-    cart_items.delete()
+    except InsufficientStock as e:
+        for shortage in e.shortages or ['Some items in your cart are no longer available.']:
+            messages.error(request, str(shortage))
+        return redirect('cart:cart')
     
     # Clear checkout session
     for key in ['checkout_address', 'checkout_delivery', 'checkout_payment', 'checkout_billing', 'delivery_charge', 'discount_amount']:
         if key in request.session:
             del request.session[key]
     
-    # Handle payment
-    if payment_data['payment_method'] == 'online':
-        # Redirect to payment gateway (implement based on your payment provider)
-        # For now, we'll simulate successful payment
-        order.payment_status = 'paid'
-        order.status = 'confirmed'
-        order.save()
-        
-        OrderTracking.objects.create(
-            order=order,
-            status='confirmed',
-            message='Payment successful. Order confirmed.',
-            location=shipping_address['city'],
-        )
-        
+    if payment_status == 'paid':
         messages.success(request, 'Payment successful! Your order has been confirmed.')
     else:
         # Cash on Delivery
@@ -432,16 +406,9 @@ def cancel_order(request, order_number):
     order = get_object_or_404(Order, order_number=order_number, user=request.user)
     
     # Only allow cancellation for pending or confirmed orders
-    if order.status in ['pending', 'confirmed']:
-        order.status = 'cancelled'
-        order.save()
-        
-        OrderTracking.objects.create(
-            order=order,
-            status='cancelled',
-            message='Order cancelled by customer',
-        )
-        
+    if order.status in ['pending', 'confirmed'] and transition(
+        order, 'cancelled', message='Order cancelled by customer', updated_by=request.user
+    ):
         messages.success(request, 'Order cancelled successfully.')
     else:
         messages.error(request, 'This order cannot be cancelled.')
@@ -466,7 +433,7 @@ def apply_coupon(request):
     if coupon_code in valid_coupons:
         coupon = valid_coupons[coupon_code]
         cart = Cart.objects.get(user=request.user)
-        subtotal = cart.total_price
+        subtotal = cart.priced().subtotal
         
         if coupon['type'] == 'percent':
             discount = (subtotal * Decimal(coupon['discount'])) / Decimal('100')
@@ -544,16 +511,22 @@ def create_razorpay_order_session(request):
         
         # Get cart
         cart = Cart.objects.get(user=request.user)
-        cart_items = cart.items.all()
+        priced = cart.priced()
         
-        if not cart_items.exists():
+        if not priced:
             return JsonResponse({
                 'success': False,
                 'message': 'Your cart is empty'
             }, status=400)
         
+        # Don't take payment for a cart that can't be fulfilled
+        try:
+            check_stock(lines_from_cart(priced.items))
+        except InsufficientStock as e:
+            return stock_error_response(e)
+        
         # Calculate total
-        subtotal = cart.total_price
+        subtotal = priced.subtotal
         delivery_charge = Decimal(request.session.get('delivery_charge', '0.00'))
         total_amount = subtotal + delivery_charge
         
@@ -630,85 +603,50 @@ def verify_payment_and_create_order(request):
         
         # Get cart
         cart = Cart.objects.get(user=request.user)
-        cart_items = cart.items.select_related('product', 'variant').prefetch_related('addons').all()
         
-        if not cart_items.exists():
+        try:
+            order = create_order_from_cart(
+                cart,
+                [('confirmed', 'Order confirmed and payment received via Razorpay')],
+                delivery_charge=Decimal(request.session.get('delivery_charge', '0.00')),
+                status='confirmed',
+                payment_status='paid',
+                payment_method='razorpay',
+                razorpay_order_id=razorpay_order_id,
+                razorpay_payment_id=razorpay_payment_id,
+                razorpay_signature=razorpay_signature,
+                
+                # Billing info
+                billing_name=billing_data.get('billing_name', ''),
+                billing_email=billing_data.get('billing_email', request.user.email),
+                billing_phone=billing_data.get('billing_phone', ''),
+                billing_address_line_1=billing_data.get('billing_address_line_1', ''),
+                billing_address_line_2=billing_data.get('billing_address_line_2', ''),
+                billing_city=billing_data.get('billing_city', ''),
+                billing_state=billing_data.get('billing_state', ''),
+                billing_pincode=billing_data.get('billing_pincode', ''),
+                
+                # Shipping info
+                shipping_name=shipping_address.get('full_name', ''),
+                shipping_phone=shipping_address.get('phone', ''),
+                shipping_address_line_1=shipping_address.get('address_line_1', ''),
+                shipping_address_line_2=shipping_address.get('address_line_2', ''),
+                shipping_city=shipping_address.get('city', ''),
+                shipping_state=shipping_address.get('state', ''),
+                shipping_pincode=shipping_address.get('pincode', ''),
+                
+                # Delivery details
+                special_instructions=delivery_data.get('special_instructions', ''),
+                delivery_date=datetime.fromisoformat(delivery_data['delivery_date']).date() if delivery_data.get('delivery_date') else None,
+                delivery_time_slot=delivery_data.get('delivery_time_slot', ''),
+            )
+        except EmptyCart:
             return JsonResponse({
                 'success': False,
                 'message': 'Your cart is empty'
             }, status=400)
-        
-        # Calculate totals
-        subtotal = cart.total_price
-        delivery_charge = Decimal(request.session.get('delivery_charge', '0.00'))
-        total_amount = subtotal + delivery_charge
-        
-        # Create order
-        order = Order.objects.create(
-            user=request.user,
-            status='confirmed',
-            payment_status='paid',
-            payment_method='razorpay',
-            razorpay_order_id=razorpay_order_id,
-            razorpay_payment_id=razorpay_payment_id,
-            razorpay_signature=razorpay_signature,
-            
-            # Billing info
-            billing_name=billing_data.get('billing_name', ''),
-            billing_email=billing_data.get('billing_email', request.user.email),
-            billing_phone=billing_data.get('billing_phone', ''),
-            billing_address_line_1=billing_data.get('billing_address_line_1', ''),
-            billing_address_line_2=billing_data.get('billing_address_line_2', ''),
-            billing_city=billing_data.get('billing_city', ''),
-            billing_state=billing_data.get('billing_state', ''),
-            billing_pincode=billing_data.get('billing_pincode', ''),
-            
-            # Shipping info
-            shipping_name=shipping_address.get('full_name', ''),
-            shipping_phone=shipping_address.get('phone', ''),
-            shipping_address_line_1=shipping_address.get('address_line_1', ''),
-            shipping_address_line_2=shipping_address.get('address_line_2', ''),
-            shipping_city=shipping_address.get('city', ''),
-            shipping_state=shipping_address.get('state', ''),
-            shipping_pincode=shipping_address.get('pincode', ''),
-            
-            # Pricing
-            subtotal=subtotal,
-            delivery_charge=delivery_charge,
-            total_amount=total_amount,
-            
-            # Delivery details
-            special_instructions=delivery_data.get('special_instructions', ''),
-            delivery_date=datetime.fromisoformat(delivery_data['delivery_date']).date() if delivery_data.get('delivery_date') else None,
-            delivery_time_slot=delivery_data.get('delivery_time_slot', ''),
-        )
-        
-        # Create order items
-        for cart_item in cart_items:
-            order_item = OrderItem.objects.create(
-                order=order,
-                product=cart_item.product,
-                variant=cart_item.variant,
-                product_name=cart_item.product.name,
-                variant_name=cart_item.variant.name if cart_item.variant else '',
-                quantity=cart_item.quantity,
-                unit_price=cart_item.unit_price,
-                total_price=cart_item.total_price
-            )
-            # Add addons
-            if cart_item.addons.exists():
-                order_item.addons.set(cart_item.addons.all())
-        
-        # Create tracking entry
-        OrderTracking.objects.create(
-            order=order,
-            status='confirmed',
-            message='Order confirmed and payment received via Razorpay',
-            location=shipping_address.get('city', '')
-        )
-        
-        # Clear cart
-        cart_items.delete()
+        except InsufficientStock as e:
+            return refund_out_of_stock_payment(razorpay_payment_id, e)
         
         # Clear checkout session
         for key in ['checkout_address', 'checkout_delivery', 'checkout_payment', 'checkout_billing', 'delivery_charge', 'discount_amount', 'razorpay_order_id']:
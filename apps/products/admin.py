@@ -3,11 +3,13 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import path
+from apps.core.versioning import bump_version
 from .models import (
     Category, Occasion, Product, ProductImage, ProductVariant, CSVImportLog,
     MenuBadge, MenuCategory, MenuSection, ProductType, Collection,
     Recipient, DeliveryLocation, MenuConfiguration, SellerInventory, ProductAddOn
 )
+from .services.product_cards import CATALOG_VERSION
 
 
 # ============================================
@@ -292,16 +294,20 @@ class ProductAdmin(admin.ModelAdmin):
     
     def mark_as_published(self, request, queryset):
         queryset.update(status='active', published=True, is_active=True)
+        # queryset.update() skips the save signals that invalidate cached listings
+        bump_version(CATALOG_VERSION)
         self.message_user(request, f"{queryset.count()} products marked as published")
     mark_as_published.short_description = "Mark selected as published"
     
     def mark_as_draft(self, request, queryset):
         queryset.update(status='draft', published=False)
+        bump_version(CATALOG_VERSION)
         self.message_user(request, f"{queryset.count()} products marked as draft")
     mark_as_draft.short_description = "Mark selected as draft"
     
     def mark_as_archived(self, request, queryset):
         queryset.update(status='archived', published=False, is_active=False)
+        bump_version(CATALOG_VERSION)
         self.message_user(request, f"{queryset.count()} products marked as archived")
     mark_as_archived.short_description = "Mark selected as archived"
 
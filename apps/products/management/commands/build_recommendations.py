@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from apps.products.services.recommendations import DEFAULT_TOP_K, rebuild_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Rebuild "frequently bought together" recommendations from order history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=DEFAULT_TOP_K,
+            help='Number of neighbours to keep per product'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of order lines to fetch per database round trip'
+        )
+        parser.add_argument(
+            '--min-support',
+            type=int,
+            default=1,
+            help='Minimum number of orders a pair must share'
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_recommendations(
+            top_k=options['top_k'],
+            chunk_size=options['chunk_size'],
+            min_support=options['min_support']
+        )
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} product recommendations'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from apps.products.services.product_cards import rebuild_product_cards
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the ProductCard read model used by listing pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of products to rebuild per batch'
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_product_cards(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} product cards'))
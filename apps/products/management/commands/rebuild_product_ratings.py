@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from apps.products.services.product_cards import rebuild_product_cards
+from apps.products.services.ratings import rebuild_product_ratings
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored review aggregates (average, count, star distribution) for all products'
+
+    def handle(self, *args, **options):
+        updated = rebuild_product_ratings()
+        rebuild_product_cards()
+        self.stdout.write(self.style.SUCCESS(f'Recomputed ratings for {updated} products'))
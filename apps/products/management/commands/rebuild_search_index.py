@@ -0,0 +1,30 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.products.services.search_index import rebuild_index, backend_name, INDEX_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the product full-text search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=INDEX_BATCH_SIZE,
+            help='Number of products to index per batch'
+        )
+
+    def handle(self, *args, **options):
+        backend = backend_name()
+        if backend == 'fallback':
+            self.stdout.write(self.style.WARNING(
+                'No full-text index for this database backend - search uses icontains'
+            ))
+            return
+
+        started = time.monotonic()
+        indexed = rebuild_index(batch_size=options['batch_size'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {indexed} products ({backend}) in {elapsed:.1f}s'
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from apps.products.services.popularity import HALF_LIFE_HOURS, rebuild_scores, rollup_scores
+
+
+class Command(BaseCommand):
+    help = (
+        f'Decay product popularity scores (half-life {HALF_LIFE_HOURS}h) by the time since the '
+        f'previous rollup; scheduled hourly as the rollup-popularity job'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recompute scores from recent orders and wishlist adds instead of decaying'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='History window for --rebuild'
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            count = rebuild_scores(days=options['days'])
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt popularity scores for {count} products'))
+            return
+
+        count = rollup_scores()
+        self.stdout.write(self.style.SUCCESS(f'Decayed popularity scores for {count} products'))
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.7 on 2026-10-17 00:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_product_delivery_days_product_is_personalized'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductCard',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='card', serialize=False, to='products.product')),
+                ('slug', models.SlugField(max_length=255)),
+                ('name', models.CharField(max_length=500)),
+                ('price', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('mrp', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('discount_percentage', models.PositiveSmallIntegerField(default=0)),
+                ('primary_image_url', models.CharField(blank=True, max_length=1000)),
+                ('in_stock', models.BooleanField(default=False)),
+                ('category_slug', models.SlugField(blank=True, max_length=255)),
+                ('average_rating', models.DecimalField(decimal_places=1, default=0, max_digits=2)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Product Card',
+                'verbose_name_plural': 'Product Cards',
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS products_search_fts USING fts5("
+            "name, sku, tags, category, brand, vendor, description, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS products_search_document ("
+            "product_id bigint PRIMARY KEY REFERENCES products_product (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS products_search_document_gin "
+            "ON products_search_document USING GIN (document)"
+        )
+
+
+def fill_search_index(apps, schema_editor):
+    """Index the products that already exist"""
+    from apps.products.services.search_index import INDEX_BATCH_SIZE, index_documents
+
+    Product = apps.get_model('products', 'Product')
+    products = Product.objects.select_related('category').order_by('pk')
+    batch = []
+    for product in products.iterator(chunk_size=INDEX_BATCH_SIZE):
+        batch.append(product)
+        if len(batch) >= INDEX_BATCH_SIZE:
+            index_documents(batch)
+            batch = []
+    index_documents(batch)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS products_search_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP TABLE IF EXISTS products_search_document")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_productcard'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(fill_search_index, migrations.RunPython.noop),
+    ]
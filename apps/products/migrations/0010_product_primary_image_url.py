@@ -0,0 +1,40 @@
+# Generated by Django 5.0.7 on 2026-10-17 00:51
+
+from django.db import migrations, models
+
+
+def fill_primary_image_urls(apps, schema_editor):
+    """Primary image first, then by sort order, as Product.primary_image does"""
+    Product = apps.get_model('products', 'Product')
+    ProductImage = apps.get_model('products', 'ProductImage')
+
+    urls = {}
+    images = ProductImage.objects.filter(is_active=True).order_by(
+        'product_id', '-is_primary', 'sort_order', 'position'
+    )
+    for image in images.iterator(chunk_size=2000):
+        if image.product_id in urls:
+            continue
+        try:
+            urls[image.product_id] = image.image_url or (image.image.url if image.image else '')
+        except ValueError:
+            urls[image.product_id] = ''
+
+    products = [Product(pk=product_id, primary_image_url=url) for product_id, url in urls.items() if url]
+    Product.objects.bulk_update(products, ['primary_image_url'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='primary_image_url',
+            field=models.CharField(blank=True, editable=False, max_length=1000),
+        ),
+        migrations.RunPython(fill_primary_image_urls, migrations.RunPython.noop),
+    ]
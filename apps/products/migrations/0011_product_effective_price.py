@@ -0,0 +1,62 @@
+# Generated by Django 5.0.7 on 2026-10-17 00:52
+
+from django.db import migrations, models
+
+
+def backfill_pricing(apps, schema_editor):
+    """Same rules as Product.current_price / discount_percentage"""
+    Product = apps.get_model('products', 'Product')
+    batch = []
+    for product in Product.objects.only(
+        'pk', 'base_price', 'sale_price', 'discount_price', 'mrp'
+    ).iterator(chunk_size=1000):
+        if product.discount_price:
+            price = product.discount_price
+        elif product.sale_price and product.sale_price > 0:
+            price = product.sale_price
+        else:
+            price = product.base_price or 0
+
+        pct = 0
+        if product.mrp and product.mrp > 0 and price < product.mrp:
+            pct = int(((product.mrp - price) / product.mrp) * 100)
+        elif product.discount_price and product.base_price and product.discount_price < product.base_price:
+            pct = int(((product.base_price - product.discount_price) / product.base_price) * 100)
+
+        product.effective_price = price
+        product.discount_pct = min(pct, 100)
+        batch.append(product)
+        if len(batch) >= 1000:
+            Product.objects.bulk_update(batch, ['effective_price', 'discount_pct'])
+            batch = []
+    if batch:
+        Product.objects.bulk_update(batch, ['effective_price', 'discount_pct'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_product_primary_image_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='discount_pct',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='effective_price',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.RunPython(backfill_pricing, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'published', 'effective_price'], name='product_listing_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'discount_pct'], name='product_offer_idx'),
+        ),
+    ]
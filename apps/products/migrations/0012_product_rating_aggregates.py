@@ -0,0 +1,74 @@
+# Generated by Django 5.0.7 on 2026-10-17 00:55
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_ratings(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    Review = apps.get_model('reviews', 'Review')
+    aggregates = {'count': Count('id'), 'total': Sum('rating')}
+    for stars in range(1, 6):
+        aggregates[f'rating_{stars}'] = Count('id', filter=Q(rating=stars))
+
+    rows = Review.objects.filter(is_approved=True, is_active=True).values('product_id').annotate(**aggregates)
+    for row in rows.iterator():
+        values = {f'rating_{stars}': row[f'rating_{stars}'] for stars in range(1, 6)}
+        Product.objects.filter(pk=row['product_id']).update(
+            rating_count=row['count'],
+            rating_avg=round(Decimal(row['total']) / row['count'], 1),
+            **values
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_product_effective_price'),
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_avg',
+            field=models.DecimalField(decimal_places=1, default=0, editable=False, max_digits=2),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'published', 'rating_avg'], name='product_listing_rating_idx'),
+        ),
+    ]
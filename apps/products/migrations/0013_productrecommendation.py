@@ -0,0 +1,31 @@
+# Generated by Django 5.0.7 on 2026-10-17 00:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0012_product_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='products.product')),
+                ('recommended', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommended_with', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Product Recommendation',
+                'verbose_name_plural': 'Product Recommendations',
+                'ordering': ['product', 'rank'],
+                'indexes': [models.Index(fields=['product', 'rank'], name='products_pr_product_c60866_idx')],
+                'unique_together': {('product', 'recommended')},
+            },
+        ),
+    ]
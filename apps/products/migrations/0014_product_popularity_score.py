@@ -0,0 +1,31 @@
+# Generated by Django 5.0.7 on 2026-10-17 00:59
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def seed_from_flags(apps, schema_editor):
+    """Small starting scores so the old featured/bestseller order holds until real demand arrives"""
+    Product = apps.get_model('products', 'Product')
+    Product.objects.filter(is_bestseller=True).update(popularity_score=F('popularity_score') + 1)
+    Product.objects.filter(is_featured=True).update(popularity_score=F('popularity_score') + 2)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0013_productrecommendation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='popularity_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.RunPython(seed_from_flags, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'published', 'popularity_score'], name='product_popularity_idx'),
+        ),
+    ]
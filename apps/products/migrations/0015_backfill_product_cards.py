@@ -0,0 +1,50 @@
+from django.db import migrations
+
+
+def backfill_cards(apps, schema_editor):
+    """Same fields as product_cards.build_card, from the stored price, image and rating columns"""
+    Product = apps.get_model('products', 'Product')
+    ProductCard = apps.get_model('products', 'ProductCard')
+
+    products = Product.objects.filter(card__isnull=True).select_related('category').only(
+        'pk', 'slug', 'name', 'effective_price', 'discount_pct', 'base_price', 'mrp',
+        'primary_image_url', 'stock_quantity', 'quantity', 'category__slug', 'rating_avg', 'rating_count',
+    )
+    batch = []
+    for product in products.iterator(chunk_size=1000):
+        price = product.effective_price or 0
+        if product.mrp and product.mrp > price:
+            mrp = product.mrp
+        elif product.base_price and product.base_price > price:
+            mrp = product.base_price
+        else:
+            mrp = price
+
+        batch.append(ProductCard(
+            product_id=product.pk,
+            slug=product.slug,
+            name=product.name,
+            price=price,
+            mrp=mrp,
+            discount_percentage=product.discount_pct,
+            primary_image_url=product.primary_image_url,
+            in_stock=product.stock_quantity > 0 or product.quantity > 0,
+            category_slug=product.category.slug if product.category_id else '',
+            average_rating=product.rating_avg,
+            review_count=product.rating_count,
+        ))
+        if len(batch) >= 1000:
+            ProductCard.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    ProductCard.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0014_product_popularity_score'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_cards, migrations.RunPython.noop),
+    ]
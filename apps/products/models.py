@@ -329,6 +329,23 @@ class Product(BaseModel):
     compare_at_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)  # Shopify
     cost_per_item = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)  # CSV field
     purchase_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)  # CSV field
+    # Stored copies of current_price / discount_percentage (set on save) so
+    # listings can sort and filter on the real selling price in the database
+    effective_price = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
+    discount_pct = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    # ============================================
+    # REVIEW AGGREGATES (maintained from approved reviews, see services/ratings.py)
+    # ============================================
+    rating_avg = models.DecimalField(max_digits=2, decimal_places=1, default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_5 = models.PositiveIntegerField(default=0, editable=False)
+    # Time-decayed demand score (orders, wishlist adds, views), see services/popularity.py
+    popularity_score = models.FloatField(default=0, editable=False)
     
     # ============================================
     # TAX
@@ -409,6 +426,8 @@ class Product(BaseModel):
     # MEDIA
     # ============================================
     video_url = models.URLField(max_length=500, blank=True, null=True)  # CSV field
+    # Denormalized from ProductImage (kept in sync on image save and delete)
+    primary_image_url = models.CharField(max_length=1000, blank=True, editable=False)
 
     class Meta:
         ordering = ['-created_at']
@@ -417,8 +436,23 @@ class Product(BaseModel):
             models.Index(fields=['slug']),
             models.Index(fields=['handle']),
             models.Index(fields=['status', 'published']),
+            models.Index(fields=['is_active', 'published', 'effective_price'], name='product_listing_price_idx'),
+            models.Index(fields=['is_active', 'discount_pct'], name='product_offer_idx'),
+            models.Index(fields=['is_active', 'published', 'rating_avg'], name='product_listing_rating_idx'),
+            models.Index(fields=['is_active', 'published', 'popularity_score'], name='product_popularity_idx'),
         ]
 
+    # Fields the stored effective price and discount are derived from
+    PRICING_FIELDS = ('base_price', 'sale_price', 'discount_price', 'mrp')
+    # Columns maintained with queryset updates (images, reviews, popularity);
+    # a regular save of a possibly stale instance must not write them back
+    # (see _do_update)
+    MAINTAINED_FIELDS = (
+        'primary_image_url', 'rating_avg', 'rating_count',
+        'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5',
+        'popularity_score',
+    )
+
     def __str__(self):
         return self.name
 
@@ -466,9 +500,25 @@ class Product(BaseModel):
             self.meta_description = self.seo_description[:320]
         elif not self.seo_description and self.meta_description:
             self.seo_description = self.meta_description
+
+        self.refresh_pricing()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(self.PRICING_FIELDS):
+            kwargs['update_fields'] = set(update_fields) | {'effective_price', 'discount_pct'}
         
         super().save(*args, **kwargs)
 
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # Only an explicit update_fields list writes the maintained columns
+        if update_fields is None:
+            values = [value for value in values if value[0].name not in self.MAINTAINED_FIELDS]
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+
+    def refresh_pricing(self):
+        """Copy current_price and discount_percentage into their stored columns"""
+        self.effective_price = self.current_price or 0
+        self.discount_pct = min(self.discount_percentage, 100)
+
     def get_absolute_url(self):
         return reverse('products:product_detail', kwargs={'slug': self.slug})
 
@@ -496,14 +546,39 @@ class Product(BaseModel):
         
         return 0
 
+    @property
+    def rating_distribution(self):
+        """Approved review counts per star, highest first"""
+        return {stars: getattr(self, f'rating_{stars}') for stars in range(5, 0, -1)}
+
     @property
     def is_in_stock(self):
         """Check if product is in stock"""
         return self.stock_quantity > 0 or self.quantity > 0
 
+    def check_availability_by_pincode(self, pincode, variant=None, quantity=1):
+        """(is_available, seller_location, available_quantity, delivery_days) for a pincode"""
+        from apps.products.services.serviceability import check_availability
+        return check_availability(self, pincode, variant, quantity)
+
+    def _prefetched_images(self):
+        """Active images from prefetch_related('images'), or None if not prefetched"""
+        images = getattr(self, '_prefetched_objects_cache', {}).get('images')
+        if images is None:
+            return None
+        return sorted(
+            (image for image in images if image.is_active),
+            key=lambda image: (image.sort_order, image.position)
+        )
+
     @property
     def primary_image(self):
         """Get the primary image for the product"""
+        images = self._prefetched_images()
+        if images is not None:
+            primary = next((image for image in images if image.is_primary), None)
+            return primary or (images[0] if images else None)
+
         primary = self.images.filter(is_primary=True, is_active=True).first()
         if not primary:
             primary = self.images.filter(is_active=True).first()
@@ -512,8 +587,18 @@ class Product(BaseModel):
     @property
     def all_images(self):
         """Get all images for the product"""
+        images = self._prefetched_images()
+        if images is not None:
+            return images
         return self.images.filter(is_active=True).order_by('sort_order', 'position')
 
+    def refresh_primary_image_url(self):
+        """Recompute the stored primary image URL after an image change"""
+        from apps.products.services.product_cards import refresh_card_image
+
+        self.primary_image_url = refresh_card_image(self.pk)
+        return self.primary_image_url
+
     def get_available_addons(self):
         """Get available add-ons for this product"""
         return ProductAddOn.objects.filter(is_active=True)[:6]
@@ -551,6 +636,8 @@ class ProductImage(BaseModel):
             self.position = self.sort_order
         
         super().save(*args, **kwargs)
+        # Deletes (including queryset deletes) are handled by a post_delete signal
+        self.product.refresh_primary_image_url()
 
     @property
     def get_image_url(self):
@@ -560,6 +647,81 @@ class ProductImage(BaseModel):
         return self.image_url or ''
 
 
+class ProductCard(models.Model):
+    """
+    Denormalized listing row for a product.
+    Kept in sync from Product, ProductImage and Review saves (see signals)
+    so listing pages can render a grid without touching the wide product row.
+    """
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='card')
+    slug = models.SlugField(max_length=255)
+    name = models.CharField(max_length=500)
+    price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    mrp = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    discount_percentage = models.PositiveSmallIntegerField(default=0)
+    primary_image_url = models.CharField(max_length=1000, blank=True)
+    in_stock = models.BooleanField(default=False)
+    category_slug = models.SlugField(max_length=255, blank=True)
+    average_rating = models.DecimalField(max_digits=2, decimal_places=1, default=0)
+    review_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Product Card'
+        verbose_name_plural = 'Product Cards'
+
+    def __str__(self):
+        return self.name
+
+    def get_absolute_url(self):
+        return reverse('products:product_detail', kwargs={'slug': self.slug})
+
+    # The properties below let a card stand in for a Product in
+    # templates/includes/product_card.html and the product_tags filters.
+    @property
+    def id(self):
+        return self.product_id
+
+    @property
+    def current_price(self):
+        return self.price
+
+    @property
+    def base_price(self):
+        return self.mrp
+
+    @property
+    def discount_price(self):
+        return self.price if self.price < self.mrp else None
+
+    @property
+    def is_in_stock(self):
+        return self.in_stock
+
+
+class ProductRecommendation(models.Model):
+    """
+    Precomputed "frequently bought together" neighbours.
+    Rebuilt offline from order history by the build_recommendations command.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='recommendations')
+    recommended = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='recommended_with')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['product', 'rank']
+        unique_together = ['product', 'recommended']
+        indexes = [
+            models.Index(fields=['product', 'rank']),
+        ]
+        verbose_name = 'Product Recommendation'
+        verbose_name_plural = 'Product Recommendations'
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.recommended_id} ({self.score:.3f})"
+
+
 class ProductVariant(BaseModel):
     """Product variants (size, color, etc.) - supports both manual and CSV import"""
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='variants')
@@ -0,0 +1,102 @@
+"""
+In-memory prefix index for search suggestions.
+
+Each worker keeps a sorted array of (token, product) keys built from the
+active products' stored listing columns (effective price, primary image
+URL), so products without a ProductCard row are included too. A prefix lookup is a binary search over that
+array, so suggestions are served without touching the database. The index
+is rebuilt when the catalog version stamp changes.
+"""
+
+import bisect
+import logging
+from array import array
+from typing import Dict, List
+
+from apps.core.versioning import VersionedSnapshot
+from apps.products.models import Product
+from apps.products.services.product_cards import CATALOG_VERSION
+from apps.products.services.search_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+MAX_SUGGESTIONS = 10
+
+
+class PrefixIndex:
+    """Sorted token array over product names and SKUs"""
+
+    def __init__(self, entries: List[Dict]):
+        self.entries = entries
+        keys = []
+        for position, entry in enumerate(entries):
+            sku = entry.pop('sku', '') or ''
+            tokens = set(tokenize(entry['name'])) | set(tokenize(sku))
+            compact_sku = ''.join(tokenize(sku))
+            if compact_sku:
+                tokens.add(compact_sku)
+            keys.extend((token, position) for token in tokens)
+        keys.sort()
+        self.tokens = [token for token, _ in keys]
+        self.positions = array('I', (position for _, position in keys))
+
+    def _prefix_matches(self, prefix: str) -> set:
+        start = bisect.bisect_left(self.tokens, prefix)
+        end = bisect.bisect_left(self.tokens, prefix + '\uffff', lo=start)
+        return set(self.positions[start:end])
+
+    def search(self, query: str, limit: int = MAX_SUGGESTIONS) -> List[Dict]:
+        """Entries where every query word prefixes a name or SKU token"""
+        words = tokenize(query)
+        if not words:
+            return []
+
+        # Start from the longest word - it has the narrowest range
+        words.sort(key=len, reverse=True)
+        matches = self._prefix_matches(words[0])
+        for word in words[1:]:
+            if not matches:
+                break
+            matches &= self._prefix_matches(word)
+
+        normalized = query.strip().lower()
+        ranked = sorted(
+            matches,
+            key=lambda position: (
+                not self.entries[position]['name'].lower().startswith(normalized),
+                self.entries[position]['name'].lower(),
+            )
+        )
+        return [self.entries[position] for position in ranked[:limit]]
+
+
+def build_prefix_index() -> PrefixIndex:
+    rows = Product.objects.filter(
+        is_active=True,
+        published=True
+    ).values_list(
+        'pk', 'name', 'slug', 'effective_price', 'primary_image_url',
+        'sku', 'category__name'
+    )
+    entries = [
+        {
+            'id': product_id,
+            'name': name,
+            'slug': slug,
+            'price': float(price),
+            'image': image_url or None,
+            'category': category_name,
+            'sku': sku,
+        }
+        for product_id, name, slug, price, image_url, sku, category_name in rows
+    ]
+    logger.info(f'Built autocomplete prefix index with {len(entries)} products')
+    return PrefixIndex(entries)
+
+
+_snapshot = VersionedSnapshot(CATALOG_VERSION, build_prefix_index)
+
+
+def suggest(query: str, limit: int = MAX_SUGGESTIONS) -> List[Dict]:
+    """Search suggestions for a partially typed query"""
+    return _snapshot.get().search(query, limit)
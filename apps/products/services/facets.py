@@ -0,0 +1,100 @@
+"""
+Facet counts for listing filter sidebars.
+
+Each facet is one grouped aggregation over the listing's base queryset with
+every applied filter except the facet's own, so counts answer "how many
+results would I get if I also ticked this box". Results are cached per
+listing, normalized filter set and catalog version.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Dict
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Count, Q
+
+from apps.core.versioning import get_version
+from apps.products.services.listing import PRICE_FIELD, apply_filters
+from apps.products.services.product_cards import CATALOG_VERSION
+
+logger = logging.getLogger(__name__)
+
+CACHE_TIMEOUT = 900  # 15 minutes
+CACHE_KEY = 'product_facets_{}_{}'
+
+PRICE_BUCKETS = {
+    'under_500': Q(**{f'{PRICE_FIELD}__lt': 500}),
+    '500_1000': Q(**{f'{PRICE_FIELD}__gte': 500, f'{PRICE_FIELD}__lt': 1000}),
+    '1000_2000': Q(**{f'{PRICE_FIELD}__gte': 1000, f'{PRICE_FIELD}__lt': 2000}),
+    'above_2000': Q(**{f'{PRICE_FIELD}__gte': 2000}),
+}
+
+EMPTY_FACETS = {
+    'categories': [],
+    'occasions': [],
+    'vendors': [],
+    'brands': [],
+    'price_counts': {},
+}
+
+
+def _cache_key(base_queryset, filters: Dict) -> str:
+    digest = hashlib.md5()
+    digest.update(str(base_queryset.query).encode('utf-8'))
+    digest.update(json.dumps(filters, sort_keys=True).encode('utf-8'))
+    return CACHE_KEY.format(get_version(CATALOG_VERSION), digest.hexdigest())
+
+
+def _grouped(queryset, slug_field: str, name_field: str):
+    rows = queryset.exclude(**{f'{slug_field}__isnull': True}).values(slug_field, name_field).annotate(
+        product_count=Count('pk', distinct=True)
+    ).order_by(name_field)
+    return [
+        {'slug': row[slug_field], 'name': row[name_field], 'product_count': row['product_count']}
+        for row in rows
+    ]
+
+
+def _values(queryset, field: str):
+    rows = queryset.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''}).values(field).annotate(
+        product_count=Count('pk', distinct=True)
+    ).order_by(field)
+    return [{'name': row[field], 'product_count': row['product_count']} for row in rows]
+
+
+def compute_facets(base_queryset, filters: Dict) -> Dict:
+    occasions_qs = apply_filters(base_queryset, filters, skip={'occasions'}).filter(occasions__is_active=True)
+    price_qs = apply_filters(base_queryset, filters, skip={'price_range'})
+    return {
+        'categories': _grouped(
+            apply_filters(base_queryset, filters, skip={'categories'}), 'category__slug', 'category__name'
+        ),
+        'occasions': _grouped(occasions_qs, 'occasions__slug', 'occasions__name'),
+        'vendors': _values(apply_filters(base_queryset, filters, skip={'vendors'}), 'vendor'),
+        'brands': _values(apply_filters(base_queryset, filters, skip={'brands'}), 'brand'),
+        'price_counts': price_qs.aggregate(**{
+            bucket: Count('pk', filter=condition, distinct=True)
+            for bucket, condition in PRICE_BUCKETS.items()
+        }),
+    }
+
+
+def get_facets(base_queryset, filters: Dict) -> Dict:
+    """Cached facet counts for a listing's base queryset and applied filters"""
+    try:
+        key = _cache_key(base_queryset, filters)
+    except EmptyResultSet:
+        return EMPTY_FACETS
+
+    facets = cache.get(key)
+    if facets is None:
+        try:
+            facets = compute_facets(base_queryset, filters)
+        except Exception as e:
+            logger.error(f'Error computing listing facets: {str(e)}', exc_info=True)
+            return EMPTY_FACETS
+        cache.set(key, facets, CACHE_TIMEOUT)
+    return facets
@@ -0,0 +1,200 @@
+"""
+Stock reservation at order placement.
+
+Stock is taken with conditional UPDATEs (`SET stock = stock - n WHERE
+stock >= n`), one statement per table for all order lines, so concurrent
+checkouts can never both take the last unit and no row is read and written
+back. If any line cannot be covered the whole reservation is rolled back
+and InsufficientStock lists the lines that are short.
+
+Products and variants with inventory_policy 'continue' accept orders
+without stock (stock bottoms out at zero). check_stock() runs the same
+checks without taking anything, before a customer is sent to pay, and
+release_stock() hands the units of a cancelled order back.
+
+Queryset updates fire no post_save, so both also flip ProductCard.in_stock
+for products whose stock crossed zero and bump the catalog version.
+"""
+
+import logging
+from collections import Counter
+from functools import reduce
+from operator import or_
+from typing import Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Case, Exists, F, IntegerField, OuterRef, Q, Value, When
+from django.db.models.functions import Greatest
+
+from apps.core.versioning import bump_version
+from apps.products.models import Product, ProductCard, ProductVariant
+from apps.products.services.product_cards import CATALOG_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Shopify inventory policy that allows selling past zero stock
+ALLOW_BACKORDER = 'continue'
+
+
+class StockLine:
+    def __init__(self, product_id: int, quantity: int, variant_id: Optional[int] = None):
+        self.product_id = product_id
+        self.quantity = quantity
+        self.variant_id = variant_id
+
+
+class StockShortage:
+    def __init__(self, line: StockLine, name: str, available: int):
+        self.line = line
+        self.name = name
+        self.available = max(available, 0)
+
+    def __str__(self):
+        if self.available:
+            return f'Only {self.available} of {self.name} left in stock'
+        return f'{self.name} is out of stock'
+
+
+class InsufficientStock(Exception):
+    """Raised when one or more order lines cannot be covered by stock"""
+
+    def __init__(self, shortages: List[StockShortage]):
+        self.shortages = shortages
+        super().__init__('; '.join(str(shortage) for shortage in shortages))
+
+
+class _Shortfall(Exception):
+    pass
+
+
+def lines_from_cart(cart_items) -> List[StockLine]:
+    return [StockLine(item.product_id, item.quantity, item.variant_id) for item in cart_items]
+
+
+def _demand_case(demand: Counter, conditions) -> Case:
+    return Case(
+        *[When(conditions[key], then=Value(quantity)) for key, quantity in demand.items()],
+        default=Value(0),
+        output_field=IntegerField()
+    )
+
+
+def _take_stock(model, demand: Counter, mirror_field: str) -> bool:
+    """Decrement stock and its CSV mirror field for every row in one UPDATE"""
+    if not demand:
+        return True
+    by_pk = {pk: Q(pk=pk) for pk in demand}
+    covered = reduce(or_, (Q(pk=pk, stock_quantity__gte=quantity) for pk, quantity in demand.items()))
+    remaining = Greatest(F('stock_quantity') - _demand_case(demand, by_pk), Value(0))
+    updated = model.objects.filter(pk__in=list(demand)).filter(
+        covered | Q(inventory_policy=ALLOW_BACKORDER)
+    ).update(stock_quantity=remaining, **{mirror_field: remaining})
+    return updated == len(demand)
+
+
+def _sync_card_stock(product_ids) -> None:
+    """Match the listing cards' in_stock flag to the products' new stock"""
+    if not product_ids:
+        return
+    in_stock = Exists(Product.objects.filter(
+        Q(stock_quantity__gt=0) | Q(quantity__gt=0), pk=OuterRef('product_id')
+    ))
+    changed = ProductCard.objects.filter(product_id__in=list(product_ids)).exclude(
+        in_stock=in_stock
+    ).update(in_stock=in_stock)
+    if changed:
+        bump_version(CATALOG_VERSION)
+
+
+def _find_shortages(lines: List[StockLine], product_demand: Counter,
+                    variant_demand: Counter) -> List[StockShortage]:
+    """Lines whose product or variant stock cannot cover the order"""
+    products = {
+        row['pk']: row for row in Product.objects.filter(pk__in=list(product_demand)).values(
+            'pk', 'name', 'stock_quantity', 'inventory_policy'
+        )
+    }
+    variants = {
+        row['pk']: row for row in ProductVariant.objects.filter(pk__in=list(variant_demand)).values(
+            'pk', 'stock_quantity', 'inventory_policy'
+        )
+    }
+
+    shortages = []
+    for line in lines:
+        product = products.get(line.product_id)
+        if product is None:
+            shortages.append(StockShortage(line, f'Product #{line.product_id}', 0))
+            continue
+
+        available = None
+        if product['inventory_policy'] != ALLOW_BACKORDER and product['stock_quantity'] < product_demand[line.product_id]:
+            available = product['stock_quantity']
+        variant = variants.get(line.variant_id)
+        if line.variant_id is not None and (
+            variant is None
+            or variant['inventory_policy'] != ALLOW_BACKORDER and variant['stock_quantity'] < variant_demand[line.variant_id]
+        ):
+            variant_available = variant['stock_quantity'] if variant else 0
+            available = variant_available if available is None else min(available, variant_available)
+
+        if available is not None:
+            shortages.append(StockShortage(line, product['name'], available))
+    return shortages
+
+
+def _demand(lines: List[StockLine]):
+    product_demand = Counter()
+    variant_demand = Counter()
+    for line in lines:
+        product_demand[line.product_id] += line.quantity
+        if line.variant_id is not None:
+            variant_demand[line.variant_id] += line.quantity
+    return product_demand, variant_demand
+
+
+def check_stock(lines: Iterable[StockLine]) -> None:
+    """Raise InsufficientStock if the lines cannot be covered right now; takes nothing"""
+    lines = [line for line in lines if line.quantity > 0]
+    shortages = _find_shortages(lines, *_demand(lines))
+    if shortages:
+        raise InsufficientStock(shortages)
+
+
+def reserve_stock(lines: Iterable[StockLine]) -> None:
+    """
+    Take stock for all order lines, or nothing at all.
+    Must run inside the order transaction; raises InsufficientStock.
+    """
+    lines = [line for line in lines if line.quantity > 0]
+    product_demand, variant_demand = _demand(lines)
+
+    try:
+        with transaction.atomic():
+            if not _take_stock(Product, product_demand, 'quantity'):
+                raise _Shortfall
+            if not _take_stock(ProductVariant, variant_demand, 'inventory_quantity'):
+                raise _Shortfall
+            _sync_card_stock(product_demand)
+    except _Shortfall:
+        shortages = _find_shortages(lines, product_demand, variant_demand)
+        logger.info(f'Stock reservation failed for {len(shortages)} line(s)')
+        raise InsufficientStock(shortages)
+
+
+def _return_stock(model, demand: Counter, mirror_field: str):
+    if not demand:
+        return
+    by_pk = {pk: Q(pk=pk) for pk in demand}
+    returned = F('stock_quantity') + _demand_case(demand, by_pk)
+    model.objects.filter(pk__in=list(demand)).update(stock_quantity=returned, **{mirror_field: returned})
+
+
+def release_stock(lines: Iterable[StockLine]) -> None:
+    """Add the units of the lines back, one UPDATE per table"""
+    lines = [line for line in lines if line.quantity > 0]
+    product_demand, variant_demand = _demand(lines)
+    with transaction.atomic():
+        _return_stock(Product, product_demand, 'quantity')
+        _return_stock(ProductVariant, variant_demand, 'inventory_quantity')
+        _sync_card_stock(product_demand)
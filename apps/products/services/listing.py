@@ -0,0 +1,112 @@
+"""
+Shared filtering and sorting for product listing pages.
+
+Listing views, the search page, the facet service and the JSON API all
+read the same query-string filters, so they are normalized and applied
+here in one place.
+"""
+
+from typing import Dict, Iterable
+
+from django.db.models import Q
+
+# Stored selling price (discount/sale price applied), see Product.refresh_pricing
+PRICE_FIELD = 'effective_price'
+
+MULTI_VALUE_FILTERS = ('price_range', 'categories', 'occasions', 'vendors', 'brands')
+SINGLE_VALUE_FILTERS = ('filter', 'stock', 'min_rating')
+
+PRICE_RANGES = {
+    '0-500': Q(**{f'{PRICE_FIELD}__lt': 500}),
+    '500-1000': Q(**{f'{PRICE_FIELD}__gte': 500, f'{PRICE_FIELD}__lt': 1000}),
+    '1000-2000': Q(**{f'{PRICE_FIELD}__gte': 1000, f'{PRICE_FIELD}__lt': 2000}),
+    '2000+': Q(**{f'{PRICE_FIELD}__gte': 2000}),
+}
+
+QUICK_FILTERS = {
+    'featured': Q(is_featured=True),
+    'bestseller': Q(is_bestseller=True),
+    'under_500': Q(**{f'{PRICE_FIELD}__lt': 500}),
+    'under_1000': Q(**{f'{PRICE_FIELD}__lt': 1000}),
+    'under_2000': Q(**{f'{PRICE_FIELD}__lt': 2000}),
+}
+
+# Every ordering ends with the primary key so it is a total order, which
+# keeps offset pages stable and lets keyset pagination seek on it.
+SORT_ORDERINGS = {
+    'price_low': [PRICE_FIELD, 'pk'],
+    'price_high': [f'-{PRICE_FIELD}', '-pk'],
+    'newest': ['-created_at', '-pk'],
+    'name_asc': ['name', 'pk'],
+    'name_desc': ['-name', '-pk'],
+    'popularity': ['-popularity_score', '-pk'],
+    'rating': ['-rating_avg', '-rating_count', '-pk'],
+}
+DEFAULT_SORT = 'popularity'
+
+
+def normalize_filters(params) -> Dict:
+    """
+    Reduce a QueryDict (or dict of lists) to the filters that affect results.
+    Values are de-duplicated and sorted so equivalent URLs compare equal.
+    """
+    filters = {}
+    for key in MULTI_VALUE_FILTERS:
+        values = params.getlist(key) if hasattr(params, 'getlist') else params.get(key, [])
+        values = sorted({value for value in values if value})
+        if values:
+            filters[key] = values
+    for key in SINGLE_VALUE_FILTERS:
+        value = params.get(key)
+        if isinstance(value, (list, tuple)):
+            value = value[-1] if value else None
+        if value:
+            filters[key] = value
+    return filters
+
+
+def apply_filters(queryset, filters: Dict, skip: Iterable[str] = ()):
+    """Apply normalized filters, leaving out any keys listed in `skip`"""
+    skip = set(skip)
+
+    quick = filters.get('filter')
+    if quick in QUICK_FILTERS and 'filter' not in skip:
+        queryset = queryset.filter(QUICK_FILTERS[quick])
+
+    if 'price_range' not in skip:
+        price_q = Q()
+        for price_range in filters.get('price_range', []):
+            if price_range in PRICE_RANGES:
+                price_q |= PRICE_RANGES[price_range]
+        if price_q:
+            queryset = queryset.filter(price_q)
+
+    if filters.get('categories') and 'categories' not in skip:
+        queryset = queryset.filter(category__slug__in=filters['categories'])
+
+    if filters.get('occasions') and 'occasions' not in skip:
+        queryset = queryset.filter(occasions__slug__in=filters['occasions'])
+
+    if filters.get('vendors') and 'vendors' not in skip:
+        queryset = queryset.filter(vendor__in=filters['vendors'])
+
+    if filters.get('brands') and 'brands' not in skip:
+        queryset = queryset.filter(brand__in=filters['brands'])
+
+    stock = filters.get('stock')
+    if 'stock' not in skip:
+        if stock == 'in_stock':
+            queryset = queryset.filter(stock_quantity__gt=0)
+        elif stock == 'out_of_stock':
+            queryset = queryset.filter(stock_quantity=0)
+
+    # Star filter ("4 stars & up") on the stored review average
+    min_rating = filters.get('min_rating')
+    if min_rating in ('1', '2', '3', '4', '5') and 'min_rating' not in skip:
+        queryset = queryset.filter(rating_avg__gte=int(min_rating))
+
+    return queryset
+
+
+def apply_sorting(queryset, sort_by: str = DEFAULT_SORT):
+    return queryset.order_by(*SORT_ORDERINGS.get(sort_by, SORT_ORDERINGS[DEFAULT_SORT]))
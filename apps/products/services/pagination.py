@@ -0,0 +1,190 @@
+"""
+Keyset (cursor) pagination for product listings.
+
+Instead of OFFSET, each page continues from the sort-key values of the last
+row on the previous page, so page 400 costs the same index range scan as
+page 1. Cursors are signed, opaque tokens carrying the sort name, the key
+values and the direction.
+"""
+
+import hashlib
+import json
+import logging
+from typing import List, Optional
+
+from django.core import signing
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+
+from apps.core.versioning import get_version
+from apps.products.models import Product
+from apps.products.services.listing import DEFAULT_SORT, SORT_ORDERINGS
+from apps.products.services.product_cards import CATALOG_VERSION
+
+logger = logging.getLogger(__name__)
+
+CURSOR_SALT = 'products.listing.cursor'
+COUNT_CACHE_TIMEOUT = 900  # 15 minutes
+COUNT_CACHE_KEY = 'product_listing_count_{}_{}'
+
+
+class InvalidCursor(Exception):
+    """Raised for tampered, malformed or mismatched cursor tokens"""
+
+
+def sort_keys(sort: str) -> List[tuple]:
+    """(field, descending) pairs for a sort, always ending in the primary key"""
+    ordering = SORT_ORDERINGS.get(sort, SORT_ORDERINGS[DEFAULT_SORT])
+    return [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+
+
+def sort_fields(sort: str) -> List[str]:
+    """Model fields a row needs loaded for its cursor to be encoded"""
+    return [field for field, _ in sort_keys(sort) if field != 'pk']
+
+
+def _encode_value(value):
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _decode_value(field: str, value):
+    if value is None:
+        return None
+    model_field = Product._meta.pk if field == 'pk' else Product._meta.get_field(field)
+    return model_field.to_python(value)
+
+
+def encode_cursor(obj, sort: str, direction: str = 'next') -> str:
+    values = [_encode_value(getattr(obj, field)) for field, _ in sort_keys(sort)]
+    return signing.dumps(
+        {'s': sort, 'v': values, 'd': 'p' if direction == 'previous' else 'n'},
+        salt=CURSOR_SALT,
+        compress=True
+    )
+
+
+def decode_cursor(token: str, sort: str):
+    """Return (key values, direction) for a cursor issued for this sort"""
+    try:
+        payload = signing.loads(token, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise InvalidCursor('Cursor signature does not match')
+
+    keys = sort_keys(sort)
+    if not isinstance(payload, dict) or payload.get('s') != sort or len(payload.get('v', [])) != len(keys):
+        raise InvalidCursor('Cursor was issued for a different sort')
+
+    try:
+        values = [_decode_value(field, value) for (field, _), value in zip(keys, payload['v'])]
+    except Exception:
+        raise InvalidCursor('Cursor values are malformed')
+    return values, ('previous' if payload.get('d') == 'p' else 'next')
+
+
+def _seek_filter(keys: List[tuple], values: list, forward: bool) -> Q:
+    """
+    Rows strictly after (or before) the given key values in sort order:
+    (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ... with per-key direction.
+    """
+    condition = Q()
+    equal_so_far = Q()
+    for (field, descending), value in zip(keys, values):
+        # Walking forward over a descending key means smaller values next
+        lookup = 'lt' if descending == forward else 'gt'
+        condition |= equal_so_far & Q(**{f'{field}__{lookup}': value})
+        equal_so_far &= Q(**{field: value})
+    return condition
+
+
+class KeysetPage:
+    def __init__(self, object_list, sort, has_next, has_previous):
+        self.object_list = object_list
+        self.sort = sort
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        if self.has_next and self.object_list:
+            return encode_cursor(self.object_list[-1], self.sort, 'next')
+        return None
+
+    @property
+    def previous_cursor(self) -> Optional[str]:
+        if self.has_previous and self.object_list:
+            return encode_cursor(self.object_list[0], self.sort, 'previous')
+        return None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """Paginate a product queryset by seeking on the sort key"""
+
+    def __init__(self, queryset, sort: str, per_page: int):
+        self.queryset = queryset
+        self.sort = sort if sort in SORT_ORDERINGS else DEFAULT_SORT
+        self.per_page = per_page
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        keys = sort_keys(self.sort)
+        ordering = [f"{'-' if descending else ''}{field}" for field, descending in keys]
+
+        if not cursor:
+            rows = list(self.queryset.order_by(*ordering)[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], self.sort, len(rows) > self.per_page, False)
+
+        values, direction = decode_cursor(cursor, self.sort)
+        forward = direction == 'next'
+        if not forward:
+            ordering = [f"{'' if descending else '-'}{field}" for field, descending in keys]
+
+        queryset = self.queryset.filter(_seek_filter(keys, values, forward)).order_by(*ordering)
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if forward:
+            return KeysetPage(rows, self.sort, has_more, True)
+        rows.reverse()
+        return KeysetPage(rows, self.sort, True, has_more)
+
+
+def approximate_count(queryset) -> int:
+    """
+    Cheap row count for cursor-paginated listings. PostgreSQL uses the
+    planner's row estimate; other databases use an exact count cached
+    until the catalog changes.
+    """
+    try:
+        sql, params = queryset.order_by().query.get_compiler(using=queryset.db).as_sql()
+    except Exception:
+        return 0
+
+    if connection.vendor == 'postgresql':
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+        except Exception as e:
+            logger.warning(f'Falling back to exact count: {str(e)}')
+
+    digest = hashlib.md5(f'{sql}{params}'.encode('utf-8')).hexdigest()
+    key = COUNT_CACHE_KEY.format(get_version(CATALOG_VERSION), digest)
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count
@@ -0,0 +1,105 @@
+"""
+In-memory pincode directory.
+
+The whole Pincode table is held per worker as a sorted integer array of
+pincodes with parallel arrays of indices into interned area, district, city
+and state tables, plus delivery days and a serviceable flag. Exact lookups
+and prefix suggestions are binary searches over the pincode array, so
+checkout and product-page pincode entry never touch the database. The
+directory is rebuilt when the serviceability version stamp is bumped.
+"""
+
+import bisect
+import logging
+from array import array
+from typing import Dict, List, Optional
+
+from apps.core.versioning import VersionedSnapshot
+from apps.products.services.serviceability import SERVICEABILITY_VERSION
+
+logger = logging.getLogger(__name__)
+
+PINCODE_LENGTH = 6
+MAX_SUGGESTIONS = 10
+
+
+class PincodeDirectory:
+    def __init__(self, rows):
+        self.codes = array('I')
+        self.days = array('B')
+        self.serviceable = array('B')
+        self.columns = {name: array('I') for name in ('area', 'district', 'city', 'state')}
+        self.strings = []
+        interned = {}
+
+        def intern(value):
+            if value not in interned:
+                interned[value] = len(self.strings)
+                self.strings.append(value)
+            return interned[value]
+
+        for code, area, district, city, state, delivery_days, serviceable in rows:
+            self.codes.append(int(code))
+            self.days.append(min(delivery_days, 255))
+            self.serviceable.append(serviceable)
+            for name, value in zip(('area', 'district', 'city', 'state'), (area, district, city, state)):
+                self.columns[name].append(intern(value))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _entry(self, position: int) -> Dict:
+        entry = {
+            name: self.strings[indices[position]] for name, indices in self.columns.items()
+        }
+        entry.update({
+            'pincode': f'{self.codes[position]:06d}',
+            'delivery_days': self.days[position],
+            'serviceable': bool(self.serviceable[position]),
+        })
+        return entry
+
+    def get(self, pincode: str) -> Optional[Dict]:
+        if not pincode.isdigit() or len(pincode) != PINCODE_LENGTH:
+            return None
+        code = int(pincode)
+        position = bisect.bisect_left(self.codes, code)
+        if position < len(self.codes) and self.codes[position] == code:
+            return self._entry(position)
+        return None
+
+    def suggest(self, prefix: str, limit: int = MAX_SUGGESTIONS) -> List[Dict]:
+        """Pincodes starting with a digit prefix, in ascending order"""
+        if not prefix.isdigit() or len(prefix) > PINCODE_LENGTH:
+            return []
+        scale = 10 ** (PINCODE_LENGTH - len(prefix))
+        start = bisect.bisect_left(self.codes, int(prefix) * scale)
+        end = min(bisect.bisect_left(self.codes, (int(prefix) + 1) * scale), start + limit)
+        return [self._entry(position) for position in range(start, end)]
+
+
+def build_pincode_directory() -> PincodeDirectory:
+    from apps.users.models import Pincode
+
+    rows = Pincode.objects.order_by('pincode').values_list(
+        'pincode', 'area', 'district', 'city', 'state', 'delivery_days', 'is_serviceable', 'is_active'
+    )
+    directory = PincodeDirectory(
+        (code, area, district, city, state, delivery_days, serviceable and active)
+        for code, area, district, city, state, delivery_days, serviceable, active in rows.iterator(chunk_size=5000)
+        if code.isdigit() and len(code) == PINCODE_LENGTH
+    )
+    logger.info(f'Built pincode directory with {len(directory)} pincodes')
+    return directory
+
+
+_snapshot = VersionedSnapshot(SERVICEABILITY_VERSION, build_pincode_directory)
+
+
+def lookup_pincode(pincode: str) -> Optional[Dict]:
+    """Directory entry for a pincode, or None if unknown"""
+    return _snapshot.get().get(pincode)
+
+
+def suggest_pincodes(prefix: str, limit: int = MAX_SUGGESTIONS) -> List[Dict]:
+    return _snapshot.get().suggest(prefix, limit)
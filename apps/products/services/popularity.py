@@ -0,0 +1,173 @@
+"""
+Time-decayed popularity score.
+
+Product.popularity_score is fed incrementally by demand signals: order
+lines and wishlist adds update the column directly, detail views are
+buffered per process and flushed in one statement. A periodic rollup
+(the rollup-popularity job or `rollup_popularity`) multiplies every score by
+the decay for the time actually elapsed since the previous rollup, so older
+demand fades with a fixed half-life however the runs are spaced. The
+popularity listing sort is then a single scan of the indexed column.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from typing import Dict, Iterable
+
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils import timezone
+
+from apps.products.models import Product
+
+logger = logging.getLogger(__name__)
+
+HALF_LIFE_HOURS = 72
+# JobSchedule row that remembers when scores were last decayed
+ROLLUP_SCHEDULE = 'rollup-popularity'
+
+WEIGHTS = {
+    'view': 1.0,
+    'wishlist': 3.0,
+    'order': 10.0,
+}
+# Large quantities on one order line (corporate gifting) are capped
+MAX_ORDER_QUANTITY = 5
+
+# Buffered detail views are written at most this often per process
+VIEW_FLUSH_INTERVAL = 30  # seconds
+VIEW_FLUSH_SIZE = 200
+
+# Scores that have decayed below this are reset to zero
+MIN_SCORE = 0.01
+
+_pending_views = Counter()
+_pending_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def decay_factor(hours: float) -> float:
+    """Multiplier that ages a score by the given number of hours"""
+    return 0.5 ** (hours / HALF_LIFE_HOURS)
+
+
+def record_event(product_id: int, kind: str, quantity: int = 1) -> None:
+    """Add a demand signal to a product's score"""
+    weight = WEIGHTS[kind] * min(max(quantity, 1), MAX_ORDER_QUANTITY)
+    Product.objects.filter(pk=product_id).update(popularity_score=F('popularity_score') + weight)
+
+
+def record_order_lines(order_items: Iterable) -> None:
+    """Add the demand of several order lines with one statement"""
+    increments = Counter()
+    for item in order_items:
+        increments[item.product_id] += WEIGHTS['order'] * min(max(item.quantity, 1), MAX_ORDER_QUANTITY)
+    try:
+        with transaction.atomic():
+            _apply_increments(increments)
+    except Exception as e:
+        logger.error(f'Error recording order popularity: {str(e)}')
+
+
+def _apply_increments(increments: Dict[int, float]) -> None:
+    if not increments:
+        return
+    Product.objects.filter(pk__in=list(increments)).update(
+        popularity_score=F('popularity_score') + Case(
+            *[When(pk=product_id, then=Value(weight)) for product_id, weight in increments.items()],
+            default=Value(0.0),
+            output_field=FloatField()
+        )
+    )
+
+
+def flush_views() -> int:
+    """Write buffered detail views; returns the number of products updated"""
+    global _last_flush
+    with _pending_lock:
+        views = dict(_pending_views)
+        _pending_views.clear()
+        _last_flush = time.monotonic()
+
+    try:
+        _apply_increments({product_id: count * WEIGHTS['view'] for product_id, count in views.items()})
+    except Exception as e:
+        logger.error(f'Error flushing product view counts: {str(e)}')
+        return 0
+    return len(views)
+
+
+def record_view(product_id: int) -> None:
+    """Count a detail view; writes are batched per process"""
+    with _pending_lock:
+        _pending_views[product_id] += 1
+        due = (
+            len(_pending_views) >= VIEW_FLUSH_SIZE
+            or time.monotonic() - _last_flush >= VIEW_FLUSH_INTERVAL
+        )
+    if due:
+        flush_views()
+
+
+def decay_scores(hours: float) -> int:
+    """Age every score by the elapsed interval; returns rows updated"""
+    with transaction.atomic():
+        updated = Product.objects.filter(popularity_score__gt=0).update(
+            popularity_score=F('popularity_score') * decay_factor(hours)
+        )
+        Product.objects.filter(popularity_score__gt=0, popularity_score__lt=MIN_SCORE).update(
+            popularity_score=0
+        )
+    return updated
+
+
+def rollup_scores() -> int:
+    """Decay every score by the time elapsed since the previous rollup"""
+    from apps.core.jobs import claim_elapsed
+
+    with transaction.atomic():
+        elapsed = claim_elapsed(ROLLUP_SCHEDULE)
+        if not elapsed:
+            # First rollup, or another one is running
+            return 0
+        return decay_scores(elapsed.total_seconds() / 3600)
+
+
+def rebuild_scores(days: int = 30) -> int:
+    """
+    Recompute scores from order lines and wishlist adds of the last `days`
+    days, each decayed by its age. Detail views are not stored, so they are
+    not part of a rebuild.
+    """
+    from apps.orders.models import OrderItem
+    from apps.users.models import Wishlist
+
+    now = timezone.now()
+    since = now - timedelta(days=days)
+    scores = Counter()
+
+    def add(product_id, kind, created_at, quantity=1):
+        hours = (now - created_at).total_seconds() / 3600
+        scores[product_id] += WEIGHTS[kind] * min(max(quantity, 1), MAX_ORDER_QUANTITY) * decay_factor(hours)
+
+    order_lines = OrderItem.objects.filter(order__created_at__gte=since).exclude(
+        order__status__in=('cancelled', 'refunded')
+    ).values_list('product_id', 'quantity', 'order__created_at')
+    for product_id, quantity, created_at in order_lines.iterator(chunk_size=2000):
+        add(product_id, 'order', created_at, quantity)
+
+    wishlist = Wishlist.objects.filter(created_at__gte=since).values_list('product_id', 'created_at')
+    for product_id, created_at in wishlist.iterator(chunk_size=2000):
+        add(product_id, 'wishlist', created_at)
+
+    with transaction.atomic():
+        Product.objects.filter(popularity_score__gt=0).update(popularity_score=0)
+        product_ids = sorted(scores)
+        for start in range(0, len(product_ids), 500):
+            batch = product_ids[start:start + 500]
+            _apply_increments({product_id: scores[product_id] for product_id in batch})
+    logger.info(f'Rebuilt popularity scores for {len(scores)} products')
+    return len(scores)
@@ -0,0 +1,166 @@
+"""
+Product card read model.
+
+Listing pages render product grids from ProductCard rows instead of the
+wide Product row plus its images and reviews. These helpers build and
+refresh the cards and attach them to listing querysets. Every card write
+bumps the catalog version stamp, which per-process indexes and cached
+listing data are keyed on.
+"""
+
+import logging
+from decimal import Decimal
+from typing import Iterable, List, Optional
+
+from apps.core.versioning import bump_version
+from apps.products.models import Product, ProductCard, ProductImage
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION = 'catalog'
+
+CARD_FIELDS = [
+    'slug', 'name', 'price', 'mrp', 'discount_percentage', 'primary_image_url',
+    'in_stock', 'category_slug', 'average_rating', 'review_count',
+]
+
+
+def _image_url(image: Optional[ProductImage]) -> str:
+    if not image:
+        return ''
+    try:
+        return image.image_url or (image.image.url if image.image else '')
+    except ValueError:
+        return ''
+
+
+def _primary_image_url(product_id: int) -> str:
+    images = ProductImage.objects.filter(product_id=product_id, is_active=True).order_by(
+        '-is_primary', 'sort_order', 'position'
+    )
+    return _image_url(images.first())
+
+
+def build_card(product: Product, image_url: str) -> ProductCard:
+    """Build an unsaved card from a product and its precomputed image URL"""
+    price = product.current_price or Decimal('0')
+    if product.mrp and product.mrp > price:
+        mrp = product.mrp
+    elif product.base_price and product.base_price > price:
+        mrp = product.base_price
+    else:
+        mrp = price
+
+    return ProductCard(
+        product=product,
+        slug=product.slug,
+        name=product.name,
+        price=price,
+        mrp=mrp,
+        discount_percentage=product.discount_percentage,
+        primary_image_url=image_url,
+        in_stock=product.is_in_stock,
+        category_slug=product.category.slug if product.category_id else '',
+        average_rating=product.rating_avg,
+        review_count=product.rating_count,
+    )
+
+
+def sync_product_card(product: Product) -> ProductCard:
+    """Create or refresh the card for a single product"""
+    # Image and rating columns are maintained by queryset updates and may
+    # be stale on the saved instance
+    product.refresh_from_db(fields=Product.MAINTAINED_FIELDS)
+    card = build_card(product, product.primary_image_url)
+    card.save()
+    bump_version(CATALOG_VERSION)
+    return card
+
+
+def refresh_card_image(product_id: int) -> str:
+    """Refresh the stored primary image URL on the product and its card"""
+    image_url = _primary_image_url(product_id)
+    Product.objects.filter(pk=product_id).exclude(primary_image_url=image_url).update(
+        primary_image_url=image_url
+    )
+    ProductCard.objects.filter(product_id=product_id).update(primary_image_url=image_url)
+    bump_version(CATALOG_VERSION)
+    return image_url
+
+
+def refresh_card_rating(product_id: int) -> None:
+    """Refresh the product's review aggregates (and card rating) after a Review change"""
+    from apps.products.services.ratings import refresh_product_rating
+
+    refresh_product_rating(product_id)
+    bump_version(CATALOG_VERSION)
+
+
+def rebuild_product_cards(queryset=None, batch_size: int = 500) -> int:
+    """Rebuild cards in batches; returns the number of cards written"""
+    if queryset is None:
+        queryset = Product.objects.all()
+    product_ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+
+    written = 0
+    for start in range(0, len(product_ids), batch_size):
+        batch_ids = product_ids[start:start + batch_size]
+        products = Product.objects.filter(pk__in=batch_ids).select_related('category').prefetch_related('images')
+
+        cards = []
+        stale_images = []
+        for product in products:
+            image_url = _image_url(product.primary_image)
+            if product.primary_image_url != image_url:
+                product.primary_image_url = image_url
+                stale_images.append(product)
+            cards.append(build_card(product, image_url))
+
+        if stale_images:
+            Product.objects.bulk_update(stale_images, ['primary_image_url'])
+
+        ProductCard.objects.bulk_create(
+            cards,
+            update_conflicts=True,
+            unique_fields=['product'],
+            update_fields=CARD_FIELDS + ['updated_at'],
+        )
+        written += len(cards)
+
+    bump_version(CATALOG_VERSION)
+    return written
+
+
+def with_cards(queryset, *product_fields):
+    """
+    Narrow a product listing queryset to the id plus its card columns.
+    Extra product fields (e.g. sort keys for pagination cursors) can be kept.
+    """
+    return queryset.select_related('card').only(
+        'pk', *product_fields, *[f'card__{field}' for field in CARD_FIELDS]
+    )
+
+
+def cards_for(products: Iterable[Product]) -> List[ProductCard]:
+    """Return cards for an evaluated page of products, in the same order"""
+    products = list(products)
+    cards = {}
+    for product in products:
+        try:
+            cards[product.pk] = product.card
+        except ProductCard.DoesNotExist:
+            pass
+
+    missing = [product.pk for product in products if product.pk not in cards]
+    if missing:
+        # Products created with bulk_create() have no card until their first
+        # save. Build them in one pass; a card that matches its product
+        # changes nothing that is cached, so the catalog version stays put.
+        logger.info(f'Building {len(missing)} missing product card(s)')
+        built = [
+            build_card(product, product.primary_image_url)
+            for product in Product.objects.filter(pk__in=missing).select_related('category')
+        ]
+        ProductCard.objects.bulk_create(built, ignore_conflicts=True)
+        cards.update((card.product_id, card) for card in built)
+    return [cards[product.pk] for product in products if product.pk in cards]
@@ -0,0 +1,174 @@
+"""
+Cached context for the product detail page.
+
+The product-specific parts of the page (images, variants, reviews,
+frequently-bought-together products) are cached as one bundle per product,
+keyed by a per-product version stamp that is bumped on Product,
+ProductImage, ProductVariant and Review saves (and by the recommendations
+rebuild).
+Sections shared between products (related products for a category,
+bestsellers, featured categories, add-ons) are keyed by the catalog
+version. All bundles and version stamps are read in two cache round trips.
+"""
+
+import logging
+from typing import Dict
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from apps.core.versioning import bump_version, get_versions
+from apps.products.models import Category, Product, ProductAddOn
+from apps.products.services.product_cards import CATALOG_VERSION
+from apps.products.services.recommendations import RECOMMENDATIONS_VERSION, bought_together
+
+logger = logging.getLogger(__name__)
+
+CACHE_TIMEOUT = 3600  # 1 hour (invalidated earlier by version bumps)
+PRODUCT_VERSION = 'product:{}'
+PRODUCT_BUNDLE_KEY = 'product_detail_{}_{}_{}'
+CATEGORY_BUNDLE_KEY = 'product_detail_category_{}_{}'
+SHARED_BUNDLE_KEY = 'product_detail_shared_{}'
+
+RELATED_LIMIT = 6
+RECOMMENDED_LIMIT = 4
+REVIEW_LIMIT = 10
+
+
+def product_version(product_id: int) -> str:
+    return PRODUCT_VERSION.format(product_id)
+
+
+def bump_product_version(product_id: int) -> None:
+    """Invalidate the cached detail bundle for a product"""
+    bump_version(product_version(product_id))
+
+
+def build_product_bundle(product: Product) -> Dict:
+    from apps.reviews.models import Review
+
+    # Evaluated querysets, so they can stand in for prefetch_related results
+    images = product.images.all()
+    variants = product.variants.all()
+    list(images)
+    list(variants)
+
+    reviews = list(Review.objects.filter(
+        product=product,
+        is_approved=True,
+        is_active=True
+    ).select_related('user').defer('user__password')[:REVIEW_LIMIT])
+
+    return {
+        'images': images,
+        'variants': variants,
+        'product_reviews': reviews,
+        'bought_together': bought_together([product.pk], RELATED_LIMIT),
+    }
+
+
+def build_category_bundle(category_id: int) -> Dict:
+    """Candidates for the related/recommended sections, one extra to allow excluding the product itself"""
+    in_stock = Product.objects.filter(
+        category_id=category_id,
+        is_active=True,
+        published=True,
+        stock_quantity__gt=0
+    )
+    return {
+        'related_products': list(
+            in_stock.select_related('category').prefetch_related('images')[:RELATED_LIMIT + 1]
+        ),
+        'recommended_products': list(
+            in_stock.filter(Q(is_bestseller=True) | Q(is_featured=True))[:RECOMMENDED_LIMIT + 1]
+        ),
+    }
+
+
+def build_shared_bundle() -> Dict:
+    products = Product.objects.filter(
+        is_active=True,
+        published=True
+    ).select_related('category').prefetch_related('images')
+
+    # If no bestsellers, show featured products instead
+    bestsellers = list(products.filter(is_bestseller=True)[:8])
+    if not bestsellers:
+        bestsellers = list(products.filter(is_featured=True)[:8])
+
+    return {
+        'recommended_categories': list(Category.objects.filter(
+            is_featured=True,
+            is_active=True,
+            products__is_active=True
+        ).distinct()[:6]),
+        'bestseller_products': bestsellers,
+        'available_addons': list(ProductAddOn.objects.filter(is_active=True)[:6]),
+    }
+
+
+def get_detail_context(product: Product) -> Dict:
+    """
+    Cached detail-page context for a product. The product's images and
+    variants are attached as prefetched results, so template access to
+    product.all_images / product.variants.all does not query either.
+    """
+    namespace = product_version(product.pk)
+    versions = get_versions(namespace, CATALOG_VERSION, RECOMMENDATIONS_VERSION)
+    keys = {
+        'product': PRODUCT_BUNDLE_KEY.format(
+            product.pk, versions[namespace], versions[RECOMMENDATIONS_VERSION]
+        ),
+        'category': CATEGORY_BUNDLE_KEY.format(product.category_id, versions[CATALOG_VERSION]),
+        'shared': SHARED_BUNDLE_KEY.format(versions[CATALOG_VERSION]),
+    }
+    builders = {
+        'product': lambda: build_product_bundle(product),
+        'category': lambda: build_category_bundle(product.category_id),
+        'shared': build_shared_bundle,
+    }
+
+    found = cache.get_many(list(keys.values()))
+    bundles = {}
+    missing = {}
+    for name, key in keys.items():
+        if key in found:
+            bundles[name] = found[key]
+        else:
+            bundles[name] = missing[key] = builders[name]()
+    if missing:
+        cache.set_many(missing, CACHE_TIMEOUT)
+
+    product_bundle = bundles['product']
+    product._prefetched_objects_cache = {
+        'images': product_bundle['images'],
+        'variants': product_bundle['variants'],
+    }
+
+    # Co-purchased products first, topped up from the same category
+    together = product_bundle['bought_together']
+    category_bundle = bundles['category']
+    related = together + [
+        candidate for candidate in category_bundle['related_products']
+        if candidate.pk != product.pk and candidate not in together
+    ]
+    recommended = together[:RECOMMENDED_LIMIT] or [
+        candidate for candidate in category_bundle['recommended_products'] if candidate.pk != product.pk
+    ][:RECOMMENDED_LIMIT]
+
+    context = {
+        'product_images': product.all_images,
+        'product_variants': sorted(
+            (variant for variant in product_bundle['variants'] if variant.is_active),
+            key=lambda variant: variant.sort_order
+        ),
+        'product_reviews': product_bundle['product_reviews'],
+        'reviews_count': product.rating_count,
+        'average_rating': product.rating_avg,
+        'rating_distribution': product.rating_distribution,
+        'frequently_bought_together': together,
+        'related_products': related[:RELATED_LIMIT],
+        'recommended_products': recommended,
+    }
+    context.update(bundles['shared'])
+    return context
@@ -0,0 +1,89 @@
+"""
+Materialized review aggregates.
+
+Product.rating_avg, rating_count and the rating_1..rating_5 distribution
+are recomputed from approved reviews whenever a review is created, edited,
+approved or deleted, and copied onto the product card in the same
+transaction. Pages and listings read the stored columns instead of
+aggregating reviews per request.
+"""
+
+import logging
+from decimal import Decimal
+from typing import Dict, Iterable
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from apps.products.models import Product, ProductCard
+
+logger = logging.getLogger(__name__)
+
+STARS = range(1, 6)
+
+
+def _summary_aggregates() -> Dict:
+    aggregates = {'count': Count('id'), 'total': Sum('rating')}
+    for stars in STARS:
+        aggregates[f'rating_{stars}'] = Count('id', filter=Q(rating=stars))
+    return aggregates
+
+
+def _rating_values(row: Dict) -> Dict:
+    count = row['count'] or 0
+    values = {
+        'rating_count': count,
+        'rating_avg': round(Decimal(row['total']) / count, 1) if count else Decimal('0'),
+    }
+    for stars in STARS:
+        values[f'rating_{stars}'] = row[f'rating_{stars}'] or 0
+    return values
+
+
+def _approved_reviews():
+    from apps.reviews.models import Review
+
+    return Review.objects.filter(is_approved=True, is_active=True)
+
+
+def refresh_product_rating(product_id: int) -> Dict:
+    """Recompute and store the review aggregates for one product"""
+    with transaction.atomic():
+        # Serialize concurrent review writes for the same product
+        if not list(Product.objects.select_for_update().filter(pk=product_id).values_list('pk', flat=True)):
+            return {}
+
+        values = _rating_values(_approved_reviews().filter(product_id=product_id).aggregate(
+            **_summary_aggregates()
+        ))
+        Product.objects.filter(pk=product_id).update(**values)
+        ProductCard.objects.filter(product_id=product_id).update(
+            average_rating=values['rating_avg'],
+            review_count=values['rating_count']
+        )
+    return values
+
+
+def rebuild_product_ratings(product_ids: Iterable[int] = None) -> int:
+    """Recompute aggregates for many products with one grouped query; returns rows updated"""
+    products = Product.objects.all()
+    if product_ids is not None:
+        products = products.filter(pk__in=list(product_ids))
+
+    reviews = _approved_reviews().filter(product__in=products)
+    rows = {
+        row['product_id']: _rating_values(row)
+        for row in reviews.values('product_id').annotate(**_summary_aggregates())
+    }
+    empty = _rating_values({'count': 0, 'total': 0, **{f'rating_{stars}': 0 for stars in STARS}})
+
+    updated = []
+    for product in products.only('pk'):
+        for field, value in rows.get(product.pk, empty).items():
+            setattr(product, field, value)
+        updated.append(product)
+
+    fields = list(empty)
+    with transaction.atomic():
+        Product.objects.bulk_update(updated, fields, batch_size=500)
+    return len(updated)
@@ -0,0 +1,145 @@
+"""
+"Frequently bought together" recommendations from order history.
+
+An offline job scans OrderItem rows grouped by order and counts how often
+each pair of products was bought together. Pair counts are kept in a
+sparse counter keyed by a packed integer (low id << 64 | high id; ids are
+64-bit BigAutoField values), so
+memory grows with the number of distinct pairs rather than products
+squared. Each product's top-K neighbours by cosine similarity are then
+written to ProductRecommendation, which pages read with one indexed query.
+"""
+
+import heapq
+import logging
+import math
+from array import array
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import transaction
+from django.db.models import Sum
+
+from apps.core.versioning import bump_version
+from apps.products.models import Product, ProductRecommendation
+
+logger = logging.getLogger(__name__)
+
+RECOMMENDATIONS_VERSION = 'recommendations'
+
+DEFAULT_TOP_K = 12
+# Orders in these states never turned into a purchase
+EXCLUDED_ORDER_STATUSES = ('cancelled', 'refunded')
+# Very large baskets (bulk/corporate orders) say little about affinity and
+# cost O(n^2) pairs, so only their first products are counted
+MAX_BASKET_SIZE = 50
+
+# Product ids are BigAutoField values, so each half of a pair key is 64 bits
+PAIR_SHIFT = 64
+PAIR_MASK = (1 << PAIR_SHIFT) - 1
+
+
+def count_co_purchases(chunk_size: int = 2000) -> Tuple[Counter, Counter]:
+    """
+    Per-product order counts and per-pair co-purchase counts.
+    Order lines are streamed in order_id order, chunk_size rows at a time.
+    """
+    from apps.orders.models import OrderItem
+
+    item_counts = Counter()
+    pair_counts = Counter()
+
+    def count_basket(basket):
+        products = sorted(basket)[:MAX_BASKET_SIZE]
+        item_counts.update(products)
+        for i, a in enumerate(products):
+            for b in products[i + 1:]:
+                pair_counts[(a << PAIR_SHIFT) | b] += 1
+
+    rows = OrderItem.objects.exclude(
+        order__status__in=EXCLUDED_ORDER_STATUSES
+    ).order_by('order_id').values_list('order_id', 'product_id')
+
+    current_order = None
+    basket = set()
+    for order_id, product_id in rows.iterator(chunk_size=chunk_size):
+        if order_id != current_order:
+            count_basket(basket)
+            basket = set()
+            current_order = order_id
+        basket.add(product_id)
+    count_basket(basket)
+
+    return item_counts, pair_counts
+
+
+def top_neighbours(item_counts: Counter, pair_counts: Counter, top_k: int = DEFAULT_TOP_K,
+                   min_support: int = 1) -> Dict[int, List[Tuple[float, int]]]:
+    """Top-K (score, product id) neighbours per product, best first"""
+    neighbour_ids = defaultdict(lambda: array('Q'))
+    neighbour_scores = defaultdict(lambda: array('f'))
+
+    for key, together in pair_counts.items():
+        if together < min_support:
+            continue
+        a, b = key >> PAIR_SHIFT, key & PAIR_MASK
+        score = together / math.sqrt(item_counts[a] * item_counts[b])
+        neighbour_ids[a].append(b)
+        neighbour_scores[a].append(score)
+        neighbour_ids[b].append(a)
+        neighbour_scores[b].append(score)
+
+    # Ties go to the lower product id so rebuilds are deterministic
+    return {
+        product_id: heapq.nlargest(
+            top_k, zip(neighbour_scores[product_id], ids), key=lambda pair: (pair[0], -pair[1])
+        )
+        for product_id, ids in neighbour_ids.items()
+    }
+
+
+def rebuild_recommendations(top_k: int = DEFAULT_TOP_K, chunk_size: int = 2000,
+                            min_support: int = 1) -> int:
+    """Recompute the recommendation table; returns the number of rows written"""
+    item_counts, pair_counts = count_co_purchases(chunk_size)
+    neighbours = top_neighbours(item_counts, pair_counts, top_k, min_support)
+    logger.info(
+        f'Co-purchase scan: {len(item_counts)} products, {len(pair_counts)} pairs'
+    )
+
+    # Order history can reference products deleted since
+    existing = set(Product.objects.values_list('pk', flat=True))
+    rows = [
+        ProductRecommendation(product_id=product_id, recommended_id=recommended_id, score=score, rank=rank)
+        for product_id, ranked in neighbours.items() if product_id in existing
+        for rank, (score, recommended_id) in enumerate(ranked, start=1)
+        if recommended_id in existing
+    ]
+
+    with transaction.atomic():
+        ProductRecommendation.objects.all().delete()
+        ProductRecommendation.objects.bulk_create(rows, batch_size=1000)
+    bump_version(RECOMMENDATIONS_VERSION)
+    return len(rows)
+
+
+def bought_together(product_ids: Iterable[int], limit: int = 6) -> List[Product]:
+    """
+    Available products most often bought with any of the given products,
+    excluding the products themselves. One query on the (product, rank) index.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return []
+    return list(
+        Product.objects.filter(
+            recommended_with__product_id__in=product_ids,
+            is_active=True,
+            published=True,
+            stock_quantity__gt=0
+        ).exclude(
+            pk__in=product_ids
+        ).annotate(
+            co_purchase_score=Sum('recommended_with__score')
+        ).order_by('-co_purchase_score', 'pk').select_related('category').prefetch_related('images')[:limit]
+    )
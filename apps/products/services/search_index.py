@@ -0,0 +1,267 @@
+"""
+Product full-text search index.
+
+SQLite databases use an FTS5 virtual table ranked with bm25(); PostgreSQL
+uses a weighted tsvector column with a GIN index ranked with ts_rank().
+Any other backend falls back to the old icontains scan.
+
+Every query word must match (AND semantics) and each word is matched as a
+prefix so partially typed words still find products. The index tables are
+created and filled by migration 0009 and kept current by the product
+signals; rebuild_search_index rebuilds them from scratch.
+
+search_products() applies the match as a subquery of a product queryset,
+so result sets are not capped and the caller paginates as usual.
+"""
+
+import logging
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import OrderBy, RawSQL
+from django.utils.html import strip_tags
+
+from apps.products.models import Product
+
+logger = logging.getLogger(__name__)
+
+SQLITE_TABLE = 'products_search_fts'
+POSTGRES_TABLE = 'products_search_document'
+POSTGRES_CONFIG = 'simple'
+
+# Column order matters for FTS5 - bm25() weights are positional
+FTS_COLUMNS = ['name', 'sku', 'tags', 'category', 'brand', 'vendor', 'description']
+FTS_WEIGHTS = {
+    'name': 10.0,
+    'sku': 6.0,
+    'tags': 4.0,
+    'category': 3.0,
+    'brand': 2.0,
+    'vendor': 2.0,
+    'description': 1.0,
+}
+
+_BM25 = 'bm25({}, {})'.format(SQLITE_TABLE, ', '.join(str(FTS_WEIGHTS[column]) for column in FTS_COLUMNS))
+
+INDEX_BATCH_SIZE = 500
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query: str) -> List[str]:
+    """Split a search string into lowercase word tokens"""
+    return TOKEN_RE.findall((query or '').lower())
+
+
+def backend_name() -> str:
+    if connection.vendor in ('sqlite', 'postgresql'):
+        return connection.vendor
+    return 'fallback'
+
+
+def _document(product: Product) -> dict:
+    """Searchable text for a product, keyed by FTS column"""
+    description = ' '.join(
+        part for part in (product.description, strip_tags(product.body_html or '')) if part
+    )
+    return {
+        'name': product.name or '',
+        'sku': product.sku or '',
+        'tags': (product.tags or '').replace(',', ' '),
+        'category': product.category.name if product.category_id else '',
+        'brand': product.brand or '',
+        'vendor': product.vendor or '',
+        'description': description,
+    }
+
+
+# ============================================
+# INDEXING
+# ============================================
+
+_POSTGRES_VECTOR = (
+    f"setweight(to_tsvector('{POSTGRES_CONFIG}', %s), 'A') || "
+    f"setweight(to_tsvector('{POSTGRES_CONFIG}', %s), 'B') || "
+    f"setweight(to_tsvector('{POSTGRES_CONFIG}', %s), 'C') || "
+    f"setweight(to_tsvector('{POSTGRES_CONFIG}', %s), 'D')"
+)
+
+
+def _postgres_params(product_id: int, doc: dict) -> list:
+    return [
+        product_id,
+        doc['name'],
+        ' '.join([doc['sku'], doc['tags']]),
+        ' '.join([doc['category'], doc['brand'], doc['vendor']]),
+        doc['description'],
+    ]
+
+
+def index_documents(products: Iterable[Product]) -> int:
+    """Write the documents of loaded products (migrations pass historical instances)"""
+    backend = backend_name()
+    if backend == 'fallback':
+        return 0
+
+    rows = [(product.pk, _document(product)) for product in products]
+    if not rows:
+        return 0
+
+    with connection.cursor() as cursor:
+        if backend == 'sqlite':
+            cursor.executemany(
+                f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s",
+                [(product_id,) for product_id, _ in rows]
+            )
+            placeholders = ', '.join(['%s'] * (len(FTS_COLUMNS) + 1))
+            cursor.executemany(
+                f"INSERT INTO {SQLITE_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) VALUES ({placeholders})",
+                [[product_id] + [doc[column] for column in FTS_COLUMNS] for product_id, doc in rows]
+            )
+        else:
+            cursor.executemany(
+                f"INSERT INTO {POSTGRES_TABLE} (product_id, document) VALUES (%s, {_POSTGRES_VECTOR}) "
+                "ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document",
+                [_postgres_params(product_id, doc) for product_id, doc in rows]
+            )
+    return len(rows)
+
+
+def index_product(product: Product) -> None:
+    """Add or refresh one product in the index"""
+    index_documents([product])
+
+
+def index_products(product_ids: Iterable[int]) -> int:
+    """Re-index a set of products (e.g. after a category rename)"""
+    products = Product.objects.filter(pk__in=list(product_ids)).select_related('category')
+    return index_documents(products)
+
+
+def remove_product(product_id: int) -> None:
+    backend = backend_name()
+    if backend == 'fallback':
+        return
+    table = SQLITE_TABLE if backend == 'sqlite' else POSTGRES_TABLE
+    key = 'rowid' if backend == 'sqlite' else 'product_id'
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {key} = %s", [product_id])
+
+
+def rebuild_index(batch_size: int = INDEX_BATCH_SIZE) -> int:
+    """Drop and rebuild the whole index; returns the number of products indexed"""
+    backend = backend_name()
+    if backend == 'fallback':
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SQLITE_TABLE if backend == 'sqlite' else POSTGRES_TABLE}")
+
+    product_ids = list(Product.objects.order_by('pk').values_list('pk', flat=True))
+    indexed = 0
+    for start in range(0, len(product_ids), batch_size):
+        indexed += index_products(product_ids[start:start + batch_size])
+    return indexed
+
+
+# ============================================
+# QUERYING
+# ============================================
+
+def _fts5_query(tokens: List[str]) -> str:
+    return ' AND '.join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+
+
+def _tsquery(tokens: List[str]) -> str:
+    return ' & '.join(f"{token}:*" for token in tokens)
+
+
+def _match_sql(tokens: List[str]) -> Tuple[str, str]:
+    """SQL selecting the ids of matching products, and its parameter"""
+    if backend_name() == 'sqlite':
+        return f"SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s", _fts5_query(tokens)
+    return (
+        f"SELECT product_id FROM {POSTGRES_TABLE} "
+        f"WHERE document @@ to_tsquery('{POSTGRES_CONFIG}', %s)"
+    ), _tsquery(tokens)
+
+
+def _relevance(tokens: List[str]) -> OrderBy:
+    """Best-match-first ordering for a queryset filtered by _match_sql()"""
+    product_id = f'{connection.ops.quote_name(Product._meta.db_table)}.{connection.ops.quote_name("id")}'
+    if backend_name() == 'sqlite':
+        rank = RawSQL(
+            f"SELECT {_BM25} FROM {SQLITE_TABLE} "
+            f"WHERE {SQLITE_TABLE} MATCH %s AND rowid = {product_id}",
+            [_fts5_query(tokens)], output_field=FloatField()
+        )
+        return rank.asc()
+    rank = RawSQL(
+        f"SELECT ts_rank(document, to_tsquery('{POSTGRES_CONFIG}', %s)) FROM {POSTGRES_TABLE} "
+        f"WHERE product_id = {product_id}",
+        [_tsquery(tokens)], output_field=FloatField()
+    )
+    return rank.desc()
+
+
+def search_products(queryset, query: str):
+    """
+    Narrow a product queryset to matches for every word of the query.
+    Returns (queryset, relevance ordering); the ordering is None on the
+    fallback backend. A query without searchable words matches nothing.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset.none(), None
+    if backend_name() == 'fallback':
+        return _fallback_filter(queryset, tokens), None
+    sql, param = _match_sql(tokens)
+    return queryset.filter(pk__in=RawSQL(sql, [param])), _relevance(tokens)
+
+
+def search_product_ids(query: str, limit: Optional[int] = None) -> Optional[List[int]]:
+    """
+    Return product ids matching every word of the query, best match first.
+    Returns None for a blank query and [] when it has no searchable words.
+    """
+    if not (query or '').strip():
+        return None
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    backend = backend_name()
+    if backend == 'fallback':
+        ids = _fallback_filter(Product.objects.all(), tokens).values_list('pk', flat=True).distinct()
+        return list(ids[:limit] if limit else ids)
+
+    sql, param = _match_sql(tokens)
+    if backend == 'sqlite':
+        sql += f" ORDER BY {_BM25}"
+    else:
+        sql += f" ORDER BY ts_rank(document, to_tsquery('{POSTGRES_CONFIG}', %s)) DESC"
+    params = [param] if backend == 'sqlite' else [param, param]
+    if limit:
+        sql += " LIMIT %s"
+        params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fallback_filter(queryset, tokens: List[str]):
+    for token in tokens:
+        queryset = queryset.filter(
+            Q(name__icontains=token) |
+            Q(sku__icontains=token) |
+            Q(tags__icontains=token) |
+            Q(category__name__icontains=token) |
+            Q(brand__icontains=token) |
+            Q(vendor__icontains=token) |
+            Q(description__icontains=token) |
+            Q(body_html__icontains=token)
+        )
+    return queryset
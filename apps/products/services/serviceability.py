@@ -0,0 +1,125 @@
+"""
+Pincode serviceability.
+
+Each worker keeps a map from serviceable pincode to its delivery days and
+the active seller locations that deliver there (primary locations first),
+built from SellerLocation.serviceable_pincodes and rebuilt when the
+serviceability version stamp is bumped. Answering "can this product reach
+this pincode" is then a dictionary lookup plus, for serviceable pincodes,
+one query for the product's seller inventory. Unknown or unserviceable
+pincodes are answered without touching the database.
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+from apps.core.versioning import VersionedSnapshot, bump_version
+from apps.products.models import SellerInventory
+
+logger = logging.getLogger(__name__)
+
+SERVICEABILITY_VERSION = 'serviceability'
+
+
+class ServiceArea:
+    """Delivery days and serving locations for one pincode"""
+
+    __slots__ = ('delivery_days', 'location_ids')
+
+    def __init__(self, delivery_days: int, location_ids: Tuple[int, ...] = ()):
+        self.delivery_days = delivery_days
+        self.location_ids = location_ids
+
+
+class ServiceabilityIndex:
+    def __init__(self, areas: Dict[str, ServiceArea], locations: Dict):
+        self.areas = areas
+        self.locations = locations
+
+    def area(self, pincode: str) -> Optional[ServiceArea]:
+        return self.areas.get(pincode)
+
+
+def build_serviceability_index() -> ServiceabilityIndex:
+    from apps.users.models import Pincode, SellerLocation
+
+    areas = {
+        code: ServiceArea(delivery_days)
+        for code, delivery_days in Pincode.objects.filter(
+            is_serviceable=True, is_active=True
+        ).values_list('pincode', 'delivery_days').iterator(chunk_size=5000)
+    }
+
+    locations = {
+        location.pk: location
+        for location in SellerLocation.objects.filter(
+            is_active=True, seller__is_active=True
+        ).only('id', 'name', 'city', 'state', 'pincode', 'is_primary')
+    }
+
+    served = {}
+    links = SellerLocation.serviceable_pincodes.through.objects.filter(
+        sellerlocation_id__in=list(locations)
+    ).order_by(
+        '-sellerlocation__is_primary', 'sellerlocation__name'
+    ).values_list('pincode__pincode', 'sellerlocation_id')
+    for code, location_id in links.iterator(chunk_size=5000):
+        if code in areas:
+            served.setdefault(code, []).append(location_id)
+    for code, location_ids in served.items():
+        areas[code].location_ids = tuple(location_ids)
+
+    logger.info(f'Built serviceability index with {len(areas)} pincodes, {len(locations)} locations')
+    return ServiceabilityIndex(areas, locations)
+
+
+_snapshot = VersionedSnapshot(SERVICEABILITY_VERSION, build_serviceability_index)
+
+
+def invalidate_serviceability() -> None:
+    bump_version(SERVICEABILITY_VERSION)
+
+
+def get_service_area(pincode: str) -> Optional[ServiceArea]:
+    """Delivery days and serving locations for a pincode, or None if not serviceable"""
+    return _snapshot.get().area(pincode)
+
+
+def check_availability(product, pincode: str, variant=None, quantity: int = 1):
+    """
+    (is_available, seller_location, available_quantity, delivery_days) for
+    delivering `quantity` of a product to a pincode.
+
+    The first serving location (primary first) with enough unreserved stock
+    wins. Products that are not stocked at any seller location are
+    fulfilled centrally from Product/ProductVariant stock.
+    """
+    index = _snapshot.get()
+    area = index.area(pincode)
+    if area is None:
+        return False, None, 0, None
+
+    rows = SellerInventory.objects.filter(product_id=product.pk, is_active=True)
+    if variant is not None:
+        rows = rows.filter(variant_id=variant.pk)
+    else:
+        rows = rows.filter(variant__isnull=True)
+    stock = {
+        location_id: stock_quantity - reserved_quantity
+        for location_id, stock_quantity, reserved_quantity in rows.values_list(
+            'seller_location_id', 'stock_quantity', 'reserved_quantity'
+        )
+    }
+
+    if not stock:
+        item = variant if variant is not None else product
+        available = item.stock_quantity
+        if item.inventory_policy == 'continue' or available >= quantity:
+            return True, None, available, area.delivery_days
+        return False, None, available, area.delivery_days
+
+    for location_id in area.location_ids:
+        available = stock.get(location_id, 0)
+        if available >= quantity:
+            return True, index.locations[location_id], available, area.delivery_days
+    return False, None, 0, area.delivery_days
@@ -0,0 +1,131 @@
+"""
+Listing engine for taxonomy pages (occasions, menu categories, product
+types, collections, recipients and delivery locations).
+
+A taxonomy slug is resolved once to the taxonomy row plus the set of
+matching product ids and cached until the catalog version changes. Slugs
+without a taxonomy row (menu links generated from item names) fall back
+to the full-text search index instead of an icontains scan.
+"""
+
+import logging
+from typing import List, Optional
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from apps.core.versioning import get_version
+from apps.products.models import (
+    Collection, DeliveryLocation, MenuCategory, Occasion, Product, ProductType, Recipient
+)
+from apps.products.services.product_cards import CATALOG_VERSION
+from apps.products.services.search_index import search_product_ids
+
+logger = logging.getLogger(__name__)
+
+CACHE_TIMEOUT = 3600  # 1 hour (invalidated earlier by catalog version bumps)
+CACHE_KEY = 'taxonomy_listing_{}_{}_{}'
+
+# Larger id sets are not inlined into an IN (...) list; the view filters
+# through the relation instead.
+MAX_CACHED_IDS = 2000
+
+# Resolution strategies for a slug with no taxonomy row
+FALLBACK_NONE = 'none'
+FALLBACK_SEARCH = 'search'
+FALLBACK_ALL = 'all'
+
+
+class TaxonomySpec:
+    def __init__(self, model, relation: str, fallback: str = FALLBACK_SEARCH):
+        self.model = model
+        self.relation = relation
+        self.fallback = fallback
+
+    def product_filter(self, taxonomy) -> Q:
+        if self.model is MenuCategory:
+            # Menu categories map onto the product category with the same slug
+            return Q(category__slug=taxonomy.slug, category__is_active=True)
+        return Q(**{self.relation: taxonomy})
+
+
+TAXONOMIES = {
+    'occasion': TaxonomySpec(Occasion, 'occasions'),
+    'menu_category': TaxonomySpec(MenuCategory, 'category', fallback=FALLBACK_NONE),
+    'product_type': TaxonomySpec(ProductType, 'product_types'),
+    'collection': TaxonomySpec(Collection, 'collections'),
+    'recipient': TaxonomySpec(Recipient, 'recipients'),
+    'location': TaxonomySpec(DeliveryLocation, 'delivery_locations', fallback=FALLBACK_ALL),
+}
+
+# Resolved listings carry one of these scopes
+SCOPE_IDS = 'ids'
+SCOPE_RELATION = 'relation'
+SCOPE_ALL = 'all'
+SCOPE_NONE = 'none'
+
+
+class TaxonomyListing:
+    """Outcome of resolving a taxonomy slug"""
+
+    def __init__(self, kind: str, slug: str, taxonomy=None, scope: str = SCOPE_NONE,
+                 product_ids: Optional[List[int]] = None):
+        self.kind = kind
+        self.slug = slug
+        self.taxonomy = taxonomy
+        self.scope = scope
+        self.product_ids = product_ids or []
+
+    @property
+    def found(self) -> bool:
+        return self.taxonomy is not None
+
+    def products(self):
+        """Active, published products for this listing (unsorted, unfiltered)"""
+        queryset = Product.objects.filter(is_active=True, published=True)
+        if self.scope == SCOPE_IDS:
+            return queryset.filter(pk__in=self.product_ids)
+        if self.scope == SCOPE_RELATION:
+            return queryset.filter(TAXONOMIES[self.kind].product_filter(self.taxonomy)).distinct()
+        if self.scope == SCOPE_ALL:
+            return queryset
+        return queryset.none()
+
+
+def search_terms(kind: str, slug: str) -> str:
+    terms = slug.replace('-', ' ')
+    if kind == 'recipient' and terms.startswith('for '):
+        terms = terms[4:]
+    return terms
+
+
+def _resolve(kind: str, slug: str) -> TaxonomyListing:
+    spec = TAXONOMIES[kind]
+    taxonomy = spec.model.objects.filter(slug=slug, is_active=True).first()
+
+    if taxonomy is not None:
+        ids = list(
+            Product.objects.filter(
+                spec.product_filter(taxonomy), is_active=True, published=True
+            ).values_list('pk', flat=True).distinct()[:MAX_CACHED_IDS + 1]
+        )
+        if len(ids) > MAX_CACHED_IDS:
+            return TaxonomyListing(kind, slug, taxonomy, SCOPE_RELATION)
+        return TaxonomyListing(kind, slug, taxonomy, SCOPE_IDS, ids)
+
+    if spec.fallback == FALLBACK_ALL:
+        return TaxonomyListing(kind, slug, None, SCOPE_ALL)
+    if spec.fallback == FALLBACK_SEARCH:
+        ids = search_product_ids(search_terms(kind, slug), limit=MAX_CACHED_IDS) or []
+        return TaxonomyListing(kind, slug, None, SCOPE_IDS, ids)
+    return TaxonomyListing(kind, slug, None, SCOPE_NONE)
+
+
+def resolve_listing(kind: str, slug: str) -> TaxonomyListing:
+    """Resolve a taxonomy slug to its products, cached per catalog version"""
+    key = CACHE_KEY.format(kind, get_version(CATALOG_VERSION), slug)
+    listing = cache.get(key)
+    if listing is None:
+        listing = _resolve(kind, slug)
+        cache.set(key, listing, CACHE_TIMEOUT)
+    return listing
@@ -0,0 +1,153 @@
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+from apps.core.versioning import bump_version
+from .models import (
+    Category, Collection, DeliveryLocation, MenuCategory, Occasion, Product, ProductAddOn,
+    ProductCard, ProductImage, ProductType, ProductVariant, Recipient
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Product)
+def sync_card_on_product_save(sender, instance, raw=False, **kwargs):
+    """Keep the listing card in step with the product row"""
+    if raw:
+        return
+    from .services.product_cards import sync_product_card
+
+    try:
+        sync_product_card(instance)
+    except Exception as e:
+        logger.error(f'Error syncing product card for {instance.pk}: {str(e)}')
+
+
+@receiver(post_save, sender=Product)
+def index_product_on_save(sender, instance, raw=False, **kwargs):
+    """Incrementally re-index the product for full-text search"""
+    if raw:
+        return
+    from .services.search_index import index_product
+
+    try:
+        index_product(instance)
+    except Exception as e:
+        logger.error(f'Error indexing product {instance.pk} for search: {str(e)}')
+
+
+@receiver(post_delete, sender=Product)
+def remove_product_from_index(sender, instance, **kwargs):
+    from .services.product_cards import CATALOG_VERSION
+    from .services.search_index import remove_product
+
+    try:
+        remove_product(instance.pk)
+    except Exception as e:
+        logger.error(f'Error removing product {instance.pk} from the search index: {str(e)}')
+    bump_version(CATALOG_VERSION)
+
+
+@receiver(post_delete, sender=ProductImage)
+def refresh_primary_image_on_delete(sender, instance, **kwargs):
+    """Deleted image may have been the primary one (saves are handled in ProductImage.save)"""
+    from .services.product_cards import refresh_card_image
+
+    refresh_card_image(instance.product_id)
+
+
+@receiver(post_save, sender=Category)
+def sync_card_category_slug(sender, instance, created, raw=False, **kwargs):
+    """
+    Category slugs are copied onto cards; names and slugs also feed
+    suggestions and listings, so every category save is a catalog change
+    """
+    if raw:
+        return
+    from .services.product_cards import CATALOG_VERSION
+
+    if not created:
+        ProductCard.objects.filter(product__category=instance).exclude(
+            category_slug=instance.slug
+        ).update(category_slug=instance.slug)
+    bump_version(CATALOG_VERSION)
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_products(sender, instance, created, raw=False, **kwargs):
+    """Category names are part of the search document"""
+    if raw or created:
+        return
+    from .services.search_index import index_products
+
+    index_products(instance.products.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=MenuCategory)
+@receiver(post_delete, sender=MenuCategory)
+@receiver(post_save, sender=Occasion)
+@receiver(post_delete, sender=Occasion)
+@receiver(post_save, sender=ProductType)
+@receiver(post_delete, sender=ProductType)
+@receiver(post_save, sender=Collection)
+@receiver(post_delete, sender=Collection)
+@receiver(post_save, sender=Recipient)
+@receiver(post_delete, sender=Recipient)
+@receiver(post_save, sender=DeliveryLocation)
+@receiver(post_delete, sender=DeliveryLocation)
+def invalidate_taxonomy_listings(sender, instance, raw=False, **kwargs):
+    """Taxonomy rows (slug, active flag) decide which listing a slug resolves to"""
+    if raw:
+        return
+    from .services.product_cards import CATALOG_VERSION
+
+    bump_version(CATALOG_VERSION)
+
+
+@receiver(m2m_changed, sender=Product.occasions.through)
+@receiver(m2m_changed, sender=Product.product_types.through)
+@receiver(m2m_changed, sender=Product.collections.through)
+@receiver(m2m_changed, sender=Product.recipients.through)
+@receiver(m2m_changed, sender=Product.delivery_locations.through)
+def invalidate_taxonomy_membership(sender, action, **kwargs):
+    """Product/taxonomy links don't save the product, so bump explicitly"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    from .services.product_cards import CATALOG_VERSION
+
+    bump_version(CATALOG_VERSION)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_detail(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .services.product_detail import bump_product_version
+
+    bump_product_version(instance.pk)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def invalidate_product_detail_media(sender, instance, raw=False, **kwargs):
+    """Images and variants are part of the cached detail bundle"""
+    if raw:
+        return
+    from .services.product_detail import bump_product_version
+
+    bump_product_version(instance.product_id)
+
+
+@receiver(post_save, sender=ProductAddOn)
+@receiver(post_delete, sender=ProductAddOn)
+def invalidate_addons(sender, instance, raw=False, **kwargs):
+    """Add-ons are listed on every detail page"""
+    if raw:
+        return
+    from .services.product_cards import CATALOG_VERSION
+
+    bump_version(CATALOG_VERSION)
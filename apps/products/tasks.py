@@ -0,0 +1,17 @@
+from apps.core.jobs import shared_task
+
+
+@shared_task
+def rollup_popularity():
+    """Decay popularity scores by the time since the previous rollup"""
+    from apps.products.services.popularity import rollup_scores
+
+    return f'Decayed popularity scores for {rollup_scores()} products'
+
+
+@shared_task
+def build_recommendations():
+    """Recompute "frequently bought together" recommendations"""
+    from apps.products.services.recommendations import rebuild_recommendations
+
+    return f'Wrote {rebuild_recommendations()} product recommendations'
@@ -0,0 +1,68 @@
+from decimal import Decimal
+from django.db import transaction
+from django.test import TestCase
+from apps.products.models import Product, Category, ProductCard, ProductVariant
+from apps.products.services.inventory import InsufficientStock, StockLine, release_stock, reserve_stock
+
+
+class StockReservationTest(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Gifts", slug="gifts")
+        self.cake, self.roses = [
+            Product.objects.create(
+                name=name, slug=name.lower(), category=category, description=name,
+                base_price=Decimal('100'), stock_quantity=3, quantity=3, sku=name.upper()
+            )
+            for name in ('Cake', 'Roses')
+        ]
+        self.large = ProductVariant.objects.create(product=self.cake, name='1kg', inventory_quantity=1)
+
+    def reload(self, *objects):
+        for obj in objects:
+            obj.refresh_from_db()
+
+    def test_reserves_all_lines_in_one_statement_per_table(self):
+        lines = [StockLine(self.cake.pk, 1, self.large.pk), StockLine(self.cake.pk, 1), StockLine(self.roses.pk, 2)]
+        with self.assertNumQueries(5):  # savepoint, products, variants, cards, release
+            reserve_stock(lines)
+
+        self.reload(self.cake, self.roses, self.large)
+        self.assertEqual((self.cake.stock_quantity, self.cake.quantity), (1, 1))
+        self.assertEqual((self.roses.stock_quantity, self.roses.quantity), (1, 1))
+        self.assertEqual((self.large.stock_quantity, self.large.inventory_quantity), (0, 0))
+
+    def test_shortage_takes_nothing(self):
+        with self.assertRaises(InsufficientStock) as raised:
+            with transaction.atomic():
+                reserve_stock([StockLine(self.cake.pk, 2, self.large.pk), StockLine(self.roses.pk, 1)])
+
+        [shortage] = raised.exception.shortages
+        self.assertEqual((shortage.line.product_id, shortage.available), (self.cake.pk, 1))
+        self.assertEqual(str(shortage), 'Only 1 of Cake left in stock')
+        self.reload(self.cake, self.roses, self.large)
+        self.assertEqual((self.cake.stock_quantity, self.roses.stock_quantity, self.large.stock_quantity), (3, 3, 1))
+
+    def test_backorder_policy_allows_overselling(self):
+        Product.objects.filter(pk=self.roses.pk).update(inventory_policy='continue')
+        reserve_stock([StockLine(self.roses.pk, 5)])
+        self.reload(self.roses)
+        self.assertEqual(self.roses.stock_quantity, 0)
+
+    def test_release_returns_units(self):
+        lines = [StockLine(self.cake.pk, 1, self.large.pk), StockLine(self.roses.pk, 2)]
+        reserve_stock(lines)
+        with self.assertNumQueries(5):  # savepoint, products, variants, cards, release
+            release_stock(lines)
+
+        self.reload(self.cake, self.roses, self.large)
+        self.assertEqual((self.cake.stock_quantity, self.cake.quantity), (3, 3))
+        self.assertEqual((self.roses.stock_quantity, self.roses.quantity), (3, 3))
+        self.assertEqual((self.large.stock_quantity, self.large.inventory_quantity), (1, 1))
+
+    def test_cards_follow_stock_crossing_zero(self):
+        reserve_stock([StockLine(self.roses.pk, 3)])
+        self.assertFalse(ProductCard.objects.get(product=self.roses).in_stock)
+        self.assertTrue(ProductCard.objects.get(product=self.cake).in_stock)
+
+        release_stock([StockLine(self.roses.pk, 1)])
+        self.assertTrue(ProductCard.objects.get(product=self.roses).in_stock)
@@ -0,0 +1,169 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from apps.products.models import Product, Category, Collection, Occasion
+from apps.products.services.facets import get_facets
+from apps.products.services.listing import apply_filters, apply_sorting, normalize_filters
+from apps.products.services.taxonomy_listing import resolve_listing
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def make_product(category, sku, price, **extra):
+    return Product.objects.create(
+        name=f"Product {sku}", slug=sku.lower(), category=category,
+        description="Gift", base_price=Decimal(price), sku=sku, **extra
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class FacetServiceTest(TestCase):
+    def setUp(self):
+        self.cakes = Category.objects.create(name="Cakes", slug="cakes")
+        self.flowers = Category.objects.create(name="Flowers", slug="flowers")
+        self.birthday = Occasion.objects.create(name="Birthday", slug="birthday")
+        make_product(self.cakes, 'C1', '400', vendor='Bakery').occasions.add(self.birthday)
+        make_product(self.cakes, 'C2', '1500', vendor='Bakery')
+        make_product(self.flowers, 'F1', '300', vendor='Florist')
+        self.base = Product.objects.filter(is_active=True, published=True)
+
+    def test_counts_honour_other_filters(self):
+        """Each facet counts with every filter except its own applied"""
+        facets = get_facets(self.base, normalize_filters({'categories': ['cakes'], 'price_range': ['0-500']}))
+        self.assertEqual(
+            {row['slug']: row['product_count'] for row in facets['categories']},
+            {'cakes': 1, 'flowers': 1}
+        )
+        self.assertEqual(facets['price_counts']['under_500'], 1)
+        self.assertEqual(facets['price_counts']['1000_2000'], 1)
+        self.assertEqual(facets['occasions'], [{'slug': 'birthday', 'name': 'Birthday', 'product_count': 1}])
+        self.assertEqual(facets['vendors'], [{'name': 'Bakery', 'product_count': 1}])
+
+    def test_facets_cached_until_catalog_changes(self):
+        filters = normalize_filters({})
+        get_facets(self.base, filters)
+        with self.assertNumQueries(0):
+            get_facets(self.base, filters)
+
+        make_product(self.flowers, 'F2', '2500')
+        facets = get_facets(self.base, filters)
+        self.assertEqual(facets['price_counts']['above_2000'], 1)
+
+    def test_discounted_price_used_for_buckets_and_sorting(self):
+        sale = make_product(self.flowers, 'F9', '1200', discount_price=Decimal('450'))
+        self.assertEqual((sale.effective_price, sale.discount_pct), (Decimal('450'), 62))
+
+        cheap = apply_filters(self.base, normalize_filters({'price_range': ['0-500']}))
+        self.assertIn(sale, cheap)
+        ordered = list(apply_sorting(self.base, 'price_low').values_list('sku', flat=True))
+        self.assertEqual(ordered, ['F1', 'C1', 'F9', 'C2'])
+
+    def test_popularity_sort_follows_demand(self):
+        from apps.products.services.popularity import decay_scores, flush_views, record_event, record_view
+
+        record_event(Product.objects.get(sku='F1').pk, 'order', quantity=2)
+        record_view(Product.objects.get(sku='C2').pk)
+        flush_views()
+        ordered = list(apply_sorting(self.base, 'popularity').values_list('sku', flat=True))
+        self.assertEqual(ordered[:2], ['F1', 'C2'])
+
+        decay_scores(72)
+        self.assertEqual(Product.objects.get(sku='F1').popularity_score, 10.0)
+
+    def test_rollup_decays_by_elapsed_time(self):
+        from apps.core.models import JobSchedule
+        from apps.products.services.popularity import ROLLUP_SCHEDULE, record_event, rollup_scores
+
+        record_event(Product.objects.get(sku='F1').pk, 'order', quantity=2)
+        self.assertEqual(rollup_scores(), 0)  # first rollup only starts the clock
+        JobSchedule.objects.filter(name=ROLLUP_SCHEDULE).update(last_run_at=timezone.now() - timedelta(hours=144))
+        rollup_scores()
+        self.assertAlmostEqual(Product.objects.get(sku='F1').popularity_score, 5.0, places=3)
+
+    def test_listing_view_counts_once(self):
+        response = self.client.get(reverse('products:product_list'), {'categories': 'cakes'})
+        self.assertEqual(response.context['total_products'], 2)
+        self.assertEqual(response.context['price_counts']['under_500'], 1)
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Cakes", slug="cakes")
+        # Duplicate prices make the primary-key tiebreaker matter
+        for i in range(7):
+            make_product(category, f'K{i}', str(100 * (i // 2 + 1)), is_featured=(i % 3 == 0))
+
+    def walk(self, sort):
+        url = reverse('products:product_list_api')
+        seen, cursor = [], None
+        while True:
+            params = {'sort': sort, 'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            body = self.client.get(url, params).json()
+            seen.extend(product['sku'] for product in body['products'])
+            cursor = body['next_cursor']
+            if not cursor:
+                return seen
+
+    def test_cursor_walk_matches_offset_order(self):
+        from apps.products.services.listing import apply_sorting
+        for sort in ('price_low', 'price_high', 'newest', 'name_asc', 'popularity'):
+            expected = list(apply_sorting(Product.objects.all(), sort).values_list('sku', flat=True))
+            self.assertEqual(self.walk(sort), expected, sort)
+
+    def test_previous_cursor_returns_prior_page(self):
+        url = reverse('products:product_list_api')
+        first = self.client.get(url, {'sort': 'price_low', 'limit': 3}).json()
+        second = self.client.get(url, {'sort': 'price_low', 'limit': 3, 'cursor': first['next_cursor']}).json()
+        back = self.client.get(url, {'sort': 'price_low', 'limit': 3, 'cursor': second['previous_cursor']}).json()
+        self.assertEqual(back['products'], first['products'])
+
+    def test_tampered_cursor_rejected(self):
+        url = reverse('products:product_list_api')
+        first = self.client.get(url, {'limit': 3}).json()
+        response = self.client.get(url, {'limit': 3, 'cursor': first['next_cursor'] + 'x'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_html_listing_cursor_mode(self):
+        url = reverse('products:product_list')
+        for i in range(7, 15):
+            make_product(Category.objects.get(slug='cakes'), f'K{i}', '900')
+        response = self.client.get(url, {'sort': 'newest'})
+        next_url = response.context['next_page_url']
+        response = self.client.get(url + next_url)
+        self.assertIsNone(response.context['page_obj'])
+        self.assertEqual(len(response.context['products']), 3)
+        self.assertEqual(response.context['total_products'], 15)
+        self.assertIn('previous_page_url', response.context)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TaxonomyListingTest(TestCase):
+    def setUp(self):
+        self.cakes = Category.objects.create(name="Cakes", slug="cakes")
+        self.signature = Collection.objects.create(name="Signature", slug="signature")
+        self.boxed = make_product(self.cakes, 'C1', '400')
+        self.boxed.collections.add(self.signature)
+        make_product(self.cakes, 'C2', '900')
+
+    def test_resolved_ids_cached_until_membership_changes(self):
+        listing = resolve_listing('collection', 'signature')
+        self.assertEqual(listing.product_ids, [self.boxed.pk])
+        with self.assertNumQueries(0):
+            resolve_listing('collection', 'signature')
+
+        other = Product.objects.get(sku='C2')
+        other.collections.add(self.signature)
+        listing = resolve_listing('collection', 'signature')
+        self.assertEqual(sorted(listing.product_ids), sorted([self.boxed.pk, other.pk]))
+
+    def test_unknown_slug_falls_back_to_search(self):
+        response = self.client.get(
+            reverse('products:collection_detail', args=['product-c2']), {'sort': 'price_low'}
+        )
+        self.assertEqual([card.id for card in response.context['products']], [Product.objects.get(sku='C2').pk])
+        self.assertEqual(response.context['page_title'], 'Product C2')
+
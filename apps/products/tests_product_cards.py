@@ -0,0 +1,153 @@
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from apps.products.models import Product, Category, ProductImage, ProductCard
+from apps.core.versioning import get_version
+from apps.products.services.product_cards import CATALOG_VERSION, cards_for, rebuild_product_cards
+from apps.products.services.ratings import rebuild_product_ratings
+from apps.reviews.models import Review
+
+
+class ProductCardSyncTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Cakes", slug="cakes")
+        self.product = Product.objects.create(
+            name="Chocolate Cake",
+            slug="chocolate-cake",
+            category=self.category,
+            description="Rich chocolate cake",
+            base_price=Decimal('500.00'),
+            discount_price=Decimal('400.00'),
+            stock_quantity=5,
+            sku="CAKE001"
+        )
+
+    def test_card_created_with_product(self):
+        """Saving a product writes its card"""
+        card = ProductCard.objects.get(product=self.product)
+        self.assertEqual(card.price, Decimal('400.00'))
+        self.assertEqual(card.mrp, Decimal('500.00'))
+        self.assertEqual(card.discount_percentage, 20)
+        self.assertEqual(card.category_slug, 'cakes')
+        self.assertTrue(card.in_stock)
+
+    def test_card_follows_images_and_reviews(self):
+        """Image and review changes refresh the card"""
+        ProductImage.objects.create(product=self.product, image_url='https://example.com/a.jpg')
+        ProductImage.objects.create(product=self.product, image_url='https://example.com/b.jpg', is_primary=True)
+        user = get_user_model().objects.create_user(
+            username='reviewer', email='reviewer@example.com', password='x'
+        )
+        Review.objects.create(user=user, product=self.product, rating=4, title='Nice', comment='Tasty')
+
+        card = ProductCard.objects.get(product=self.product)
+        self.assertEqual(card.primary_image_url, 'https://example.com/b.jpg')
+        self.assertEqual(card.average_rating, Decimal('4.0'))
+        self.assertEqual(card.review_count, 1)
+
+    def test_rebuild_restores_missing_cards(self):
+        """The rebuild helper backfills cards that were never written"""
+        ProductCard.objects.all().delete()
+        self.assertEqual(rebuild_product_cards(), 1)
+        self.assertTrue(ProductCard.objects.filter(product=self.product).exists())
+
+    def test_missing_cards_built_without_bumping_the_catalog(self):
+        ProductCard.objects.all().delete()
+        version = get_version(CATALOG_VERSION)
+        with self.assertNumQueries(3):  # page, missing products, card insert
+            cards = cards_for(Product.objects.select_related('card'))
+        self.assertEqual([card.name for card in cards], ['Chocolate Cake'])
+        self.assertTrue(ProductCard.objects.filter(product=self.product).exists())
+        self.assertEqual(get_version(CATALOG_VERSION), version)
+
+    def test_listing_page_reads_cards(self):
+        """A listing page renders cards with a fixed number of queries"""
+        for i in range(11):
+            Product.objects.create(
+                name=f"Cake {i}", slug=f"cake-{i}", category=self.category,
+                description="Cake", base_price=Decimal('300.00'), sku=f"CAKE1{i:02d}"
+            )
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('products:product_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['products']), 12)
+        self.assertIsInstance(response.context['products'][0], ProductCard)
+        card_queries = [q for q in ctx.captured_queries if 'products_productcard' in q['sql']]
+        self.assertEqual(len(card_queries), 1)
+
+    def test_primary_image_url_stored_on_product(self):
+        """Image saves and deletes keep Product.primary_image_url current"""
+        first = ProductImage.objects.create(product=self.product, image_url='https://example.com/a.jpg')
+        primary = ProductImage.objects.create(
+            product=self.product, image_url='https://example.com/b.jpg', is_primary=True
+        )
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.primary_image_url, 'https://example.com/b.jpg')
+
+        primary.delete()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.primary_image_url, first.image_url)
+
+    def test_stale_save_keeps_primary_image_url(self):
+        ProductImage.objects.create(product=self.product, image_url='https://example.com/a.jpg')
+
+        # Each save re-reads the maintained columns, so start from a stale copy every time
+        for save_args in [(), (False, True)]:
+            stale = Product.objects.get(pk=self.product.pk)
+            stale.primary_image_url = ''
+            stale.name = 'Dark Chocolate Cake'
+            stale.save(*save_args)
+        stale.refresh_from_db()
+        self.assertEqual((stale.name, stale.primary_image_url), ('Dark Chocolate Cake', 'https://example.com/a.jpg'))
+        self.assertEqual(stale.card.primary_image_url, 'https://example.com/a.jpg')
+
+    def test_saving_a_deleted_product_inserts_it_again(self):
+        pk = self.product.pk
+        Product.objects.filter(pk=pk).delete()
+        self.product.save()
+        self.assertTrue(Product.objects.filter(pk=pk).exists())
+
+    def test_image_helpers_use_prefetched_images(self):
+        ProductImage.objects.create(product=self.product, image_url='https://example.com/a.jpg', sort_order=2)
+        ProductImage.objects.create(product=self.product, image_url='https://example.com/b.jpg', sort_order=1)
+        product = Product.objects.prefetch_related('images').get(pk=self.product.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(product.primary_image.image_url, 'https://example.com/b.jpg')
+            self.assertEqual(len(product.all_images), 2)
+
+    def test_rating_aggregates_follow_reviews(self):
+        """Create, approve and delete keep the stored aggregates exact"""
+        users = [
+            get_user_model().objects.create_user(username=f'u{i}', email=f'u{i}@example.com', password='x')
+            for i in range(3)
+        ]
+        Review.objects.create(user=users[0], product=self.product, rating=5, title='A', comment='A')
+        Review.objects.create(user=users[1], product=self.product, rating=4, title='B', comment='B')
+        pending = Review.objects.create(
+            user=users[2], product=self.product, rating=1, title='C', comment='C', is_approved=False
+        )
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_avg, self.product.rating_count), (Decimal('4.5'), 2))
+
+        pending.is_approved = True
+        pending.save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating_distribution, {5: 1, 4: 1, 3: 0, 2: 0, 1: 1})
+        self.assertEqual(self.product.card.average_rating, Decimal('3.3'))
+
+        # A stale instance saved afterwards does not write old aggregates back
+        stale = Product.objects.get(pk=self.product.pk)
+        pending.delete()
+        stale.save()
+        stale.refresh_from_db()
+        self.assertEqual(stale.rating_count, 2)
+
+        Product.objects.filter(pk=self.product.pk).update(rating_count=0)
+        rebuild_product_ratings()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating_count, 2)
+
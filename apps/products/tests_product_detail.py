@@ -0,0 +1,41 @@
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from apps.products.models import Product, Category, ProductImage
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ProductDetailCacheTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Cakes", slug="cakes")
+        self.product = Product.objects.create(
+            name="Chocolate Cake", slug="chocolate-cake", category=self.category,
+            description="Cake", base_price=Decimal('500.00'), stock_quantity=5, sku="CAKE001"
+        )
+        Product.objects.create(
+            name="Vanilla Cake", slug="vanilla-cake", category=self.category,
+            description="Cake", base_price=Decimal('450.00'), stock_quantity=5, sku="CAKE002"
+        )
+        ProductImage.objects.create(product=self.product, image_url='https://example.com/a.jpg')
+        self.url = reverse('products:product_detail', args=[self.product.slug])
+
+    def test_repeat_view_served_from_bundle(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        product_queries = [
+            q for q in ctx.captured_queries if q['sql'].startswith('SELECT') and 'products_' in q['sql']
+        ]
+        self.assertEqual(len(product_queries), 1)
+        self.assertEqual([p.slug for p in response.context['related_products']], ['vanilla-cake'])
+        self.assertEqual(len(response.context['product_images']), 1)
+
+    def test_image_save_invalidates_bundle(self):
+        self.client.get(self.url)
+        ProductImage.objects.create(product=self.product, image_url='https://example.com/b.jpg')
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context['product_images']), 2)
@@ -0,0 +1,58 @@
+from collections import Counter
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from apps.orders.models import Order, OrderItem
+from apps.products.models import Product, Category, ProductRecommendation
+from apps.products.services.recommendations import PAIR_SHIFT, bought_together, rebuild_recommendations, top_neighbours
+
+
+class CoPurchaseRecommendationTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='buyer', email='buyer@example.com', password='x'
+        )
+        category = Category.objects.create(name="Gifts", slug="gifts")
+        self.cake, self.roses, self.card, self.mug = [
+            Product.objects.create(
+                name=name, slug=name.lower(), category=category, description=name,
+                base_price=Decimal('100'), stock_quantity=5, sku=name.upper()
+            )
+            for name in ('Cake', 'Roses', 'Card', 'Mug')
+        ]
+
+    def place_order(self, *products, status='delivered'):
+        address = dict(
+            billing_name='B', billing_email='buyer@example.com', billing_phone='1',
+            billing_address_line_1='A', billing_city='C', billing_state='S', billing_pincode='110001',
+            shipping_name='B', shipping_phone='1', shipping_address_line_1='A', shipping_city='C',
+            shipping_state='S', shipping_pincode='110001',
+        )
+        order = Order.objects.create(
+            user=self.user, status=status, subtotal=Decimal('100'), total_amount=Decimal('100'), **address
+        )
+        for product in products:
+            OrderItem.objects.create(
+                order=order, product=product, product_name=product.name,
+                quantity=1, unit_price=product.base_price, total_price=product.base_price
+            )
+
+    def test_neighbours_ranked_by_co_purchase(self):
+        self.place_order(self.cake, self.roses)
+        self.place_order(self.cake, self.roses, self.card)
+        self.place_order(self.cake, self.card)
+        self.place_order(self.cake, self.mug, status='cancelled')
+
+        self.assertEqual(rebuild_recommendations(top_k=2, chunk_size=2), 6)
+        ranked = list(ProductRecommendation.objects.filter(product=self.roses).values_list('recommended', flat=True))
+        self.assertEqual(ranked, [self.cake.pk, self.card.pk])
+        self.assertFalse(ProductRecommendation.objects.filter(recommended=self.mug).exists())
+
+        with self.assertNumQueries(2):  # products + prefetched images
+            together = bought_together([self.roses.pk, self.card.pk])
+        self.assertEqual(together, [self.cake])
+
+    def test_pairs_of_ids_above_32_bits(self):
+        low, high = 2 ** 32 + 1, 2 ** 40
+        neighbours = top_neighbours(Counter({low: 2, high: 2}), Counter({(low << PAIR_SHIFT) | high: 2}))
+        self.assertEqual(neighbours, {low: [(1.0, high)], high: [(1.0, low)]})
@@ -0,0 +1,113 @@
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from apps.core.versioning import bump_version
+from apps.products.models import Product, Category, ProductCard
+from apps.products.services.product_cards import CATALOG_VERSION
+from apps.products.services.search_index import search_product_ids, rebuild_index
+
+
+class SearchIndexTest(TestCase):
+    def setUp(self):
+        self.flowers = Category.objects.create(name="Flowers", slug="flowers")
+        self.cakes = Category.objects.create(name="Cakes", slug="cakes")
+        self.roses = Product.objects.create(
+            name="Red Roses Bouquet", slug="red-roses", category=self.flowers,
+            description="Twelve fresh roses", base_price=Decimal('599.00'), sku="ROS-002"
+        )
+        self.cake = Product.objects.create(
+            name="Chocolate Truffle Cake", slug="truffle-cake", category=self.cakes,
+            description="Pairs well with red roses", base_price=Decimal('799.00'), sku="CAK-001"
+        )
+
+    def test_all_words_must_match(self):
+        self.assertEqual(search_product_ids('roses bouquet'), [self.roses.pk])
+        self.assertEqual(search_product_ids('roses chocolate'), [self.cake.pk])
+
+    def test_name_matches_rank_above_description(self):
+        self.assertEqual(search_product_ids('roses'), [self.roses.pk, self.cake.pk])
+
+    def test_prefix_and_sku_match(self):
+        self.assertEqual(search_product_ids('choc'), [self.cake.pk])
+        self.assertEqual(search_product_ids('ros-002'), [self.roses.pk])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.cake.name = "Vanilla Sponge Cake"
+        self.cake.save()
+        self.assertEqual(search_product_ids('chocolate'), [])
+        self.assertEqual(search_product_ids('vanilla'), [self.cake.pk])
+
+        self.flowers.name = "Fresh Blooms"
+        self.flowers.save()
+        self.assertEqual(search_product_ids('blooms'), [self.roses.pk])
+
+        self.roses.delete()
+        self.assertEqual(search_product_ids('bouquet'), [])
+
+    def test_rebuild_and_search_view(self):
+        self.assertEqual(rebuild_index(), 2)
+        response = self.client.get(reverse('products:search'), {'q': 'roses'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([card.id for card in response.context['products']], [self.roses.pk, self.cake.pk])
+
+    def test_queries_without_words_match_nothing(self):
+        self.assertEqual(search_product_ids('!!!'), [])
+        response = self.client.get(reverse('products:search'), {'q': '!!!'})
+        self.assertEqual(len(response.context['products']), 0)
+
+    def test_search_results_are_not_capped(self):
+        for index in range(30):
+            Product.objects.create(
+                name=f"Rose Box {index}", slug=f"rose-box-{index}", category=self.flowers,
+                description="Roses", base_price=Decimal('99.00'), sku=f"BOX-{index}"
+            )
+        response = self.client.get(reverse('products:search'), {'q': 'rose', 'page': 3})
+        self.assertEqual(response.context['products'].paginator.count, 32)
+        self.assertEqual(response.context['products'][-1].id, self.cake.pk)
+
+
+class AutocompleteIndexTest(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Flowers", slug="flowers")
+        self.roses = Product.objects.create(
+            name="Red Roses Bouquet", slug="red-roses", category=category,
+            description="Roses", base_price=Decimal('599.00'), sku="ROS-002"
+        )
+
+    def test_suggestions_served_from_memory(self):
+        url = reverse('products:search_suggestions')
+        response = self.client.get(url, {'q': 'red ro'})
+        self.assertEqual([s['slug'] for s in response.json()['suggestions']], ['red-roses'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'q': 'ros-0'})
+        self.assertEqual(response.json()['suggestions'][0]['category'], 'Flowers')
+
+    def test_products_without_cards_are_suggested(self):
+        ProductCard.objects.all().delete()
+        bump_version(CATALOG_VERSION)
+        response = self.client.get(reverse('products:search_suggestions'), {'q': 'red'})
+        self.assertEqual([s['slug'] for s in response.json()['suggestions']], ['red-roses'])
+
+    def test_index_refreshes_after_product_change(self):
+        url = reverse('products:search_suggestions')
+        self.client.get(url, {'q': 'red'})
+        self.roses.name = "White Lilies"
+        self.roses.save()
+        self.assertEqual(self.client.get(url, {'q': 'red'}).json()['suggestions'], [])
+        self.assertEqual(len(self.client.get(url, {'q': 'lil'}).json()['suggestions']), 1)
+
+    def test_index_refreshes_after_bulk_archive_and_category_rename(self):
+        url = reverse('products:search_suggestions')
+        self.assertEqual(self.client.get(url, {'q': 'red'}).json()['suggestions'][0]['category'], 'Flowers')
+        category = Category.objects.get(slug='flowers')
+        category.name = 'Blooms'
+        category.save()
+        self.assertEqual(self.client.get(url, {'q': 'red'}).json()['suggestions'][0]['category'], 'Blooms')
+
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.com', 'x'))
+        self.client.post(reverse('admin:products_product_changelist'), {
+            'action': 'mark_as_archived', '_selected_action': [self.roses.pk],
+        })
+        self.assertEqual(self.client.get(url, {'q': 'red'}).json()['suggestions'], [])
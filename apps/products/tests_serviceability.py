@@ -0,0 +1,87 @@
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from apps.products.models import Product, Category, SellerInventory
+from apps.products.services.pincode_directory import _snapshot as directory_snapshot
+from apps.products.services.serviceability import _snapshot
+from apps.users.models import Pincode, Seller, SellerLocation
+
+
+class PincodeServiceabilityTest(TestCase):
+    def setUp(self):
+        _snapshot.reset()
+        category = Category.objects.create(name="Gifts", slug="gifts")
+        self.cake, self.roses = [
+            Product.objects.create(
+                name=name, slug=name.lower(), category=category, description=name,
+                base_price=Decimal('100'), stock_quantity=3, sku=name.upper()
+            )
+            for name in ('Cake', 'Roses')
+        ]
+        user = get_user_model().objects.create_user(username='seller', email='s@example.com', password='x')
+        seller = Seller.objects.create(
+            user=user, business_name='Shop', business_email='s@example.com', business_phone='1'
+        )
+        self.store, self.warehouse = [
+            SellerLocation.objects.create(
+                seller=seller, name=name, address_line_1='A', city='Delhi', state='Delhi', pincode='110001',
+                contact_person='S', contact_phone='1', is_primary=is_primary
+            )
+            for name, is_primary in (('Store', True), ('Warehouse', False))
+        ]
+        self.delhi = Pincode.objects.create(pincode='110001', district='D', city='Delhi', state='Delhi', delivery_days=1)
+        Pincode.objects.create(pincode='560001', district='B', city='Bengaluru', state='KA', is_serviceable=False)
+        self.store.serviceable_pincodes.add(self.delhi)
+        self.warehouse.serviceable_pincodes.add(self.delhi)
+        SellerInventory.objects.create(seller_location=self.store, product=self.cake, stock_quantity=1, reserved_quantity=1)
+        SellerInventory.objects.create(seller_location=self.warehouse, product=self.cake, stock_quantity=4)
+
+    def test_unserviceable_pincode_answered_from_memory(self):
+        _snapshot.get()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cake.check_availability_by_pincode('560001'), (False, None, 0, None))
+            self.assertEqual(self.cake.check_availability_by_pincode('999999'), (False, None, 0, None))
+
+    def test_first_location_with_unreserved_stock(self):
+        _snapshot.get()
+        with self.assertNumQueries(1):
+            available, location, quantity, days = self.cake.check_availability_by_pincode('110001')
+        self.assertEqual((available, location.pk, quantity, days), (True, self.warehouse.pk, 4, 1))
+        self.assertFalse(self.cake.check_availability_by_pincode('110001', quantity=5)[0])
+
+    def test_products_without_seller_stock_ship_centrally(self):
+        self.assertEqual(self.roses.check_availability_by_pincode('110001'), (True, None, 3, 1))
+
+    def test_service_area_changes_rebuild_index(self):
+        self.warehouse.serviceable_pincodes.remove(self.delhi)
+        self.assertFalse(self.cake.check_availability_by_pincode('110001')[0])
+
+        self.delhi.is_serviceable = False
+        self.delhi.save()
+        self.assertEqual(self.roses.check_availability_by_pincode('110001'), (False, None, 0, None))
+
+
+class PincodeDirectoryTest(TestCase):
+    def setUp(self):
+        directory_snapshot.reset()
+        for code, city in (('110001', 'Delhi'), ('110002', 'Delhi'), ('110092', 'Delhi'), ('400001', 'Mumbai')):
+            Pincode.objects.create(pincode=code, area=f'Area {code}', district=city, city=city, state='S')
+        Pincode.objects.filter(pincode='400001').update(is_serviceable=False)
+
+    def test_lookups_served_from_memory(self):
+        self.assertEqual(len(directory_snapshot.get()), 4)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('products:validate_pincode'), {'pincode': '400001'})
+            suggestions = self.client.get(reverse('products:pincode_suggestions'), {'q': '1100'}).json()
+            missing = self.client.get(reverse('products:validate_pincode'), {'pincode': '999999'}).json()
+
+        data = response.json()
+        self.assertEqual((data['valid'], data['serviceable'], data['pincode_data']['city']), (True, False, 'Mumbai'))
+        self.assertEqual([entry['pincode'] for entry in suggestions['results']], ['110001', '110002', '110092'])
+        self.assertFalse(missing['valid'])
+
+    def test_pincode_changes_rebuild_directory(self):
+        directory_snapshot.get()
+        Pincode.objects.create(pincode='110003', district='Delhi', city='Delhi', state='S')
+        self.assertEqual(len(directory_snapshot.get().suggest('1100')), 4)
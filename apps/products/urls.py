@@ -9,9 +9,13 @@ urlpatterns = [
     path('search/suggestions/', views.product_autocomplete_api, name='search_suggestions'),
     path('quick-view/<int:product_id>/', views.quick_view, name='quick_view'),
 
+    # Product listing API (cursor paginated)
+    path('api/products/', views.product_list_api, name='product_list_api'),
+
     # Pincode availability APIs
     path('api/check-pincode/', views.check_pincode_availability, name='check_pincode'),
     path('api/validate-pincode/', views.validate_pincode, name='validate_pincode'),
+    path('api/pincode-suggestions/', views.pincode_suggestions, name='pincode_suggestions'),
 
     path('category/<slug:slug>/', views.CategoryDetailView.as_view(), name='category_detail'),
     path('occasion/<slug:slug>/', views.OccasionDetailView.as_view(), name='occasion_detail'),
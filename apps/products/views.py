@@ -6,20 +6,159 @@ from django.db.models import Q, Count, Min, Max, Prefetch, Avg
 from django.core.paginator import Paginator
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.db import transaction
 from django.utils import timezone
 
 from .models import Product, Category, Occasion, ProductImage, ProductVariant, CSVImportLog
 from apps.products.services.csv_importer import CSVImporter
+from apps.products.services.product_cards import with_cards, cards_for
+from apps.products.services.search_index import search_products
+from apps.products.services.autocomplete import suggest
+from apps.products.services.pincode_directory import lookup_pincode, suggest_pincodes
+from apps.products.services.product_detail import get_detail_context
+from apps.products.services.popularity import record_view
+from apps.products.services.facets import get_facets
+from apps.products.services.listing import (
+    DEFAULT_SORT, apply_filters, apply_sorting, normalize_filters
+)
+from apps.products.services.taxonomy_listing import resolve_listing
+from apps.products.services.pagination import (
+    InvalidCursor, KeysetPaginator, approximate_count, encode_cursor, sort_fields
+)
 
 
 # ============================================
 # PUBLIC PRODUCT VIEWS
 # ============================================
 
-class ProductListView(ListView):
+class ProductCardListMixin:
+    """
+    Render a paginated product listing from ProductCard rows.
+    Offset pages are used by default; a ?cursor= token switches to keyset
+    pagination, and every page links forward with a cursor so deep
+    crawls never turn into large OFFSET scans.
+    """
+    cursor_page = None
+    next_cursor = None
+
+    def get_sort(self):
+        return self.request.GET.get('sort', DEFAULT_SORT)
+
+    def paginate_queryset(self, queryset, page_size):
+        sort = self.get_sort()
+        queryset = with_cards(queryset, *sort_fields(sort))
+
+        cursor = self.request.GET.get('cursor')
+        if cursor:
+            try:
+                self.cursor_page = KeysetPaginator(queryset, sort, page_size).page(cursor)
+            except InvalidCursor:
+                self.cursor_page = None
+            if self.cursor_page is not None:
+                return None, None, cards_for(self.cursor_page.object_list), False
+
+        paginator, page, object_list, is_paginated = super().paginate_queryset(queryset, page_size)
+        products = list(object_list)
+        if page.has_next() and products:
+            self.next_cursor = encode_cursor(products[-1], sort)
+        page.object_list = cards_for(products)
+        return paginator, page, page.object_list, is_paginated
+
+    def _cursor_url(self, cursor):
+        params = self.request.GET.copy()
+        params.pop('page', None)
+        params['cursor'] = cursor
+        return f'?{params.urlencode()}'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.cursor_page is not None:
+            context['cursor_page'] = self.cursor_page
+            if self.cursor_page.has_previous:
+                context['previous_page_url'] = self._cursor_url(self.cursor_page.previous_cursor)
+            if self.cursor_page.has_next:
+                context['next_page_url'] = self._cursor_url(self.cursor_page.next_cursor)
+        elif self.next_cursor:
+            context['next_page_url'] = self._cursor_url(self.next_cursor)
+        return context
+
+
+class FacetedListingMixin:
+    """Shared query-string filters, sorting and sidebar facets for listings"""
+
+    def filter_and_sort(self, queryset):
+        """Remember the unfiltered queryset for facets, then filter and sort"""
+        self.base_queryset = queryset
+        queryset = apply_filters(queryset, normalize_filters(self.request.GET))
+        return apply_sorting(queryset, self.request.GET.get('sort', DEFAULT_SORT))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        facets = get_facets(self.base_queryset, normalize_filters(self.request.GET))
+        context['available_categories'] = facets['categories']
+        context['available_occasions'] = facets['occasions']
+        context['available_vendors'] = facets['vendors']
+        context['available_brands'] = facets['brands']
+        context['price_counts'] = facets['price_counts']
+
+        # The paginator has already counted the results; cursor pages
+        # use an approximate count instead of COUNT(*)
+        paginator = context.get('paginator')
+        if paginator:
+            context['total_products'] = paginator.count
+        elif self.get_paginate_by(self.object_list):
+            context['total_products'] = approximate_count(self.object_list)
+        else:
+            context['total_products'] = len(context['object_list'])
+
+        # Current filters (for active state in UI)
+        context['active_filters'] = {
+            'price_ranges': self.request.GET.getlist('price_range'),
+            'categories': self.request.GET.getlist('categories'),
+            'occasions': self.request.GET.getlist('occasions'),
+            'vendors': self.request.GET.getlist('vendors'),
+            'brands': self.request.GET.getlist('brands'),
+            'sort': self.request.GET.get('sort', DEFAULT_SORT),
+        }
+        return context
+
+
+class TaxonomyListView(ProductCardListMixin, FacetedListingMixin, ListView):
+    """
+    Product listing for a taxonomy slug. The slug is resolved to its product
+    ids through the shared (cached) listing engine; filters, sorting and
+    pagination then run over that id set.
+    """
+    model = Product
+    template_name = 'products/product_list.html'
+    context_object_name = 'products'
+    paginate_by = 12
+    taxonomy_kind = None
+    taxonomy_context_name = None
+    title_format = '{}'
+
+    def get_queryset(self):
+        self.listing = resolve_listing(self.taxonomy_kind, self.kwargs['slug'])
+        return self.filter_and_sort(self.listing.products())
+
+    def get_fallback_name(self):
+        return self.kwargs['slug'].replace('-', ' ').title()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        taxonomy = self.listing.taxonomy
+        if taxonomy is not None:
+            context[self.taxonomy_context_name] = taxonomy
+            context['page_title'] = self.title_format.format(taxonomy.name)
+        else:
+            context['page_title'] = self.title_format.format(self.get_fallback_name())
+        return context
+
+
+class ProductListView(ProductCardListMixin, FacetedListingMixin, ListView):
     """Enhanced Product List View with filtering, sorting and pagination"""
     model = Product
     template_name = 'products/product_list.html'
@@ -27,99 +166,12 @@ class ProductListView(ListView):
     paginate_by = 12
 
     def get_queryset(self):
-        """Optimize queryset with proper prefetching"""
         queryset = Product.objects.filter(
             is_active=True,
             published=True,
             status='active'
-        ).select_related('category').prefetch_related(
-            Prefetch('images', queryset=ProductImage.objects.filter(is_active=True).order_by('sort_order', 'position'))
         )
-        
-        # Apply filters
-        queryset = self.apply_filters(queryset)
-        
-        # Apply sorting
-        queryset = self.apply_sorting(queryset)
-        
-        return queryset
-
-    def apply_filters(self, queryset):
-        """Apply various filters to the queryset"""
-        
-        # Quick filters
-        filter_type = self.request.GET.get('filter')
-        if filter_type == 'featured':
-            queryset = queryset.filter(is_featured=True)
-        elif filter_type == 'bestseller':
-            queryset = queryset.filter(is_bestseller=True)
-        elif filter_type == 'under_500':
-            queryset = queryset.filter(base_price__lt=500)
-        elif filter_type == 'under_1000':
-            queryset = queryset.filter(base_price__lt=1000)
-        elif filter_type == 'under_2000':
-            queryset = queryset.filter(base_price__lt=2000)
-
-        # Price range filters
-        price_ranges = self.request.GET.getlist('price_range')
-        if price_ranges:
-            price_q = Q()
-            for price_range in price_ranges:
-                if price_range == '0-500':
-                    price_q |= Q(base_price__lt=500)
-                elif price_range == '500-1000':
-                    price_q |= Q(base_price__gte=500, base_price__lt=1000)
-                elif price_range == '1000-2000':
-                    price_q |= Q(base_price__gte=1000, base_price__lt=2000)
-                elif price_range == '2000+':
-                    price_q |= Q(base_price__gte=2000)
-            queryset = queryset.filter(price_q)
-
-        # Category filters
-        categories = self.request.GET.getlist('categories')
-        if categories:
-            queryset = queryset.filter(category__slug__in=categories)
-
-        # Occasion filters
-        occasions = self.request.GET.getlist('occasions')
-        if occasions:
-            queryset = queryset.filter(occasions__slug__in=occasions)
-
-        # Vendor filter (from CSV data)
-        vendors = self.request.GET.getlist('vendors')
-        if vendors:
-            queryset = queryset.filter(vendor__in=vendors)
-
-        # Brand filter (from CSV data)
-        brands = self.request.GET.getlist('brands')
-        if brands:
-            queryset = queryset.filter(brand__in=brands)
-
-        # Stock filter
-        stock_filter = self.request.GET.get('stock')
-        if stock_filter == 'in_stock':
-            queryset = queryset.filter(stock_quantity__gt=0)
-        elif stock_filter == 'out_of_stock':
-            queryset = queryset.filter(stock_quantity=0)
-
-        return queryset
-
-    def apply_sorting(self, queryset):
-        """Apply sorting to the queryset"""
-        sort_by = self.request.GET.get('sort', 'popularity')
-        
-        if sort_by == 'price_low':
-            return queryset.order_by('base_price')
-        elif sort_by == 'price_high':
-            return queryset.order_by('-base_price')
-        elif sort_by == 'newest':
-            return queryset.order_by('-created_at')
-        elif sort_by == 'name_asc':
-            return queryset.order_by('name')
-        elif sort_by == 'name_desc':
-            return queryset.order_by('-name')
-        else:  # popularity (default)
-            return queryset.order_by('-is_featured', '-is_bestseller', '-created_at')
+        return self.filter_and_sort(queryset)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -133,55 +185,6 @@ class ProductListView(ListView):
             context['search_query'] = search_query
             context['page_title'] = f'Search Results for "{search_query}"'
 
-        # Add filter context
-        try:
-            context['available_categories'] = Category.objects.filter(
-                products__is_active=True,
-                products__published=True
-            ).distinct()
-        except:
-            context['available_categories'] = Category.objects.none()
-
-        try:
-            context['available_occasions'] = Occasion.objects.filter(
-                products__is_active=True,
-                products__published=True
-            ).distinct()
-        except:
-            context['available_occasions'] = Occasion.objects.none()
-        
-        # Get available vendors and brands from CSV data
-        try:
-            context['available_vendors'] = Product.objects.filter(
-                is_active=True, 
-                published=True,
-                vendor__isnull=False
-            ).exclude(vendor='').values_list('vendor', flat=True).distinct()
-        except:
-            context['available_vendors'] = []
-
-        try:
-            context['available_brands'] = Product.objects.filter(
-                is_active=True,
-                published=True,
-                brand__isnull=False
-            ).exclude(brand='').values_list('brand', flat=True).distinct()
-        except:
-            context['available_brands'] = []
-
-        # Add product count
-        context['total_products'] = self.get_queryset().count()
-
-        # Current filters (for active state in UI)
-        context['active_filters'] = {
-            'price_ranges': self.request.GET.getlist('price_range'),
-            'categories': self.request.GET.getlist('categories'),
-            'occasions': self.request.GET.getlist('occasions'),
-            'vendors': self.request.GET.getlist('vendors'),
-            'brands': self.request.GET.getlist('brands'),
-            'sort': self.request.GET.get('sort', 'popularity'),
-        }
-
         return context
 
 
@@ -194,55 +197,22 @@ class ProductDetailView(DetailView):
     slug_url_kwarg = 'slug'
 
     def get_queryset(self):
+        # Images and variants come from the cached detail bundle
         return Product.objects.filter(
             is_active=True,
             published=True
-        ).select_related('category').prefetch_related(
-            'images',
-            'variants',
-            'occasions'
-        )
+        ).select_related('category')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Add all product images in order
-        context['product_images'] = self.object.all_images
-
-        # Add product variants
-        context['product_variants'] = self.object.variants.filter(is_active=True).order_by('sort_order')
+        # Images, variants, reviews, related products, bestsellers,
+        # categories and add-ons
+        context.update(get_detail_context(self.object))
 
         # Calculate discount percentage
         context['discount_percentage'] = self.object.discount_percentage
 
-        # FIX: Get related products from same category (increased to 6)
-        from django.db import models
-        related_products = Product.objects.filter(
-            category=self.object.category,
-            is_active=True,
-            published=True,
-            stock_quantity__gt=0
-        ).exclude(
-            pk=self.object.pk
-        ).select_related('category').prefetch_related('images')[:6]
-
-        # DEBUG logging
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"Found {related_products.count()} related products for {self.object.name}")
-
-        context['related_products'] = related_products
-
-        # BONUS: recommended products (bestsellers or featured from same category)
-        context['recommended_products'] = Product.objects.filter(
-            category=self.object.category,
-            is_active=True,
-            published=True,
-            stock_quantity__gt=0
-        ).filter(
-            models.Q(is_bestseller=True) | models.Q(is_featured=True)
-        ).exclude(pk=self.object.pk)[:4]
-
         # Check stock status
         context['in_stock'] = self.object.is_in_stock
         context['low_stock'] = 0 < self.object.stock_quantity <= 5
@@ -250,55 +220,12 @@ class ProductDetailView(DetailView):
         # Add shipping info
         context['free_shipping'] = self.object.current_price >= 500
 
-        # Add recommended categories (featured categories with products)
-        context['recommended_categories'] = Category.objects.filter(
-            is_featured=True,
-            is_active=True,
-            products__is_active=True
-        ).distinct()[:6]
-
-        # Add bestseller products
-        context['bestseller_products'] = Product.objects.filter(
-            is_bestseller=True,
-            is_active=True,
-            published=True
-        ).select_related('category').prefetch_related('images')[:8]
-
-        # If no bestsellers, show featured products instead
-        if not context['bestseller_products'].exists():
-            context['bestseller_products'] = Product.objects.filter(
-                is_featured=True,
-                is_active=True,
-                published=True
-            ).select_related('category').prefetch_related('images')[:8]
-
-        # Add available add-ons
-        context['available_addons'] = self.object.get_available_addons()
-
-        # Add product reviews
-        try:
-            from apps.reviews.models import Review
-            reviews = Review.objects.filter(
-                product=self.object,
-                is_approved=True,
-                is_active=True
-            ).select_related('user')[:10]
-
-            context['product_reviews'] = reviews
-            context['reviews_count'] = reviews.count()
-
-            if reviews.exists():
-                avg = sum([r.rating for r in reviews]) / reviews.count()
-                context['average_rating'] = round(avg, 1)
-        except:
-            context['product_reviews'] = []
-            context['reviews_count'] = 0
-            context['average_rating'] = 0
+        record_view(self.object.pk)
 
         return context
 
 
-class CategoryDetailView(ListView):
+class CategoryDetailView(ProductCardListMixin, FacetedListingMixin, ListView):
     """Category-specific product listing"""
     model = Product
     template_name = 'products/product_list.html'
@@ -311,113 +238,20 @@ class CategoryDetailView(ListView):
             category=self.category,
             is_active=True,
             published=True
-        ).select_related('category').prefetch_related('images')
-        
-        # Apply the same filtering and sorting as ProductListView
-        view = ProductListView()
-        view.request = self.request
-        view.kwargs = self.kwargs
-        queryset = view.apply_filters(queryset)
-        queryset = view.apply_sorting(queryset)
-        
-        return queryset
+        )
+        return self.filter_and_sort(queryset)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['category'] = self.category
         context['page_title'] = self.category.name
-
-        # Add the same context as ProductListView
-        try:
-            context['available_categories'] = Category.objects.filter(
-                products__is_active=True,
-                products__published=True
-            ).distinct()
-        except:
-            context['available_categories'] = Category.objects.none()
-
-        try:
-            context['available_occasions'] = Occasion.objects.filter(
-                products__is_active=True,
-                products__published=True
-            ).distinct()
-        except:
-            context['available_occasions'] = Occasion.objects.none()
-
-        context['total_products'] = self.get_queryset().count()
-
         return context
 
 
-class OccasionDetailView(ListView):
-    """Occasion-specific product listing"""
-    model = Product
-    template_name = 'products/product_list.html'
-    context_object_name = 'products'
-    paginate_by = 12
-
-    def get_queryset(self):
-        slug = self.kwargs['slug']
-
-        # Try to get exact Occasion match
-        try:
-            self.occasion = Occasion.objects.get(slug=slug, is_active=True)
-            queryset = Product.objects.filter(
-                occasions=self.occasion,
-                is_active=True,
-                published=True
-            )
-        except Occasion.DoesNotExist:
-            # Fallback: Search by slug keywords in product name/description
-            self.occasion = None
-            search_terms = slug.replace('-', ' ')
-            queryset = Product.objects.filter(
-                Q(name__icontains=search_terms) |
-                Q(category__name__icontains=search_terms) |
-                Q(description__icontains=search_terms),
-                is_active=True,
-                published=True
-            ).distinct()
-
-        queryset = queryset.select_related('category').prefetch_related('images')
-
-        # Apply the same filtering and sorting as ProductListView
-        view = ProductListView()
-        view.request = self.request
-        view.kwargs = self.kwargs
-        queryset = view.apply_filters(queryset)
-        queryset = view.apply_sorting(queryset)
-
-        return queryset
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        if self.occasion:
-            context['occasion'] = self.occasion
-            context['page_title'] = self.occasion.name
-        else:
-            context['page_title'] = self.kwargs['slug'].replace('-', ' ').title()
-
-        # Add the same context as ProductListView
-        try:
-            context['available_categories'] = Category.objects.filter(
-                products__is_active=True,
-                products__published=True
-            ).distinct()
-        except:
-            context['available_categories'] = Category.objects.none()
-
-        try:
-            context['available_occasions'] = Occasion.objects.filter(
-                products__is_active=True,
-                products__published=True
-            ).distinct()
-        except:
-            context['available_occasions'] = Occasion.objects.none()
-
-        context['total_products'] = self.get_queryset().count()
-
-        return context
+class OccasionDetailView(TaxonomyListView):
+    """Occasion-specific product listing with fallback to search-index matches for the slug"""
+    taxonomy_kind = 'occasion'
+    taxonomy_context_name = 'occasion'
 
 
 def product_search(request):
@@ -426,47 +260,41 @@ def product_search(request):
     products = Product.objects.filter(
         is_active=True,
         published=True
-    ).select_related('category').prefetch_related('images')
+    )
 
+    relevance = None
     if query:
-        products = products.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query) |
-            Q(body_html__icontains=query) |
-            Q(sku__icontains=query) |
-            Q(category__name__icontains=query) |
-            Q(brand__icontains=query) |
-            Q(vendor__icontains=query) |
-            Q(tags__icontains=query)
-        ).distinct()
+        products, relevance = search_products(products, query)
 
     # Apply the same filtering and sorting as ProductListView
-    view = ProductListView()
-    view.request = request
-    view.kwargs = {}
-    products = view.apply_filters(products)
-    products = view.apply_sorting(products)
+    base_products = products
+    filters = normalize_filters(request.GET)
+    products = apply_filters(products, filters)
+    if relevance is not None and 'sort' not in request.GET:
+        # Default to relevance order from the search index
+        products = products.order_by(relevance, 'pk')
+    else:
+        products = apply_sorting(products, request.GET.get('sort', DEFAULT_SORT))
 
     # Pagination
-    paginator = Paginator(products, 12)
+    paginator = Paginator(with_cards(products), 12)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    page_obj.object_list = cards_for(page_obj.object_list)
 
+    facets = get_facets(base_products, filters)
     context = {
         'products': page_obj,
         'search_query': query,
         'page_title': f'Search Results for "{query}"' if query else 'Search',
         'is_paginated': page_obj.has_other_pages(),
         'page_obj': page_obj,
-        'total_products': products.count(),
-        'available_categories': Category.objects.filter(
-            products__is_active=True,
-            products__published=True
-        ).distinct(),
-        'available_occasions': Occasion.objects.filter(
-            products__is_active=True,
-            products__published=True
-        ).distinct(),
+        'total_products': paginator.count,
+        'available_categories': facets['categories'],
+        'available_occasions': facets['occasions'],
+        'available_vendors': facets['vendors'],
+        'available_brands': facets['brands'],
+        'price_counts': facets['price_counts'],
     }
 
     return render(request, 'products/product_list.html', context)
@@ -799,17 +627,33 @@ def download_template(request):
 
 @require_http_methods(["GET"])
 def product_list_api(request):
-    """API endpoint for product listing - used by Ajax"""
+    """
+    API endpoint for product listing - used by Ajax
+    GET params: sort, limit (max 100), cursor, count (approx|exact) plus
+    the same filters as the HTML listing pages
+    """
+    sort = request.GET.get('sort', DEFAULT_SORT)
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 100)), 100))
+    except ValueError:
+        limit = 100
+
     products = Product.objects.filter(
         published=True,
         is_active=True,
         status='active'
-    ).select_related('category').prefetch_related('images')[:100]
-    
+    )
+    products = apply_filters(products, normalize_filters(request.GET))
+    paginated = products.select_related('category', 'card')
+
+    try:
+        page = KeysetPaginator(paginated, sort, limit).page(request.GET.get('cursor'))
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
     data = []
-    for product in products:
-        primary_image = product.primary_image
-        
+    for product in page.object_list:
+        card = getattr(product, 'card', None)
         data.append({
             'id': product.id,
             'sku': product.sku,
@@ -818,13 +662,25 @@ def product_list_api(request):
             'price': float(product.current_price),
             'mrp': float(product.mrp) if product.mrp else None,
             'category': product.category.name if product.category else None,
-            'image': primary_image.get_image_url if primary_image else None,
+            'image': (card.primary_image_url or None) if card else None,
             'in_stock': product.is_in_stock,
             'vendor': product.vendor,
             'brand': product.brand,
         })
-    
-    return JsonResponse({'products': data, 'count': len(data)})
+
+    response = {
+        'products': data,
+        'count': len(data),
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+    }
+    count_mode = request.GET.get('count')
+    if count_mode == 'approx':
+        response['total'] = approximate_count(products)
+    elif count_mode == 'exact':
+        response['total'] = products.count()
+
+    return JsonResponse(response)
 
 
 @require_http_methods(["GET"])
@@ -882,23 +738,8 @@ def product_autocomplete_api(request):
     if not query or len(query) < 2:
         return JsonResponse({'suggestions': []})
     
-    products = Product.objects.filter(
-        Q(name__icontains=query) | Q(sku__icontains=query),
-        is_active=True,
-        published=True
-    ).select_related('category').prefetch_related('images')[:10]
-    
-    suggestions = []
-    for product in products:
-        primary_image = product.primary_image
-        suggestions.append({
-            'id': product.id,
-            'name': product.name,
-            'slug': product.slug,
-            'price': float(product.current_price),
-            'image': primary_image.get_image_url if primary_image else None,
-            'category': product.category.name if product.category else None,
-        })
+    # Served from the per-worker prefix index - no database queries
+    suggestions = suggest(query)
     
     return JsonResponse({'suggestions': suggestions})
 
@@ -907,248 +748,45 @@ def product_autocomplete_api(request):
 # NEW MENU-BASED VIEWS
 # ============================================
 
-class MenuCategoryDetailView(ListView):
+class MenuCategoryDetailView(TaxonomyListView):
     """Menu Category-specific product listing"""
-    model = Product
-    template_name = 'products/product_list.html'
-    context_object_name = 'products'
-    paginate_by = 12
+    taxonomy_kind = 'menu_category'
+    taxonomy_context_name = 'menu_category'
 
     def get_queryset(self):
-        from .models import MenuCategory
-        self.menu_category = get_object_or_404(MenuCategory, slug=self.kwargs['slug'], is_active=True)
-        
-        # Try to find corresponding old category
-        try:
-            old_category = Category.objects.get(slug=self.menu_category.slug, is_active=True)
-            queryset = Product.objects.filter(
-                category=old_category,
-                is_active=True,
-                published=True
-            ).select_related('category').prefetch_related('images')
-        except Category.DoesNotExist:
-            queryset = Product.objects.none()
-        
-        # Apply filtering and sorting
-        view = ProductListView()
-        view.request = self.request
-        view.kwargs = self.kwargs
-        queryset = view.apply_filters(queryset)
-        queryset = view.apply_sorting(queryset)
-        
+        queryset = super().get_queryset()
+        if not self.listing.found:
+            raise Http404('No menu category matches the given query.')
         return queryset
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['menu_category'] = self.menu_category
-        context['page_title'] = self.menu_category.name
-        return context
 
+class ProductTypeDetailView(TaxonomyListView):
+    """Product Type-specific product listing with fallback to search-index matches for the slug"""
+    taxonomy_kind = 'product_type'
+    taxonomy_context_name = 'product_type'
 
-class ProductTypeDetailView(ListView):
-    """Product Type-specific product listing with fallback search"""
-    model = Product
-    template_name = 'products/product_list.html'
-    context_object_name = 'products'
-    paginate_by = 12
 
-    def get_queryset(self):
-        from .models import ProductType
-        slug = self.kwargs['slug']
+class CollectionDetailView(TaxonomyListView):
+    """Collection-specific product listing with fallback to search-index matches for the slug"""
+    taxonomy_kind = 'collection'
+    taxonomy_context_name = 'collection'
 
-        # Try to get exact ProductType match
-        try:
-            self.product_type = ProductType.objects.get(slug=slug, is_active=True)
-            queryset = Product.objects.filter(
-                product_types=self.product_type,
-                is_active=True,
-                published=True
-            )
-        except ProductType.DoesNotExist:
-            # Fallback: Search by slug keywords in product name/category
-            self.product_type = None
-            search_terms = slug.replace('-', ' ')
-            queryset = Product.objects.filter(
-                Q(name__icontains=search_terms) |
-                Q(category__name__icontains=search_terms) |
-                Q(description__icontains=search_terms),
-                is_active=True,
-                published=True
-            ).distinct()
-
-        queryset = queryset.select_related('category').prefetch_related('images')
-
-        # Apply filtering and sorting
-        view = ProductListView()
-        view.request = self.request
-        view.kwargs = self.kwargs
-        queryset = view.apply_filters(queryset)
-        queryset = view.apply_sorting(queryset)
 
-        return queryset
+class RecipientDetailView(TaxonomyListView):
+    """Recipient-specific product listing with fallback to search-index matches for the slug"""
+    taxonomy_kind = 'recipient'
+    taxonomy_context_name = 'recipient'
+    title_format = 'Gifts for {}'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        if self.product_type:
-            context['product_type'] = self.product_type
-            context['page_title'] = self.product_type.name
-        else:
-            context['page_title'] = self.kwargs['slug'].replace('-', ' ').title()
-        return context
+    def get_fallback_name(self):
+        return self.kwargs['slug'].replace('-', ' ').replace('for ', '').title()
 
 
-class CollectionDetailView(ListView):
-    """Collection-specific product listing with fallback search"""
-    model = Product
-    template_name = 'products/product_list.html'
-    context_object_name = 'products'
-    paginate_by = 12
-
-    def get_queryset(self):
-        from .models import Collection
-        slug = self.kwargs['slug']
-
-        # Try to get exact Collection match
-        try:
-            self.collection = Collection.objects.get(slug=slug, is_active=True)
-            queryset = Product.objects.filter(
-                collections=self.collection,
-                is_active=True,
-                published=True
-            )
-        except Collection.DoesNotExist:
-            # Fallback: Search by slug keywords
-            self.collection = None
-            search_terms = slug.replace('-', ' ')
-            queryset = Product.objects.filter(
-                Q(name__icontains=search_terms) |
-                Q(category__name__icontains=search_terms) |
-                Q(description__icontains=search_terms),
-                is_active=True,
-                published=True
-            ).distinct()
-
-        queryset = queryset.select_related('category').prefetch_related('images')
-
-        # Apply filtering and sorting
-        view = ProductListView()
-        view.request = self.request
-        view.kwargs = self.kwargs
-        queryset = view.apply_filters(queryset)
-        queryset = view.apply_sorting(queryset)
-
-        return queryset
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        if self.collection:
-            context['collection'] = self.collection
-            context['page_title'] = self.collection.name
-        else:
-            context['page_title'] = self.kwargs['slug'].replace('-', ' ').title()
-        return context
-
-
-class RecipientDetailView(ListView):
-    """Recipient-specific product listing with fallback search"""
-    model = Product
-    template_name = 'products/product_list.html'
-    context_object_name = 'products'
-    paginate_by = 12
-
-    def get_queryset(self):
-        from .models import Recipient
-        slug = self.kwargs['slug']
-
-        # Try to get exact Recipient match
-        try:
-            self.recipient = Recipient.objects.get(slug=slug, is_active=True)
-            queryset = Product.objects.filter(
-                recipients=self.recipient,
-                is_active=True,
-                published=True
-            )
-        except Recipient.DoesNotExist:
-            # Fallback: Search by slug keywords
-            self.recipient = None
-            search_terms = slug.replace('-', ' ').replace('for-', '')
-            queryset = Product.objects.filter(
-                Q(name__icontains=search_terms) |
-                Q(category__name__icontains=search_terms) |
-                Q(description__icontains=search_terms),
-                is_active=True,
-                published=True
-            ).distinct()
-
-        queryset = queryset.select_related('category').prefetch_related('images')
-
-        # Apply filtering and sorting
-        view = ProductListView()
-        view.request = self.request
-        view.kwargs = self.kwargs
-        queryset = view.apply_filters(queryset)
-        queryset = view.apply_sorting(queryset)
-
-        return queryset
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        if self.recipient:
-            context['recipient'] = self.recipient
-            context['page_title'] = f'Gifts for {self.recipient.name}'
-        else:
-            name = self.kwargs['slug'].replace('-', ' ').replace('for ', '').title()
-            context['page_title'] = f'Gifts for {name}'
-        return context
-
-
-class LocationDetailView(ListView):
+class LocationDetailView(TaxonomyListView):
     """Location-specific product listing with fallback to all products"""
-    model = Product
-    template_name = 'products/product_list.html'
-    context_object_name = 'products'
-    paginate_by = 12
-
-    def get_queryset(self):
-        from .models import DeliveryLocation
-        slug = self.kwargs['slug']
-
-        # Try to get exact DeliveryLocation match
-        try:
-            self.location = DeliveryLocation.objects.get(slug=slug, is_active=True)
-            queryset = Product.objects.filter(
-                delivery_locations=self.location,
-                is_active=True,
-                published=True
-            )
-        except DeliveryLocation.DoesNotExist:
-            # Fallback: Show all products (most products are deliverable everywhere)
-            self.location = None
-            queryset = Product.objects.filter(
-                is_active=True,
-                published=True
-            )
-
-        queryset = queryset.select_related('category').prefetch_related('images')
-
-        # Apply filtering and sorting
-        view = ProductListView()
-        view.request = self.request
-        view.kwargs = self.kwargs
-        queryset = view.apply_filters(queryset)
-        queryset = view.apply_sorting(queryset)
-
-        return queryset
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        if self.location:
-            context['location'] = self.location
-            context['page_title'] = f'Delivery to {self.location.name}'
-        else:
-            location_name = self.kwargs['slug'].replace('-', ' ').title()
-            context['page_title'] = f'Delivery to {location_name}'
-        return context
+    taxonomy_kind = 'location'
+    taxonomy_context_name = 'location'
+    title_format = 'Delivery to {}'
 
 
 class CakeCategoryView(TemplateView):
@@ -1336,8 +974,6 @@ def validate_pincode(request):
     API endpoint to validate and get pincode details
     GET params: pincode
     """
-    from apps.users.models import Pincode
-
     pincode = request.GET.get('pincode', '').strip()
 
     if not pincode:
@@ -1354,28 +990,51 @@ def validate_pincode(request):
             'message': 'Please enter a valid 6-digit pincode'
         })
 
-    try:
-        pincode_obj = Pincode.objects.get(pincode=pincode)
-
-        return JsonResponse({
-            'success': True,
-            'valid': True,
-            'serviceable': pincode_obj.is_serviceable and pincode_obj.is_active,
-            'pincode_data': {
-                'pincode': pincode_obj.pincode,
-                'area': pincode_obj.area,
-                'city': pincode_obj.city,
-                'district': pincode_obj.district,
-                'state': pincode_obj.state,
-                'delivery_days': pincode_obj.delivery_days
-            },
-            'message': f'{pincode_obj.city}, {pincode_obj.state}' if pincode_obj.is_serviceable else 'Pincode not serviceable'
-        })
-
-    except Pincode.DoesNotExist:
+    entry = lookup_pincode(pincode)
+    if entry is None:
         return JsonResponse({
             'success': True,
             'valid': False,
             'serviceable': False,
             'message': 'Pincode not found in our database'
-        })
\ No newline at end of file
+        })
+
+    return JsonResponse({
+        'success': True,
+        'valid': True,
+        'serviceable': entry['serviceable'],
+        'pincode_data': {
+            'pincode': entry['pincode'],
+            'area': entry['area'],
+            'city': entry['city'],
+            'district': entry['district'],
+            'state': entry['state'],
+            'delivery_days': entry['delivery_days']
+        },
+        'message': f"{entry['city']}, {entry['state']}" if entry['serviceable'] else 'Pincode not serviceable'
+    })
+
+
+@require_http_methods(["GET"])
+def pincode_suggestions(request):
+    """
+    API endpoint for pincode autocomplete
+    GET params: q (leading digits of a pincode)
+    """
+    prefix = request.GET.get('q', '').strip()
+    if len(prefix) < 2 or not prefix.isdigit():
+        return JsonResponse({'success': True, 'results': []})
+
+    return JsonResponse({
+        'success': True,
+        'results': [
+            {
+                'pincode': entry['pincode'],
+                'area': entry['area'],
+                'city': entry['city'],
+                'state': entry['state'],
+                'serviceable': entry['serviceable'],
+            }
+            for entry in suggest_pincodes(prefix)
+        ]
+    })
\ No newline at end of file
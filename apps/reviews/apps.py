@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.reviews'
\ No newline at end of file
+    name = 'apps.reviews'
+
+    def ready(self):
+        import apps.reviews.signals
\ No newline at end of file
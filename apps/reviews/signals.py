@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Review
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def sync_product_card_rating(sender, instance, raw=False, **kwargs):
+    """Refresh the product card rating and detail bundle when a review changes"""
+    if raw:
+        return
+    from apps.products.services.product_cards import refresh_card_rating
+    from apps.products.services.product_detail import bump_product_version
+
+    refresh_card_rating(instance.product_id)
+    bump_product_version(instance.product_id)
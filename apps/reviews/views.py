@@ -186,18 +186,11 @@ def product_reviews(request, product_id):
     else:  # recent (default)
         reviews = reviews.order_by('-created_at')
     
-    # Calculate rating statistics
-    total_reviews = reviews.count()
-    avg_rating = 0
-    rating_distribution = {5: 0, 4: 0, 3: 0, 2: 0, 1: 0}
-    
-    if total_reviews > 0:
-        all_ratings = reviews.values_list('rating', flat=True)
-        avg_rating = sum(all_ratings) / total_reviews
-        
-        for rating in all_ratings:
-            rating_distribution[rating] += 1
-    
+    # Rating statistics are maintained on the product
+    total_reviews = product.rating_count
+    avg_rating = product.rating_avg
+    rating_distribution = product.rating_distribution
+
     context = {
         'product': product,
         'reviews': reviews,
@@ -1,8 +1,13 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from apps.products.services.serviceability import invalidate_serviceability
 from apps.users.models import Pincode
 import csv
 import os
+import time
+
+DEFAULT_BATCH_SIZE = 2000
+UPSERT_FIELDS = ['area', 'district', 'city', 'state', 'delivery_days', 'is_serviceable']
 
 
 class Command(BaseCommand):
@@ -19,12 +24,23 @@ class Command(BaseCommand):
             action='store_true',
             help='Create sample pincodes for testing',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Rows per bulk upsert (default: %(default)s)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rewrite pincodes even if unchanged',
+        )
 
     def handle(self, *args, **options):
         if options['sample']:
             self.create_sample_pincodes()
         elif options['file']:
-            self.import_from_csv(options['file'])
+            self.import_from_csv(options['file'], options['batch_size'], options['force'])
         else:
             self.stdout.write(self.style.ERROR('Please provide --file or --sample flag'))
 
@@ -132,10 +148,16 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS(f'Sample pincodes created successfully! Total: {created_count}'))
 
-    def import_from_csv(self, file_path):
+    def import_from_csv(self, file_path, batch_size=DEFAULT_BATCH_SIZE, force=False):
         """
         Import pincodes from CSV file
         Expected CSV format: pincode,area,district,city,state,delivery_days
+        India Post directory columns (officename, statename) are also accepted;
+        the first office listed for a pincode is used.
+
+        Rows are streamed and upserted in batches with one bulk INSERT ... ON
+        CONFLICT per batch. Unless --force is given, rows identical to the
+        stored pincode are skipped.
         """
         self.stdout.write(f'Importing pincodes from {file_path}...')
 
@@ -143,38 +165,99 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f'File not found: {file_path}'))
             return
 
-        with open(file_path, 'r', encoding='utf-8') as csvfile:
+        stats = {'read': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+        seen = set()
+        batch = {}
+        started = time.monotonic()
+
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as csvfile:
             reader = csv.DictReader(csvfile)
+            for row in reader:
+                stats['read'] += 1
+                values = self.parse_row(row)
+                if values is None or values['pincode'] in seen:
+                    stats['skipped'] += 1
+                    continue
+                seen.add(values['pincode'])
+                batch[values['pincode']] = values
 
-            with transaction.atomic():
-                created_count = 0
-                updated_count = 0
-
-                for row in reader:
-                    pincode = row.get('pincode', '').strip()
-                    if not pincode or len(pincode) != 6:
-                        continue
-
-                    pincode_obj, created = Pincode.objects.update_or_create(
-                        pincode=pincode,
-                        defaults={
-                            'area': row.get('area', '').strip(),
-                            'district': row.get('district', '').strip(),
-                            'city': row.get('city', '').strip(),
-                            'state': row.get('state', '').strip(),
-                            'delivery_days': int(row.get('delivery_days', 3)),
-                            'is_serviceable': row.get('is_serviceable', 'true').lower() == 'true',
-                        }
-                    )
-
-                    if created:
-                        created_count += 1
-                    else:
-                        updated_count += 1
-
-                    if (created_count + updated_count) % 100 == 0:
-                        self.stdout.write(f'Processed {created_count + updated_count} pincodes...')
+                if len(batch) >= batch_size:
+                    self.write_batch(batch, force, stats)
+                    batch = {}
+                    self.report_progress(stats, started)
+
+        if batch:
+            self.write_batch(batch, force, stats)
+            self.report_progress(stats, started)
+
+        if stats['created'] or stats['updated']:
+            # bulk_create does not send post_save
+            invalidate_serviceability()
 
         self.stdout.write(self.style.SUCCESS(
-            f'Import complete! Created: {created_count}, Updated: {updated_count}'
+            f"Import complete! Created: {stats['created']}, Updated: {stats['updated']}, "
+            f"Unchanged: {stats['unchanged']}, Skipped rows: {stats['skipped']}"
         ))
+
+    def parse_row(self, row):
+        """Normalized field values for a CSV row, or None if it has no valid pincode"""
+        def column(*names, default=''):
+            for name in names:
+                value = row.get(name)
+                if value:
+                    return value.strip()
+            return default
+
+        pincode = column('pincode', 'Pincode')
+        if not pincode.isdigit() or len(pincode) != 6:
+            return None
+
+        try:
+            delivery_days = int(column('delivery_days', default='3'))
+        except ValueError:
+            delivery_days = 3
+
+        district = column('district', 'Districtname', 'districtname')
+        return {
+            'pincode': pincode,
+            'area': column('area', 'officename', 'Officename')[:200],
+            'district': district[:100],
+            'city': column('city', default=district)[:100],
+            'state': column('state', 'statename', 'StateName')[:100],
+            'delivery_days': delivery_days,
+            'is_serviceable': column('is_serviceable', default='true').lower() == 'true',
+        }
+
+    def write_batch(self, batch, force, stats):
+        existing = {
+            row['pincode']: row
+            for row in Pincode.objects.filter(pincode__in=list(batch)).values('pincode', *UPSERT_FIELDS)
+        }
+
+        changed = []
+        for pincode, values in batch.items():
+            current = existing.get(pincode)
+            if current is None:
+                stats['created'] += 1
+            elif force or any(current[field] != values[field] for field in UPSERT_FIELDS):
+                stats['updated'] += 1
+            else:
+                stats['unchanged'] += 1
+                continue
+            changed.append(Pincode(**values))
+
+        if changed:
+            with transaction.atomic():
+                Pincode.objects.bulk_create(
+                    changed,
+                    update_conflicts=True,
+                    unique_fields=['pincode'],
+                    update_fields=UPSERT_FIELDS + ['updated_at']
+                )
+
+    def report_progress(self, stats, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f"Processed {stats['read']} rows ({stats['read'] / elapsed:.0f} rows/s): "
+            f"{stats['created']} created, {stats['updated']} updated, {stats['unchanged']} unchanged"
+        )
@@ -1,11 +1,38 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
-from .models import CustomUser
+from .models import CustomUser, Pincode, Seller, SellerLocation, Wishlist
 
 
 @receiver(post_save, sender=CustomUser)
 def create_user_wallet(sender, instance, created, **kwargs):
-    """Auto-create wallet with 200 coins for new users"""
+    """Auto-create wallet with the 200 coin signup bonus for new users"""
     if created:
-        from apps.wallet.models import Wallet
-        Wallet.objects.create(user=instance, balance=200.00)
+        from apps.wallet.services.ledger import open_wallet
+        open_wallet(instance)
+
+
+@receiver(post_save, sender=Wishlist)
+def record_wishlist_popularity(sender, instance, created, raw=False, **kwargs):
+    """Wishlist adds feed the product popularity score"""
+    if created and not raw:
+        from apps.products.services.popularity import record_event
+        record_event(instance.product_id, 'wishlist')
+
+
+
+@receiver([post_save, post_delete], sender=Pincode)
+@receiver([post_save, post_delete], sender=Seller)
+@receiver([post_save, post_delete], sender=SellerLocation)
+def invalidate_serviceability_on_change(sender, raw=False, **kwargs):
+    """Pincodes, sellers and their locations feed the serviceability index"""
+    if raw:
+        return
+    from apps.products.services.serviceability import invalidate_serviceability
+    invalidate_serviceability()
+
+
+@receiver(m2m_changed, sender=SellerLocation.serviceable_pincodes.through)
+def invalidate_serviceability_on_service_area_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        from apps.products.services.serviceability import invalidate_serviceability
+        invalidate_serviceability()
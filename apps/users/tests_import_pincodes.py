@@ -0,0 +1,40 @@
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from apps.users.models import Pincode
+
+
+class ImportPincodesTest(TestCase):
+    def import_csv(self, content, *args):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as f:
+            f.write(content)
+        self.addCleanup(os.remove, f.name)
+        out = StringIO()
+        call_command('import_pincodes', '--file', f.name, *args, stdout=out)
+        return out.getvalue()
+
+    def test_batched_upsert_skips_unchanged_rows(self):
+        Pincode.objects.create(pincode='110001', area='Old', district='Central Delhi', city='Delhi', state='Delhi')
+        Pincode.objects.create(pincode='110002', area='Daryaganj', district='Central Delhi', city='Delhi',
+                               state='Delhi', delivery_days=1)
+
+        output = self.import_csv(
+            'officename,pincode,Districtname,statename\n'
+            'Connaught Place,110001,Central Delhi,Delhi\n'
+            'Janpath,110001,Central Delhi,Delhi\n'
+            'Fort,400001,Mumbai,Maharashtra\n'
+            'bad,12,x,y\n',
+            '--batch-size', '1'
+        )
+        self.assertIn('Created: 1, Updated: 1, Unchanged: 0, Skipped rows: 2', output)
+        self.assertEqual(Pincode.objects.get(pincode='110001').area, 'Connaught Place')
+        self.assertEqual(Pincode.objects.get(pincode='400001').city, 'Mumbai')
+
+        output = self.import_csv(
+            'pincode,area,district,city,state,delivery_days\n'
+            '110002,Daryaganj,Central Delhi,Delhi,Delhi,1\n'
+        )
+        self.assertIn('Created: 0, Updated: 0, Unchanged: 1', output)
+        self.assertEqual(Pincode.objects.count(), 3)
@@ -8,7 +8,8 @@ class WalletAdmin(admin.ModelAdmin):
     list_display = ['user_email', 'balance_display', 'transaction_count', 'created_at']
     search_fields = ['user__email', 'user__first_name', 'user__last_name']
     list_filter = ['created_at', 'is_active']
-    readonly_fields = ['created_at', 'updated_at']
+    # Balance only moves through the ledger
+    readonly_fields = ['balance', 'created_at', 'updated_at']
 
     def user_email(self, obj):
         return obj.user.email
@@ -32,9 +33,19 @@ class WalletTransactionAdmin(admin.ModelAdmin):
     list_display = ['wallet_user', 'transaction_type_badge', 'amount_display', 'balance_after', 'description_short', 'created_at']
     list_filter = ['transaction_type', 'created_at']
     search_fields = ['wallet__user__email', 'description']
-    readonly_fields = ['created_at', 'updated_at', 'balance_after']
+    readonly_fields = ['created_at', 'updated_at', 'balance_after', 'idempotency_key']
     date_hierarchy = 'created_at'
 
+    # Ledger entries are append-only and written by apps.wallet.services.ledger
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
     def wallet_user(self, obj):
         return obj.wallet.user.email
     wallet_user.short_description = 'User'
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from apps.wallet.models import Wallet
+from apps.wallet.services.ledger import SIGNUP_BONUS, open_wallet
 
 User = get_user_model()
 
@@ -19,13 +20,10 @@ class Command(BaseCommand):
 
         for user in users_without_wallets:
             try:
-                wallet = Wallet.objects.create(
-                    user=user,
-                    balance=200.00  # Initial bonus
-                )
+                open_wallet(user)
                 created_count += 1
                 self.stdout.write(
-                    self.style.SUCCESS(f'Created wallet for {user.email} with 200 coins bonus')
+                    self.style.SUCCESS(f'Created wallet for {user.email} with {SIGNUP_BONUS} coins bonus')
                 )
             except Exception as e:
                 error_count += 1
@@ -0,0 +1,46 @@
+# Generated by Django 5.0.7 on 2026-10-17 01:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WalletSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_transaction_id', models.PositiveBigIntegerField(default=0)),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('credit_count', models.PositiveIntegerField(default=0)),
+                ('debit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-last_transaction_id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='wallettransaction',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='wallettransaction',
+            constraint=models.UniqueConstraint(fields=('wallet', 'idempotency_key'), name='unique_wallet_idempotency_key'),
+        ),
+        migrations.AddField(
+            model_name='walletsnapshot',
+            name='wallet',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='wallet.wallet'),
+        ),
+        migrations.AddIndex(
+            model_name='walletsnapshot',
+            index=models.Index(fields=['wallet', '-last_transaction_id'], name='wallet_wall_wallet__212466_idx'),
+        ),
+    ]
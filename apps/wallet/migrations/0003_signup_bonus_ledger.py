@@ -0,0 +1,58 @@
+# Generated by Django 5.0.7 on 2026-10-17 01:45
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+SIGNUP_BONUS = Decimal('200.00')
+
+
+def backfill_opening_entries(apps, schema_editor):
+    """
+    Wallets used to open with 200 coins and no ledger entry. Post the
+    missing opening amount so every balance equals the sum of its ledger.
+    """
+    Wallet = apps.get_model('wallet', 'Wallet')
+    WalletTransaction = apps.get_model('wallet', 'WalletTransaction')
+
+    def total(transaction_type):
+        return Coalesce(
+            Sum('transactions__amount', filter=Q(transactions__transaction_type=transaction_type)),
+            Value(Decimal('0')), output_field=DecimalField(max_digits=10, decimal_places=2)
+        )
+
+    wallets = Wallet.objects.exclude(transactions__idempotency_key='signup_bonus').annotate(
+        credited=total('credit'), debited=total('debit')
+    )
+    for wallet in wallets.iterator():
+        gap = wallet.balance - (wallet.credited - wallet.debited)
+        if not gap:
+            continue
+        entry = WalletTransaction.objects.create(
+            wallet=wallet,
+            transaction_type='credit' if gap > 0 else 'debit',
+            amount=abs(gap),
+            description='Welcome bonus' if gap == SIGNUP_BONUS else 'Opening balance',
+            balance_after=gap,
+            idempotency_key='signup_bonus',
+        )
+        # Date the entry to the wallet's opening so the history reads in order
+        WalletTransaction.objects.filter(pk=entry.pk).update(created_at=wallet.created_at)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0002_ledger'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='wallet',
+            name='balance',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.RunPython(backfill_opening_entries, migrations.RunPython.noop),
+    ]
@@ -8,7 +8,7 @@ User = get_user_model()
 class Wallet(BaseModel):
     """User wallet for storing coins"""
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='wallet')
-    balance = models.DecimalField(max_digits=10, decimal_places=2, default=200.00)
+    balance = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
     class Meta:
         ordering = ['-created_at']
@@ -18,31 +18,22 @@ class Wallet(BaseModel):
     def __str__(self):
         return f"{self.user.email} - Balance: ₹{self.balance}"
 
-    def add_coins(self, amount, description=""):
+    def add_coins(self, amount, description="", key=None):
         """Add coins to wallet"""
-        self.balance += amount
-        self.save()
-        WalletTransaction.objects.create(
-            wallet=self,
-            transaction_type='credit',
-            amount=amount,
-            description=description
-        )
+        from apps.wallet.services.ledger import credit
+
+        credit(self, amount, description, key=key)
         return True
 
-    def deduct_coins(self, amount, description=""):
+    def deduct_coins(self, amount, description="", key=None):
         """Deduct coins from wallet if sufficient balance"""
-        if self.balance >= amount:
-            self.balance -= amount
-            self.save()
-            WalletTransaction.objects.create(
-                wallet=self,
-                transaction_type='debit',
-                amount=amount,
-                description=description
-            )
-            return True
-        return False
+        from apps.wallet.services.ledger import InsufficientBalance, debit
+
+        try:
+            debit(self, amount, description, key=key)
+        except InsufficientBalance:
+            return False
+        return True
 
 
 class WalletTransaction(BaseModel):
@@ -57,16 +48,34 @@ class WalletTransaction(BaseModel):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     description = models.TextField(blank=True)
     balance_after = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    idempotency_key = models.CharField(max_length=100, null=True, blank=True)
 
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Wallet Transaction'
         verbose_name_plural = 'Wallet Transactions'
+        constraints = [
+            models.UniqueConstraint(fields=['wallet', 'idempotency_key'], name='unique_wallet_idempotency_key'),
+        ]
 
     def __str__(self):
         return f"{self.wallet.user.email} - {self.transaction_type} - ₹{self.amount}"
 
-    def save(self, *args, **kwargs):
-        # Store balance after transaction
-        self.balance_after = self.wallet.balance
-        super().save(*args, **kwargs)
+
+class WalletSnapshot(models.Model):
+    """Wallet totals as of a ledger entry, so readers only scan newer entries"""
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name='snapshots')
+    last_transaction_id = models.PositiveBigIntegerField(default=0)
+    balance = models.DecimalField(max_digits=10, decimal_places=2)
+    credit_count = models.PositiveIntegerField(default=0)
+    debit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-last_transaction_id']
+        indexes = [
+            models.Index(fields=['wallet', '-last_transaction_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.wallet_id} @ {self.last_transaction_id} - ₹{self.balance}"
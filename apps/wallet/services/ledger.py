@@ -0,0 +1,160 @@
+"""
+Wallet ledger.
+
+WalletTransaction rows are append-only; every change to Wallet.balance is
+one conditional UPDATE (balance = balance ± x, debits only WHERE balance >= x)
+committed together with its ledger entry, so concurrent checkouts, refunds
+and bonuses never lose an update or overdraw. Callers pass an idempotency
+key per business event (e.g. the delivery bonus of an order); posting the
+same key twice returns the first entry instead of moving coins again.
+
+WalletSnapshot stores the running totals up to a ledger entry. Readers
+start from the newest snapshot and only aggregate the entries after it;
+snapshot_wallets() is run periodically by the job queue.
+
+Wallets open at zero; the signup bonus is an ordinary ledger credit, so
+the balance always equals the sum of the ledger.
+"""
+
+import logging
+from decimal import Decimal
+from typing import Dict, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.wallet.models import Wallet, WalletSnapshot, WalletTransaction
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CHUNK_SIZE = 500
+SIGNUP_BONUS = Decimal('200.00')
+
+
+class InsufficientBalance(ValueError):
+    def __init__(self, wallet, amount):
+        self.wallet = wallet
+        self.amount = amount
+        super().__init__(f'Wallet {wallet.pk} cannot cover ₹{amount}')
+
+
+def _post(wallet: Wallet, transaction_type: str, amount, description: str,
+          key: Optional[str]) -> WalletTransaction:
+    amount = Decimal(str(amount))
+    if amount <= 0:
+        raise ValueError('Wallet amounts must be positive')
+    if key:
+        existing = WalletTransaction.objects.filter(wallet=wallet, idempotency_key=key).first()
+        if existing:
+            return existing
+
+    wallets = Wallet.objects.filter(pk=wallet.pk)
+    if transaction_type == 'debit':
+        change = F('balance') - amount
+        wallets = wallets.filter(balance__gte=amount)
+    else:
+        change = F('balance') + amount
+    try:
+        with transaction.atomic():
+            if not wallets.update(balance=change, updated_at=timezone.now()):
+                raise InsufficientBalance(wallet, amount)
+            # The UPDATE holds the row until commit, so this is our own result
+            balance = Wallet.objects.filter(pk=wallet.pk).values_list('balance', flat=True).get()
+            entry = WalletTransaction.objects.create(
+                wallet=wallet,
+                transaction_type=transaction_type,
+                amount=amount,
+                description=description,
+                balance_after=balance,
+                idempotency_key=key or None,
+            )
+    except IntegrityError:
+        if not key:
+            raise
+        # A concurrent post of the same event won; ours was rolled back
+        return WalletTransaction.objects.get(wallet=wallet, idempotency_key=key)
+
+    wallet.balance = balance
+    return entry
+
+
+def credit(wallet: Wallet, amount, description: str = '', key: Optional[str] = None) -> WalletTransaction:
+    return _post(wallet, 'credit', amount, description, key)
+
+
+def debit(wallet: Wallet, amount, description: str = '', key: Optional[str] = None) -> WalletTransaction:
+    """Raises InsufficientBalance instead of letting the balance go negative"""
+    return _post(wallet, 'debit', amount, description, key)
+
+
+def open_wallet(user) -> Wallet:
+    """The user's wallet, created with the signup bonus if it doesn't exist yet"""
+    wallet, created = Wallet.objects.get_or_create(user=user)
+    if created:
+        credit(wallet, SIGNUP_BONUS, 'Welcome bonus', key='signup_bonus')
+    return wallet
+
+
+def latest_snapshot(wallet: Wallet) -> Optional[WalletSnapshot]:
+    return WalletSnapshot.objects.filter(wallet=wallet).first()
+
+
+def _tail_counts(wallet: Wallet, after: int) -> Dict[str, int]:
+    return WalletTransaction.objects.filter(wallet=wallet, pk__gt=after).aggregate(
+        credits=Count('pk', filter=Q(transaction_type='credit')),
+        debits=Count('pk', filter=Q(transaction_type='debit')),
+        last=Max('pk'),
+    )
+
+
+def wallet_summary(wallet: Wallet) -> Dict[str, int]:
+    """Credit and debit counts from the newest snapshot plus the entries after it"""
+    snapshot = latest_snapshot(wallet)
+    tail = _tail_counts(wallet, snapshot.last_transaction_id if snapshot else 0)
+    return {
+        'total_credits': (snapshot.credit_count if snapshot else 0) + tail['credits'],
+        'total_debits': (snapshot.debit_count if snapshot else 0) + tail['debits'],
+    }
+
+
+def take_snapshot(wallet: Wallet) -> Optional[WalletSnapshot]:
+    """Snapshot the wallet if it has entries since its last snapshot"""
+    with transaction.atomic():
+        # Ledger writes update the wallet row first, so locking it freezes the tail
+        balance = Wallet.objects.select_for_update().filter(pk=wallet.pk).values_list('balance', flat=True).get()
+        previous = latest_snapshot(wallet)
+        tail = _tail_counts(wallet, previous.last_transaction_id if previous else 0)
+        if tail['last'] is None:
+            return None
+        return WalletSnapshot.objects.create(
+            wallet=wallet,
+            last_transaction_id=tail['last'],
+            balance=balance,
+            credit_count=(previous.credit_count if previous else 0) + tail['credits'],
+            debit_count=(previous.debit_count if previous else 0) + tail['debits'],
+        )
+
+
+def snapshot_wallets(chunk_size: int = SNAPSHOT_CHUNK_SIZE) -> int:
+    """Snapshot every wallet with ledger entries newer than its last snapshot"""
+    newest_snapshot = WalletSnapshot.objects.filter(wallet=OuterRef('pk')).values('last_transaction_id')[:1]
+    newest_entry = WalletTransaction.objects.filter(wallet=OuterRef('pk')).order_by('-pk').values('pk')[:1]
+    stale = Wallet.objects.annotate(
+        snapshot_at=Coalesce(Subquery(newest_snapshot), 0),
+        entry_at=Subquery(newest_entry),
+    ).filter(entry_at__gt=F('snapshot_at')).order_by('pk')
+
+    total = 0
+    last_pk = 0
+    while True:
+        wallets = list(stale.filter(pk__gt=last_pk)[:chunk_size])
+        if not wallets:
+            break
+        for wallet in wallets:
+            if take_snapshot(wallet):
+                total += 1
+        last_pk = wallets[-1].pk
+    logger.info(f'Snapshotted {total} wallets')
+    return total
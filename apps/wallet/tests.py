@@ -1,3 +1,51 @@
+from decimal import Decimal
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from apps.wallet.models import Wallet, WalletSnapshot
+from apps.wallet.services.ledger import InsufficientBalance, credit, debit, snapshot_wallets, wallet_summary
 
-# Create your tests here.
+
+class WalletLedgerTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='buyer', email='buyer@example.com', password='x')
+        self.wallet = Wallet.objects.get(user=user)
+
+    def test_signup_bonus_is_a_ledger_entry(self):
+        [bonus] = self.wallet.transactions.all()
+        self.assertEqual((bonus.amount, bonus.balance_after, bonus.idempotency_key),
+                         (Decimal('200.00'), Decimal('200.00'), 'signup_bonus'))
+        self.assertEqual(self.wallet.balance, Decimal('200.00'))
+
+    def test_stale_instances_do_not_lose_updates(self):
+        stale = Wallet.objects.get(pk=self.wallet.pk)
+        self.assertTrue(self.wallet.add_coins(10, 'Refund'))
+        self.assertEqual(credit(stale, 20, 'Bonus').balance_after, Decimal('230.00'))
+
+        self.assertEqual(debit(self.wallet, 150).balance_after, Decimal('80.00'))
+        with self.assertRaises(InsufficientBalance):
+            debit(stale, 100)
+        self.assertFalse(stale.deduct_coins(100))
+        self.assertEqual(Wallet.objects.get(pk=self.wallet.pk).balance, Decimal('80.00'))
+
+    def test_idempotency_key_posts_once(self):
+        first = credit(self.wallet, 25, 'Bonus', key='order:1:delivery_bonus')
+        again = credit(Wallet.objects.get(pk=self.wallet.pk), 25, 'Bonus', key='order:1:delivery_bonus')
+
+        self.assertEqual(first.pk, again.pk)
+        self.assertEqual(self.wallet.transactions.filter(idempotency_key=first.idempotency_key).count(), 1)
+        self.assertEqual(Wallet.objects.get(pk=self.wallet.pk).balance, Decimal('225.00'))
+
+    def test_summary_reads_snapshot_and_tail(self):
+        credit(self.wallet, 10)
+        debit(self.wallet, 5)
+        self.assertEqual(snapshot_wallets(), 1)
+        self.assertEqual(snapshot_wallets(), 0)
+        credit(self.wallet, 10)
+
+        with self.assertNumQueries(2):
+            summary = wallet_summary(self.wallet)
+        self.assertEqual(summary, {'total_credits': 3, 'total_debits': 1})
+
+        self.assertEqual(snapshot_wallets(), 1)
+        snapshot = WalletSnapshot.objects.filter(wallet=self.wallet).first()
+        self.assertEqual((snapshot.balance, snapshot.credit_count), (Decimal('215.00'), 3))
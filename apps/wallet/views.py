@@ -1,34 +1,24 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from .models import Wallet, WalletTransaction
+from .models import WalletTransaction
+from .services.ledger import open_wallet, wallet_summary
 
 
 @login_required
 def wallet_dashboard(request):
     """Wallet dashboard showing balance and transactions"""
-    wallet, created = Wallet.objects.get_or_create(
-        user=request.user,
-        defaults={'balance': 200.00}
-    )
+    wallet = open_wallet(request.user)
 
     transactions = WalletTransaction.objects.filter(wallet=wallet).select_related('wallet')[:50]
 
-    # Calculate stats
-    total_credits = WalletTransaction.objects.filter(
-        wallet=wallet,
-        transaction_type='credit'
-    ).count()
-
-    total_debits = WalletTransaction.objects.filter(
-        wallet=wallet,
-        transaction_type='debit'
-    ).count()
+    # Totals come from the newest snapshot plus the entries after it
+    summary = wallet_summary(wallet)
 
     context = {
         'wallet': wallet,
         'transactions': transactions,
-        'total_credits': total_credits,
-        'total_debits': total_debits,
+        'total_credits': summary['total_credits'],
+        'total_debits': summary['total_debits'],
     }
     return render(request, 'wallet/wallet_dashboard.html', context)
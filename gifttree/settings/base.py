@@ -131,6 +131,29 @@ SERVER_EMAIL = DEFAULT_FROM_EMAIL
 # Email Settings
 EMAIL_TIMEOUT = 10  # Timeout in seconds
 EMAIL_USE_LOCALTIME = True
+# Send queued emails from a background thread right after commit; the
+# run_outbox command delivers anything left over and retries failures
+OUTBOX_SEND_ON_COMMIT = True
+
+# Periodic background jobs, run by the run_worker command
+JOB_SCHEDULE = {
+    'check-abandoned-carts': {
+        'task': 'apps.orders.tasks.check_abandoned_carts',
+        'every': 60 * 60,
+    },
+    'rollup-popularity': {
+        'task': 'apps.products.tasks.rollup_popularity',
+        'every': 60 * 60,
+    },
+    'build-recommendations': {
+        'task': 'apps.products.tasks.build_recommendations',
+        'every': 24 * 60 * 60,
+    },
+    'snapshot-wallets': {
+        'task': 'apps.wallet.tasks.snapshot_wallets',
+        'every': 24 * 60 * 60,
+    },
+}
 
 # Login/Logout URLs
 LOGIN_URL = '/account/login/'